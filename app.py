@@ -18,12 +18,28 @@ import shutil
 
 # Add scripts to path
 sys.path.insert(0, str(Path(__file__).parent))
-from scripts.predict import SignLanguagePredictor
+# scripts.predict (and TensorFlow / MediaPipe behind it) is imported by get_predictor on first use,
+# so worker boot and routes that don't predict (/, /model-status) stay fast
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
 app.config['UPLOAD_FOLDER'] = 'temp/uploads'
 app.config['MODEL_DIR'] = 'models'
+# Extraction speed/accuracy trade-off for uploads (see `scripts/benchmark.py extraction-report`)
+# EXTRACT_TARGET_FPS: frames per second sent to the detector, EXTRACT_MAX_SIDE: downscale before detection
+app.config['EXTRACTOR_OPTIONS'] = {
+    'target_fps': float(os.environ['EXTRACT_TARGET_FPS']) if os.environ.get('EXTRACT_TARGET_FPS') else None,
+    'max_side': int(os.environ['EXTRACT_MAX_SIDE']) if os.environ.get('EXTRACT_MAX_SIDE') else None,
+    # EXTRACT_RUNNING_MODE=video: track hands between frames instead of detecting on every frame
+    'running_mode': os.environ.get('EXTRACT_RUNNING_MODE', 'image'),
+}
+# Model backend (see `scripts/benchmark.py tflite` / `numpy-model`): the NumPy export
+# (python scripts/numpy_model.py models/run_.../best_model.keras) gives the Keras model's predictions
+# without loading TensorFlow, so workers start faster and use less memory; the float32 TF Lite export
+# is next. MODEL_BACKEND=tflite prefers TF Lite, MODEL_BACKEND=keras forces Keras
+app.config['MODEL_BACKEND'] = os.environ.get('MODEL_BACKEND', 'numpy')
+app.config['TFLITE_VARIANT'] = os.environ.get('TFLITE_VARIANT', 'float32')
+app.config['TFLITE_THREADS'] = int(os.environ['TFLITE_THREADS']) if os.environ.get('TFLITE_THREADS') else None
 
 # Create upload directory
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -50,6 +66,14 @@ def find_latest_model():
     for run_dir in run_dirs:
         model_path = run_dir / 'best_model.keras'
         if model_path.exists():
+            exports = {
+                'numpy': run_dir / 'best_model.npz',
+                'tflite': run_dir / f"best_model.{app.config['TFLITE_VARIANT']}.tflite",
+            }
+            preference = {'numpy': ['numpy', 'tflite'], 'tflite': ['tflite', 'numpy']}
+            for backend in preference.get(app.config['MODEL_BACKEND'], []):
+                if exports[backend].exists():
+                    return str(exports[backend])
             return str(model_path)
     
     return None
@@ -64,9 +88,16 @@ def get_predictor():
     
     # If model path changed or predictor doesn't exist, create new one
     if _predictor_instance is None or _predictor_model_path != model_path:
+        from scripts.predict import SignLanguagePredictor
         print(f"Loading model (first time or model changed): {model_path}")
-        _predictor_instance = SignLanguagePredictor(model_path)
+        # Keep this worker's hand detector across model changes - it doesn't depend on the model
+        extractor = _predictor_instance.extractor if _predictor_instance is not None else None
+        _predictor_instance = SignLanguagePredictor(model_path, extractor=extractor,
+                                                    extractor_options=app.config['EXTRACTOR_OPTIONS'],
+                                                    num_threads=app.config['TFLITE_THREADS'])
         _predictor_model_path = model_path
+        # Build the detector now so the first request doesn't pay graph initialization
+        _predictor_instance.get_extractor()
     else:
         print(f"Reusing existing model instance: {model_path}")
     
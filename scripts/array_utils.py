@@ -0,0 +1,29 @@
+"""
+Array helpers with no TensorFlow or MediaPipe dependency, shared by the pipeline scripts
+"""
+
+import numpy as np
+
+
+def pad_sequences(sequences, maxlen, dtype=np.float32, value=0.0):
+    """
+    Pad (or truncate) sequences at the end to one length
+    
+    Same result as keras' pad_sequences with padding='post' and truncating='post',
+    without importing TensorFlow.
+    
+    Args:
+        sequences: Sequence of arrays with shape (length, *feature_shape)
+        maxlen: Output length
+        dtype: Output dtype
+        value: Padding value
+    
+    Returns:
+        numpy array with shape (num_sequences, maxlen, *feature_shape)
+    """
+    feature_shape = next((np.shape(seq)[1:] for seq in sequences if len(seq)), ())
+    padded = np.full((len(sequences), maxlen) + feature_shape, value, dtype=dtype)
+    for i, seq in enumerate(sequences):
+        length = min(len(seq), maxlen)
+        padded[i, :length] = seq[:length]
+    return padded
@@ -0,0 +1,205 @@
+"""
+Batched keypoint augmentation for training
+
+KeypointAugmenter transforms a whole (batch, time, 126) batch with array operations:
+    - temporal warping: smooth, endpoint-preserving speed changes within each clip
+    - mirroring: x reflected about each hand's wrist
+    - scale and in-plane rotation jitter about each hand's wrist
+    - Gaussian keypoint noise
+Absent hands (all-zero blocks) and padded time steps stay exactly zero, so the
+augmented batches look like real extracted clips.
+
+augmented_batches() runs the augmenter on a background producer thread that stays
+a bounded number of batches ahead of model.fit:
+
+    python scripts/train_model.py --augment
+"""
+
+import queue
+import threading
+
+import numpy as np
+
+NUM_HANDS = 2
+NUM_LANDMARKS = 21
+
+
+def sequence_lengths(X):
+    """
+    Actual length of every padded sequence: index of its last non-zero frame + 1
+
+    Args:
+        X: Array with shape (batch, time, features)
+
+    Returns:
+        int64 array with shape (batch,)
+    """
+    nonzero = np.any(X != 0, axis=2)
+    last = X.shape[1] - np.argmax(nonzero[:, ::-1], axis=1)
+    return np.where(nonzero.any(axis=1), last, 0).astype(np.int64)
+
+
+class KeypointAugmenter:
+    """Random, per-sample augmentation of padded keypoint batches"""
+
+    def __init__(self, time_warp=0.3, mirror_prob=0.5, scale_jitter=0.1, rotation_degrees=15.0,
+                 noise_std=0.003):
+        """
+        Args:
+            time_warp: Warp strength in [0, 1); each clip's time axis is remapped by
+                       u -> u + a * u * (1 - u) with a uniform in [-time_warp, time_warp]
+            mirror_prob: Probability of mirroring a sample horizontally
+            scale_jitter: Hand size is multiplied by a factor uniform in [1 - scale_jitter, 1 + scale_jitter]
+            rotation_degrees: Hands are rotated in the image plane by up to this angle
+            noise_std: Std of the Gaussian noise added to every coordinate of present hands
+        """
+        if not 0 <= time_warp < 1:
+            raise ValueError(f"time_warp must be in [0, 1) to keep time monotonic, got {time_warp}")
+        self.time_warp = time_warp
+        self.mirror_prob = mirror_prob
+        self.scale_jitter = scale_jitter
+        self.rotation_degrees = rotation_degrees
+        self.noise_std = noise_std
+
+    def __call__(self, X, lengths=None, rng=None):
+        """
+        Augment a batch
+
+        Args:
+            X: Array with shape (batch, time, 126) - padded with zeros after each clip
+            lengths: Actual clip lengths (batch,) (default: inferred with sequence_lengths)
+            rng: numpy Generator (default: a fresh unseeded one)
+
+        Returns:
+            float32 array with the shape of X
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        X = np.asarray(X, dtype=np.float32)
+        batch, steps, num_features = X.shape
+        lengths = sequence_lengths(X) if lengths is None else np.asarray(lengths)
+        hands = X.reshape(batch, steps, NUM_HANDS, NUM_LANDMARKS, 3)
+
+        if self.time_warp > 0:
+            hands = self._warp_time(hands, lengths, rng)
+        present = hands.reshape(batch, steps, NUM_HANDS, -1).any(axis=3)[..., None, None]
+
+        # Mirror, scale and rotate about each hand's wrist: one 2x2 xy transform per sample
+        wrist = hands[:, :, :, :1, :]
+        relative = hands - wrist
+        angle = np.deg2rad(rng.uniform(-self.rotation_degrees, self.rotation_degrees, batch))
+        scale = rng.uniform(1 - self.scale_jitter, 1 + self.scale_jitter, batch)
+        mirror = np.where(rng.random(batch) < self.mirror_prob, -1.0, 1.0)
+        cos, sin = np.cos(angle) * scale, np.sin(angle) * scale
+        a, b, c, d = ((v.astype(np.float32)[:, None, None, None]) for v in (cos * mirror, -sin, sin * mirror, cos))
+        x, y = relative[..., 0], relative[..., 1]
+        out = np.empty_like(hands)
+        out[..., 0] = a * x + b * y
+        out[..., 1] = c * x + d * y
+        out[..., 2] = relative[..., 2] * scale.astype(np.float32)[:, None, None, None]
+        out += wrist
+
+        if self.noise_std > 0:
+            out += rng.standard_normal(out.shape, dtype=np.float32) * np.float32(self.noise_std)
+        out *= present  # Absent hands and padding back to exact zeros
+        return out.reshape(batch, steps, num_features)
+
+    def _warp_time(self, hands, lengths, rng):
+        """Resample every clip along a random monotonic time warp (frames past each length stay zero)"""
+        batch, steps = hands.shape[:2]
+        frames = hands.reshape(batch, steps, NUM_HANDS, NUM_LANDMARKS * 3)
+        last = np.maximum(lengths - 1, 0)[:, None]
+        u = np.arange(steps)[None, :] / np.maximum(last, 1)
+        strength = rng.uniform(-self.time_warp, self.time_warp, (batch, 1))
+        position = np.clip(last * (u + strength * u * (1 - u)), 0, last)
+
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, last)
+        fraction = (position - lower).astype(np.float32)[:, :, None, None]
+        sample = np.arange(batch)[:, None]
+        lower_frames = frames[sample, lower]
+        upper_frames = frames[sample, upper]
+
+        # Interpolate hands present in both neighbouring frames; otherwise take the nearest frame,
+        # so a hand never fades in from (or out to) the zero block of an absent hand
+        both_present = lower_frames.any(axis=3, keepdims=True) & upper_frames.any(axis=3, keepdims=True)
+        warped = np.where(fraction < 0.5, lower_frames, upper_frames)
+        blended = lower_frames + (upper_frames - lower_frames) * fraction
+        np.copyto(warped, blended, where=both_present)
+        warped[np.arange(steps)[None, :] >= lengths[:, None]] = 0
+        return warped.reshape(hands.shape)
+
+
+_END_OF_STREAM = object()
+
+
+def augmented_batches(X, y, batch_size, augmenter=None, class_weight=None, max_in_flight=4, seed=None,
+                      epochs=None):
+    """
+    Shuffled, augmented training batches produced on a background thread
+
+    The producer builds at most max_in_flight batches ahead of the consumer, so the
+    augmentation overlaps with training steps in bounded memory. Use with
+    model.fit(augmented_batches(...), steps_per_epoch=ceil(len(X) / batch_size)).
+
+    Args:
+        X: Padded training sequences (num_samples, time, 126)
+        y: Labels (num_samples,)
+        batch_size: Samples per batch
+        augmenter: KeypointAugmenter (default: KeypointAugmenter())
+        class_weight: Optional {class: weight}; batches then carry per-sample weights
+                      (Keras doesn't accept class_weight together with a generator)
+        max_in_flight: Batches the producer may have ready or in progress (>= 1)
+        seed: Seed of the shuffling and augmentation RNG
+        epochs: Number of passes over X (default: endless)
+
+    Yields:
+        (X_batch, y_batch) or (X_batch, y_batch, sample_weight_batch)
+    """
+    augmenter = augmenter or KeypointAugmenter()
+    lengths = sequence_lengths(X)
+    sample_weight = None
+    if class_weight is not None:
+        sample_weight = np.array([class_weight[label] for label in y], dtype=np.float32)
+
+    slots = queue.Queue()
+    ready = queue.Queue()
+    for _ in range(max(1, max_in_flight)):
+        slots.put(None)
+    stop = threading.Event()
+
+    def producer():
+        rng = np.random.default_rng(seed)
+        epoch = 0
+        try:
+            while epochs is None or epoch < epochs:
+                order = rng.permutation(len(X))
+                for start in range(0, len(X), batch_size):
+                    slots.get()  # Blocks while max_in_flight batches are ahead of the consumer
+                    if stop.is_set():
+                        return
+                    index = order[start:start + batch_size]
+                    batch = (augmenter(X[index], lengths[index], rng), y[index])
+                    if sample_weight is not None:
+                        batch += (sample_weight[index],)
+                    ready.put(batch)
+                epoch += 1
+            ready.put(_END_OF_STREAM)
+        except BaseException as e:
+            ready.put(e)
+
+    thread = threading.Thread(target=producer, name="augmentation", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = ready.get()
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            slots.put(None)
+            yield item
+    finally:
+        # Wake the producer if it is waiting for a slot, then wait for it to finish
+        stop.set()
+        slots.put(None)
+        thread.join()
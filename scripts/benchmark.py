@@ -0,0 +1,1810 @@
+"""
+Benchmarks and parity checks for the keypoint pipeline
+Each subcommand times a fast path against the reference implementation it replaced
+and exits with a non-zero status if their outputs disagree.
+
+Usage:
+    python scripts/benchmark.py normalize --keypoints-dir Data/Keypoints
+    python scripts/benchmark.py sampling
+    python scripts/benchmark.py extractor --videos output/Hello01_annotated.mp4
+    python scripts/benchmark.py extraction-report --model models/run_.../best_model.keras
+    python scripts/benchmark.py running-mode
+    python scripts/benchmark.py pipeline --max-in-flight 4
+    python scripts/benchmark.py landmarks --frames 9000
+    python scripts/benchmark.py compact-format --keypoints-dir Data/Keypoints
+    python scripts/benchmark.py shard --csv Data/Labels/dataset.csv
+    python scripts/benchmark.py split-loading --clips 10000
+    python scripts/benchmark.py preprocessed-cache
+    python scripts/benchmark.py tf-dataset --clips 3000 --epochs 3
+    python scripts/benchmark.py normalization-stats --clips 3000
+    python scripts/benchmark.py import-time
+    python scripts/benchmark.py augmentation --clips 512 --batch-size 8
+    python scripts/benchmark.py bucketing --clips 400
+    python scripts/benchmark.py catalog --clips 2000
+    python scripts/benchmark.py session --minutes 60 --model models/run_.../best_model.keras
+    python scripts/benchmark.py batched-segments --model models/run_.../best_model.keras
+    python scripts/benchmark.py latency --model models/run_.../best_model.keras
+    python scripts/benchmark.py tflite --model models/run_.../best_model.keras --csv Data/Labels/dataset.csv
+    python scripts/benchmark.py numpy-model --model models/run_.../best_model.keras --csv Data/Labels/dataset.csv
+    python scripts/benchmark.py word-boundaries --minutes 60
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from tests.reference import (
+    detect_word_boundaries_loop, normalize_keypoints_loop, smart_frame_sampling_loop, stream_segments,
+    synthetic_signing, to_raw_coordinates, write_synthetic_dataset
+)
+
+
+def load_all_clips(keypoints_dir):
+    """Load every .npy clip under a directory (recursively)"""
+    files = sorted(Path(keypoints_dir).rglob("*.npy"))
+    return files, [np.load(f) for f in files]
+
+
+def time_call(fn, repeats=3):
+    """Return the best wall time (seconds) of fn() over a few repeats"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report_parity(name, reference, candidate, atol):
+    """Print the max abs difference between two arrays and return whether they match"""
+    max_diff = float(np.max(np.abs(np.asarray(reference, dtype=np.float64) -
+                                   np.asarray(candidate, dtype=np.float64)))) if np.size(reference) else 0.0
+    ok = np.shape(reference) == np.shape(candidate) and max_diff <= atol
+    status = "✅" if ok else "❌"
+    print(f"  {status} {name}: max abs diff {max_diff:.2e} (tolerance {atol:.0e})")
+    return ok
+
+
+# ---------------------------------------------------------------------------
+# normalize_keypoints
+# ---------------------------------------------------------------------------
+
+def bench_normalize(args):
+    from scripts.extract_keypoints import normalize_keypoints
+
+    _, clips = load_all_clips(args.keypoints_dir)
+    if not clips:
+        print(f"No .npy files found in {args.keypoints_dir}")
+        return False
+
+    rng = np.random.default_rng(42)
+    raw_clips = [to_raw_coordinates(clip, rng) for clip in clips]
+    total_frames = sum(len(clip) for clip in raw_clips)
+    print(f"Clips: {len(raw_clips)}, frames: {total_frames}")
+
+    all_ok = True
+    for minimal in (True, False):
+        mode = "minimal" if minimal else "full"
+        print(f"\nMode: {mode}")
+
+        reference = np.concatenate([normalize_keypoints_loop(c, minimal=minimal) for c in raw_clips])
+        candidate = np.concatenate([normalize_keypoints(c, minimal=minimal) for c in raw_clips])
+        all_ok &= report_parity("per-clip parity", reference, candidate, 1e-4)
+
+        loop_time = time_call(lambda: [normalize_keypoints_loop(c, minimal=minimal) for c in raw_clips],
+                              repeats=args.repeats)
+        vec_time = time_call(lambda: [normalize_keypoints(c, minimal=minimal) for c in raw_clips],
+                             repeats=args.repeats)
+        print(f"  Loop:       {loop_time * 1000:9.2f} ms")
+        print(f"  Vectorized: {vec_time * 1000:9.2f} ms  ({loop_time / vec_time:.1f}x faster)")
+
+        # Whole dataset as a single (clips, frames, 2, 21, 3) stack
+        stack = np.stack([c[np.arange(args.target_frames) % len(c)] for c in raw_clips])
+        batched = normalize_keypoints(stack, minimal=minimal)
+        reference = np.stack([normalize_keypoints_loop(c, minimal=minimal) for c in stack])
+        all_ok &= report_parity(f"batched {stack.shape} parity", reference, batched, 1e-4)
+        stack_time = time_call(lambda: normalize_keypoints(stack, minimal=minimal), repeats=args.repeats)
+        print(f"  Batched:    {stack_time * 1000:9.2f} ms for {stack.shape[0]} clips")
+
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# smart_frame_sampling
+# ---------------------------------------------------------------------------
+
+def bench_sampling(args):
+    from scripts.extract_keypoints import smart_frame_sampling, get_sampling_plan
+
+    rng = np.random.default_rng(42)
+    all_ok = True
+
+    # Exhaustive bit-for-bit check over every clip length up to a few times the target
+    for num_frames in range(1, args.target_frames * 4):
+        clip = rng.standard_normal((num_frames, 2, 21, 3))
+        for ratio in (0.0, 0.2, 0.5):
+            reference = smart_frame_sampling_loop(clip, args.target_frames, ratio)
+            candidate = smart_frame_sampling(clip, args.target_frames, ratio)
+            if reference.dtype != candidate.dtype or not np.array_equal(reference, candidate):
+                print(f"  ❌ mismatch for num_frames={num_frames}, skip_start_ratio={ratio}")
+                all_ok = False
+    if all_ok:
+        print(f"✅ Bit-for-bit identical for clip lengths 1..{args.target_frames * 4 - 1}")
+
+    print(f"\n{'clip':<10}{'frames':>10}{'loop':>12}{'plan (cold)':>14}{'plan (warm)':>14}{'speedup':>10}")
+    for name, num_frames in (("short", 30), ("medium", 150), ("long", 3000), ("very long", 200000)):
+        clip = rng.standard_normal((num_frames, 2, 21, 3))
+
+        reference = smart_frame_sampling_loop(clip, args.target_frames)
+        all_ok &= bool(np.array_equal(reference, smart_frame_sampling(clip, args.target_frames)))
+
+        loop_time = time_call(lambda: smart_frame_sampling_loop(clip, args.target_frames), repeats=args.repeats)
+
+        def cold():
+            get_sampling_plan.cache_clear()
+            smart_frame_sampling(clip, args.target_frames)
+        cold_time = time_call(cold, repeats=args.repeats)
+        warm_time = time_call(lambda: smart_frame_sampling(clip, args.target_frames), repeats=args.repeats)
+        print(f"{name:<10}{num_frames:>10}{loop_time * 1e6:>10.1f}us{cold_time * 1e6:>12.1f}us"
+              f"{warm_time * 1e6:>12.1f}us{loop_time / warm_time:>9.1f}x")
+
+    # A batch of equal-length clips is sampled with one gather
+    batch = rng.standard_normal((256, 40, 2, 21, 3))
+    batched = smart_frame_sampling(batch, args.target_frames)
+    reference = np.stack([smart_frame_sampling_loop(c, args.target_frames) for c in batch])
+    all_ok &= report_parity(f"batched {batch.shape} parity", reference, batched, 0.0)
+
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# HandKeypointExtractor
+# ---------------------------------------------------------------------------
+
+def bench_extractor(args):
+    from scripts.extract_keypoints import HandKeypointExtractor, extract_hand_keypoints_from_video
+
+    videos = [Path(v) for v in args.videos] or sorted(Path("output").glob("*.mp4"))[:3]
+    if not videos:
+        print("No sample videos found (pass --videos)")
+        return False
+
+    def run_cold():
+        return [extract_hand_keypoints_from_video(v) for v in videos]
+
+    cold_times = []
+    for _ in range(args.repeats):
+        cold_times.append(time_call(run_cold, repeats=1))
+    cold_results = run_cold()
+
+    start = time.perf_counter()
+    extractor = HandKeypointExtractor()
+    create_time = time.perf_counter() - start
+    warm_times = []
+    try:
+        warm_results = [extractor.extract(v) for v in videos]  # first pass also warms up
+        for _ in range(args.repeats):
+            warm_times.append(time_call(lambda: [extractor.extract(v) for v in videos], repeats=1))
+    finally:
+        extractor.close()
+
+    all_ok = True
+    for video, cold, warm in zip(videos, cold_results, warm_results):
+        all_ok &= report_parity(f"{video.name} cold vs warm", cold, warm, 0.0)
+
+    per_clip = len(videos)
+    print(f"\nVideos: {len(videos)}, repeats: {args.repeats}")
+    print(f"  Detector creation:             {create_time * 1000:9.1f} ms")
+    print(f"  Cold (new detector per call):  {np.median(cold_times) / per_clip * 1000:9.1f} ms/video (median)")
+    print(f"  Warm (shared extractor):       {np.median(warm_times) / per_clip * 1000:9.1f} ms/video (median)")
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Extraction settings report (frame stride / downscale)
+# ---------------------------------------------------------------------------
+
+def _parse_grid(values, cast):
+    """Parse a grid like ['none', '15', '10'] into [None, 15, 10]"""
+    return [None if v.lower() in ('none', 'full', '0') else cast(v) for v in values]
+
+
+def bench_extraction_report(args):
+    from scripts.extract_keypoints import HandKeypointExtractor
+
+    videos = [Path(v) for v in args.videos] or sorted(Path("output").glob("*.mp4"))
+    if not videos:
+        print("No sample videos found (pass --videos)")
+        return False
+
+    predictor = None
+    if args.model:
+        from scripts.predict import SignLanguagePredictor
+        predictor = SignLanguagePredictor(args.model)
+
+    def top1(keypoints):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return predictor.predict_from_keypoints(keypoints)['prediction']
+
+    settings = [(fps, side) for fps in _parse_grid(args.fps, float) for side in _parse_grid(args.max_side, int)]
+    if (None, None) not in settings:
+        settings.insert(0, (None, None))
+    settings.sort(key=lambda setting: setting != (None, None))  # Baseline first
+
+    print(f"Videos: {len(videos)}")
+    print(f"\n{'target fps':>10} {'max side':>9} {'ms/video':>10} {'speedup':>8} {'hand frames':>12} {'top-1 agree':>12}")
+
+    baseline_time = None
+    baseline_labels = None
+    for target_fps, max_side in settings:
+        with HandKeypointExtractor(target_fps=target_fps, max_side=max_side) as extractor:
+            extractor.extract(videos[0])  # Warm up
+            start = time.perf_counter()
+            results = [extractor.extract(v) for v in videos]
+            elapsed = (time.perf_counter() - start) / len(videos)
+
+        frames = sum(len(k) for k in results if k is not None)
+        hand_frames = sum(int(np.any(k != 0, axis=(1, 2, 3)).sum()) for k in results if k is not None)
+        hand_ratio = hand_frames / frames if frames else 0.0
+
+        agreement = "-"
+        if predictor is not None:
+            labels = [top1(k) if k is not None and len(k) else None for k in results]
+            if baseline_labels is None:
+                baseline_labels = labels
+            agreement = f"{np.mean([a == b for a, b in zip(labels, baseline_labels)]):.1%}"
+
+        if baseline_time is None:
+            baseline_time = elapsed
+        print(f"{str(target_fps or 'all'):>10} {str(max_side or 'full'):>9} {elapsed * 1000:>10.1f} "
+              f"{baseline_time / elapsed:>7.2f}x {hand_ratio:>12.1%} {agreement:>12}")
+
+    if predictor is None:
+        print("\n(pass --model to report top-1 agreement with full-resolution extraction)")
+    return True
+
+
+# ---------------------------------------------------------------------------
+# IMAGE vs VIDEO running mode
+# ---------------------------------------------------------------------------
+
+def _hand_agreement(reference, candidate):
+    """
+    Compare two (frames, hands, 21, 3) extractions of the same clip.
+    Hand slots may be swapped between runs, so each frame uses the better of the
+    two hand orderings.
+    
+    Returns:
+        (presence agreement ratio, mean abs keypoint diff where both detected a hand)
+    """
+    frames = min(len(reference), len(candidate))
+    reference, candidate = reference[:frames], candidate[:frames]
+    orderings = [candidate, candidate[:, ::-1]] if candidate.shape[1] == 2 else [candidate]
+
+    best_presence = None
+    best_diff = None
+    for ordered in orderings:
+        ref_present = np.any(reference != 0, axis=(2, 3))
+        cand_present = np.any(ordered != 0, axis=(2, 3))
+        presence = (ref_present == cand_present).mean(axis=1)  # Per frame
+        both = ref_present & cand_present
+        diff = np.where(both, np.abs(reference - ordered).mean(axis=(2, 3)), 0.0).sum(axis=1)
+        count = both.sum(axis=1)
+        if best_presence is None:
+            best_presence, best_diff, best_count = presence, diff, count
+        else:
+            better = presence > best_presence
+            best_presence = np.where(better, presence, best_presence)
+            best_diff = np.where(better, diff, best_diff)
+            best_count = np.where(better, count, best_count)
+
+    mean_diff = best_diff.sum() / best_count.sum() if best_count.sum() else 0.0
+    return float(best_presence.mean()), float(mean_diff)
+
+
+def bench_running_mode(args):
+    from scripts.extract_keypoints import HandKeypointExtractor
+
+    videos = [Path(v) for v in args.videos] or sorted(Path("output").glob("*.mp4"))
+    if not videos:
+        print("No sample videos found (pass --videos)")
+        return False
+
+    results = {}
+    for mode in ("image", "video"):
+        with HandKeypointExtractor(running_mode=mode) as extractor:
+            extractor.extract(videos[0])  # Warm up
+            start = time.perf_counter()
+            results[mode] = [extractor.extract(v) for v in videos]
+            elapsed = time.perf_counter() - start
+        frames = sum(len(k) for k in results[mode] if k is not None)
+        print(f"{mode.upper():>6}: {frames / elapsed:7.1f} frames/s ({elapsed / len(videos) * 1000:.1f} ms/video)")
+
+    print(f"\n{'video':<28}{'frames':>8}{'presence agree':>16}{'mean |diff|':>13}")
+    presences = []
+    for video, image_kp, video_kp in zip(videos, results["image"], results["video"]):
+        if image_kp is None or video_kp is None:
+            continue
+        presence, diff = _hand_agreement(image_kp, video_kp)
+        presences.append(presence)
+        print(f"{video.name:<28}{len(image_kp):>8}{presence:>16.1%}{diff:>13.4f}")
+
+    print(f"\nMean hand-presence agreement: {np.mean(presences):.1%}")
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Pipelined decode/detect
+# ---------------------------------------------------------------------------
+
+def bench_pipeline(args):
+    import cv2
+    from scripts.extract_keypoints import HandKeypointExtractor, iter_video_frames, to_rgb_frame
+
+    videos = [Path(v) for v in args.videos] or sorted(Path("output").glob("*.mp4"))
+    if not videos:
+        print("No sample videos found (pass --videos)")
+        return False
+
+    def decode_only(video):
+        cap = cv2.VideoCapture(str(video))
+        try:
+            return [to_rgb_frame(frame) for _, frame in iter_video_frames(cap)]
+        finally:
+            cap.release()
+
+    all_ok = True
+    with HandKeypointExtractor(max_in_flight=0) as sequential, \
+            HandKeypointExtractor(max_in_flight=args.max_in_flight) as pipelined:
+        sequential.extract(videos[0])  # Warm up
+        pipelined.extract(videos[0])
+
+        print(f"{'video':<28}{'decode':>10}{'detect':>10}{'sequential':>12}{'pipelined':>11}{'speedup':>9}")
+        totals = np.zeros(4)
+        for video in videos:
+            decode_time = time_call(lambda: decode_only(video), repeats=args.repeats)
+            frames = decode_only(video)
+            detect_time = time_call(lambda: sequential._extract_rgb_frames((0.0, f) for f in frames),
+                                    repeats=args.repeats)
+            sequential_time = time_call(lambda: sequential.extract(video), repeats=args.repeats)
+            pipelined_time = time_call(lambda: pipelined.extract(video), repeats=args.repeats)
+            totals += (decode_time, detect_time, sequential_time, pipelined_time)
+            print(f"{video.name:<28}{decode_time * 1000:>8.1f}ms{detect_time * 1000:>8.1f}ms"
+                  f"{sequential_time * 1000:>10.1f}ms{pipelined_time * 1000:>9.1f}ms"
+                  f"{sequential_time / pipelined_time:>8.2f}x")
+
+            all_ok &= bool(np.array_equal(sequential.extract(video), pipelined.extract(video)))
+
+    decode_total, detect_total, sequential_total, pipelined_total = totals
+    print(f"\nTotal: decode {decode_total:.2f}s + detect {detect_total:.2f}s; "
+          f"sequential {sequential_total:.2f}s, pipelined {pipelined_total:.2f}s "
+          f"(ideal max(decode, detect) = {max(decode_total, detect_total):.2f}s)")
+    print(f"{'✅' if all_ok else '❌'} Pipelined output identical to sequential")
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Landmark conversion / keypoint buffers
+# ---------------------------------------------------------------------------
+
+def _landmarks_to_keypoints_loop(frames_landmarks, max_hands=2):
+    """Original per-frame float64 zeros + triple loop + np.array (reference for parity checks)"""
+    all_keypoints = []
+    for hands_landmarks in frames_landmarks:
+        frame_keypoints = np.zeros((max_hands, 21, 3))
+        for idx, hand_landmarks in enumerate(hands_landmarks):
+            if idx >= max_hands:
+                break
+            for i, landmark in enumerate(hand_landmarks):
+                frame_keypoints[idx, i, 0] = landmark.x
+                frame_keypoints[idx, i, 1] = landmark.y
+                frame_keypoints[idx, i, 2] = landmark.z
+        all_keypoints.append(frame_keypoints)
+    return np.array(all_keypoints).reshape(-1, max_hands, 21, 3)
+
+
+def _landmarks_to_keypoints_buffer(frames_landmarks, expected_frames, max_hands=2):
+    """Preallocated float32 buffer filled like HandKeypointExtractor._extract_rgb_frames"""
+    from scripts.extract_keypoints import write_hand_landmarks
+
+    keypoints = np.empty((max(expected_frames, 16), max_hands, 21, 3), dtype=np.float32)
+    num_frames = 0
+    for hands_landmarks in frames_landmarks:
+        if num_frames == len(keypoints):
+            grown = np.empty((2 * len(keypoints),) + keypoints.shape[1:], dtype=np.float32)
+            grown[:num_frames] = keypoints
+            keypoints = grown
+        write_hand_landmarks(keypoints[num_frames], hands_landmarks)
+        num_frames += 1
+    return keypoints[:num_frames]
+
+
+def _measure_peak(fn):
+    """Run fn() under tracemalloc and return (result, peak bytes allocated while it ran)"""
+    import tracemalloc
+
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+
+def bench_landmarks(args):
+    import cv2
+    from types import SimpleNamespace
+    from scripts.extract_keypoints import iter_video_frames, normalize_keypoints, to_rgb_frame
+
+    # Session-length stream of detector results, built from real (raw-scale) clips
+    _, clips = load_all_clips(args.keypoints_dir)
+    if not clips:
+        print(f"No keypoint files found in {args.keypoints_dir}")
+        return False
+    rng = np.random.default_rng(0)
+    stream = np.concatenate(clips)[np.arange(args.frames) % sum(len(c) for c in clips)]
+    stream = (stream + rng.uniform(0.2, 0.8, size=(len(stream), 2, 1, 3))).astype(np.float32)
+    frames_landmarks = []
+    for frame in stream:
+        hands = [hand for hand in frame if rng.random() < 0.9]  # Some frames miss a hand
+        frames_landmarks.append([[SimpleNamespace(x=x, y=y, z=z) for x, y, z in hand.tolist()]
+                                 for hand in hands])
+
+    all_ok = True
+    print(f"Frames: {len(frames_landmarks)}")
+    for name, hint in [("exact frame count", len(frames_landmarks)),
+                       ("frame count hint 1/8 too low", len(frames_landmarks) // 8)]:
+        def run_loop():
+            return normalize_keypoints(_landmarks_to_keypoints_loop(frames_landmarks), minimal=True)
+
+        def run_buffer():
+            return normalize_keypoints(_landmarks_to_keypoints_buffer(frames_landmarks, hint), minimal=True)
+
+        # Timed separately: tracemalloc slows down allocation-heavy code
+        loop_time = time_call(run_loop, repeats=args.repeats)
+        buffer_time = time_call(run_buffer, repeats=args.repeats)
+        reference, loop_peak = _measure_peak(run_loop)
+        candidate, buffer_peak = _measure_peak(run_buffer)
+        print(f"\n{name}:")
+        print(f"  Loop + np.array:       {loop_time * 1000:9.1f} ms  "
+              f"({loop_time / len(frames_landmarks) * 1e6:.1f} µs/frame), peak {loop_peak / 2**20:7.1f} MiB")
+        print(f"  Preallocated float32:  {buffer_time * 1000:9.1f} ms  "
+              f"({buffer_time / len(frames_landmarks) * 1e6:.1f} µs/frame), peak {buffer_peak / 2**20:7.1f} MiB")
+        all_ok &= report_parity(name, reference, candidate, 0.0)
+
+    videos = [Path(v) for v in args.videos] or sorted(Path("output").glob("*.mp4"))[:1]
+    for video in videos:
+        cap = cv2.VideoCapture(str(video))
+        frames = [frame for _, frame in iter_video_frames(cap)]
+        cap.release()
+        if not frames:
+            continue
+        buffer = to_rgb_frame(frames[0])
+        allocate_time = time_call(lambda: [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames],
+                                  repeats=args.repeats)
+        reuse_time = time_call(lambda: [to_rgb_frame(f, out=buffer) for f in frames], repeats=args.repeats)
+        print(f"\n{video.name} ({len(frames)} frames) BGR->RGB:")
+        print(f"  New array per frame:   {allocate_time / len(frames) * 1e6:9.1f} µs/frame")
+        print(f"  Reused destination:    {reuse_time / len(frames) * 1e6:9.1f} µs/frame")
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Compact keypoint format
+# ---------------------------------------------------------------------------
+
+def bench_compact_format(args):
+    import shutil
+    import tempfile
+    from scripts.keypoint_format import compact_path, convert_keypoint_tree, load_keypoints_file
+
+    npy_files, clips = load_all_clips(args.keypoints_dir)
+    if not clips:
+        print(f"No keypoint files found in {args.keypoints_dir}")
+        return False
+    npy_bytes = sum(f.stat().st_size for f in npy_files)
+    print(f"Clips: {len(clips)}, .npy total: {npy_bytes / 2**20:.2f} MB")
+
+    npy_time = time_call(lambda: [np.load(f) for f in npy_files], repeats=args.repeats)
+    print(f"  np.load (.npy):          {npy_time * 1000:8.1f} ms")
+
+    all_ok = True
+    tolerances = {"int16": 1e-4, "float16": 1e-3}
+    for dtype in args.dtypes:
+        with tempfile.TemporaryDirectory() as tmp:
+            tree = Path(tmp) / "Keypoints"
+            shutil.copytree(args.keypoints_dir, tree)
+            summary = convert_keypoint_tree(tree, dtype=dtype, remove_npy=True)
+            compact_files = [compact_path(tree / f.relative_to(args.keypoints_dir)) for f in npy_files]
+            # Load through the original .npy paths, as the data loader does after a migration
+            npy_paths = [f.with_suffix(".npy") for f in compact_files]
+            compact_time = time_call(lambda: [load_keypoints_file(f) for f in npy_paths], repeats=args.repeats)
+            restored = [load_keypoints_file(f) for f in npy_paths]
+
+        print(f"\n{dtype}: {summary['compact_bytes'] / 2**20:.2f} MB "
+              f"({npy_bytes / max(summary['compact_bytes'], 1):.1f}x smaller)")
+        print(f"  load_keypoints_file:     {compact_time * 1000:8.1f} ms ({npy_time / compact_time:.2f}x vs np.load)")
+        all_ok &= report_parity(f"{dtype} round trip", np.concatenate([c.ravel() for c in clips]),
+                                np.concatenate([r.ravel() for r in restored]), tolerances[dtype])
+        all_ok &= all(c.shape == r.shape for c, r in zip(clips, restored))
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Memory-mapped dataset shard
+# ---------------------------------------------------------------------------
+
+def _evict_from_page_cache(paths):
+    """Ask the OS to drop cached pages of these files, so the next read is cold (best effort)"""
+    import os
+
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def bench_shard(args):
+    import tempfile
+    import pandas as pd
+    from scripts.data_loader import SignLanguageDataLoader
+    from scripts.dataset_shard import DatasetShard, SHARD_DATA_NAME, pack_dataset_shard, resolve_keypoints_path
+    from scripts.keypoint_format import load_keypoints_file
+
+    df = pd.read_csv(args.csv)
+    files = [resolve_keypoints_path(args.keypoints_dir, p) for p in df['path']]
+    present = [f.exists() or f.with_suffix(".kpc").exists() for f in files]
+    files = [f for f, ok in zip(files, present) if ok]
+    if not files:
+        print(f"No clips from {args.csv} found under {args.keypoints_dir}")
+        return False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shard_dir = Path(tmp) / "shard"
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = pack_dataset_shard(args.csv, args.keypoints_dir, shard_dir)
+        pack_time = time.perf_counter() - start
+        print(f"Packed {summary['clips']} clips ({summary['frames']} frames, "
+              f"{summary['bytes'] / 2**20:.2f} MB) in {pack_time * 1000:.0f} ms")
+
+        def load_files():
+            return [load_keypoints_file(f) for f in files]
+
+        def load_shard():
+            shard = DatasetShard(shard_dir)
+            # Touch every clip so the mapped pages are actually read
+            return [np.array(shard.clip(i)) for i in range(len(shard))]
+
+        rows = []
+        for name, fn, paths in [("per-file np.load", load_files, files),
+                                ("memory-mapped shard", load_shard, [shard_dir / SHARD_DATA_NAME])]:
+            cold_times = []
+            for _ in range(args.repeats):
+                evicted = _evict_from_page_cache(paths)
+                cold_times.append(time_call(fn, repeats=1))
+            warm_time = time_call(fn, repeats=args.repeats)
+            rows.append((name, min(cold_times) if evicted else float('nan'), warm_time))
+
+        print(f"\nAll {len(files)} clips:")
+        for name, cold_time, warm_time in rows:
+            print(f"  {name:<22} cold {cold_time * 1000:8.1f} ms   warm {warm_time * 1000:8.1f} ms")
+
+        # Full loader path: every split, files vs shard
+        def loader_splits(shard):
+            with contextlib.redirect_stdout(io.StringIO()):
+                loader = SignLanguageDataLoader(args.csv, args.keypoints_dir, shard_dir=shard)
+                return loader.get_all_splits()
+
+        file_splits_time = time_call(lambda: loader_splits(None), repeats=args.repeats)
+        shard_splits_time = time_call(lambda: loader_splits(shard_dir), repeats=args.repeats)
+        print(f"\nget_all_splits: files {file_splits_time * 1000:.1f} ms, shard {shard_splits_time * 1000:.1f} ms "
+              f"({file_splits_time / shard_splits_time:.2f}x)")
+
+        reference = loader_splits(None)
+        candidate = loader_splits(shard_dir)
+        all_ok = True
+        for split in reference:
+            all_ok &= report_parity(f"{split} X", reference[split][0], candidate[split][0], 0.0)
+            all_ok &= bool(np.array_equal(reference[split][1], candidate[split][1]))
+        return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Split loading (SignLanguageDataLoader.get_split_data)
+# ---------------------------------------------------------------------------
+
+def _get_split_data_loop(loader, split):
+    """Original iterrows / per-row transform / per-sample padding and normalization (reference)"""
+    split_df = loader.df[loader.df['split'] == split].copy()
+    X, y = [], []
+    for _, row in split_df.iterrows():
+        try:
+            X.append(loader.load_keypoints(row['path']))
+            y.append(loader.label_encoder.transform([row['label']])[0])
+        except Exception:
+            continue
+    y = np.array(y)
+    if loader.max_length is None:
+        loader.max_length = max(len(seq) for seq in X)
+    X_padded = np.zeros((len(X), loader.max_length, X[0].shape[1]), dtype='float32')
+    seq_lengths = []
+    for i, seq in enumerate(X):
+        seq_length = min(len(seq), loader.max_length)
+        X_padded[i, :seq_length, :] = seq[:seq_length]
+        seq_lengths.append(seq_length)
+    if loader.normalize:
+        if split == 'train':
+            all_non_padded = np.concatenate([X_padded[i, :n, :] for i, n in enumerate(seq_lengths)], axis=0)
+            loader._normalization_mean = np.mean(all_non_padded, axis=0, keepdims=True).reshape(1, 1, -1)
+            loader._normalization_std = (np.std(all_non_padded, axis=0, keepdims=True) + 1e-8).reshape(1, 1, -1)
+        for i, n in enumerate(seq_lengths):
+            X_padded[i, :n, :] = ((X_padded[i, :n, :] - loader._normalization_mean[0, 0, :]) /
+                                  loader._normalization_std[0, 0, :])
+    return X_padded, y
+
+
+def bench_split_loading(args):
+    import tempfile
+    from scripts.data_loader import SignLanguageDataLoader
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Writing {args.clips} synthetic clips ({args.min_frames}-{args.max_frames} frames)...")
+        csv_path = write_synthetic_dataset(tmp, args.clips, args.min_frames, args.max_frames)
+
+        all_ok = True
+        for normalize in (False, True):
+            def make_loader():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    return SignLanguageDataLoader(csv_path, tmp, normalize=normalize, num_workers=args.workers)
+
+            def run_loop():
+                loader = make_loader()
+                return {split: _get_split_data_loop(loader, split) for split in ("train", "val", "test")}
+
+            def run_vectorized():
+                loader = make_loader()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    return loader.get_all_splits()
+
+            run_loop()  # Warm the page cache for both
+            loop_time = time_call(run_loop, repeats=args.repeats)
+            vectorized_time = time_call(run_vectorized, repeats=args.repeats)
+            print(f"\nnormalize={normalize}: loop {loop_time:.2f}s, thread pool + vectorized {vectorized_time:.2f}s "
+                  f"({loop_time / vectorized_time:.2f}x)")
+
+            reference, candidate = run_loop(), run_vectorized()
+            # Streaming (float64) statistics differ from np.mean/np.std in float32 by rounding only
+            atol = 1e-3 if normalize else 0.0
+            for split in ("train", "val", "test"):
+                all_ok &= report_parity(f"{split} X", reference[split][0], candidate[split][0], atol)
+                all_ok &= bool(np.array_equal(reference[split][1], candidate[split][1]))
+            del reference, candidate  # A 10k-clip split is large - free it before the next timing
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Preprocessed-tensor cache
+# ---------------------------------------------------------------------------
+
+def bench_preprocessed_cache(args):
+    import shutil
+    import tempfile
+    from scripts.data_loader import SignLanguageDataLoader
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Work on a copy so a clip can be modified to check invalidation
+        keypoints_dir = Path(tmp) / "keypoints"
+        shutil.copytree(args.keypoints_dir, keypoints_dir)
+        cache_dir = Path(tmp) / "cache"
+
+        def load(cache, **kwargs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                loader = SignLanguageDataLoader(args.csv, keypoints_dir, cache_dir=cache, **kwargs)
+                return loader.get_all_splits()
+
+        all_ok = True
+        for normalize in (False, True):
+            uncached_time = time_call(lambda: load(None, normalize=normalize), repeats=args.repeats)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            start = time.perf_counter()
+            load(cache_dir, normalize=normalize)
+            miss_time = time.perf_counter() - start
+            hit_time = time_call(lambda: load(cache_dir, normalize=normalize), repeats=args.repeats)
+            print(f"normalize={normalize}: no cache {uncached_time * 1000:.0f} ms, "
+                  f"miss {miss_time * 1000:.0f} ms, hit {hit_time * 1000:.0f} ms "
+                  f"({uncached_time / hit_time:.1f}x)")
+
+            reference, cached = load(None, normalize=normalize), load(cache_dir, normalize=normalize)
+            for split in reference:
+                all_ok &= report_parity(f"{split} X (cached)", reference[split][0], cached[split][0], 0.0)
+                all_ok &= bool(np.array_equal(reference[split][1], cached[split][1]))
+
+        # Invalidation: a changed parameter and a changed source file must both rebuild
+        for name, change in [("target_frames", lambda: {'target_frames': 64}),
+                             ("source file", lambda: _perturb_first_clip(keypoints_dir) or {})]:
+            kwargs = change()
+            reference, cached = load(None, **kwargs), load(cache_dir, **kwargs)
+            ok = all(np.array_equal(reference[s][0], cached[s][0]) for s in reference)
+            print(f"  {'✅' if ok else '❌'} cache rebuilt after changing {name}")
+            all_ok &= ok
+    return all_ok
+
+
+def _perturb_first_clip(keypoints_dir):
+    """Rewrite the first clip under keypoints_dir with slightly different values"""
+    path = sorted(Path(keypoints_dir).rglob("*.npy"))[0]
+    np.save(path, np.load(path) * 1.01)
+
+
+# ---------------------------------------------------------------------------
+# tf.data streaming vs in-memory training
+# ---------------------------------------------------------------------------
+
+def _train_epochs_worker(mode, csv_path, keypoints_dir, epochs, batch_size, results):
+    """Train a small model for a few epochs in this (fresh) process and report epoch times and peak RSS"""
+    import resource
+    from tensorflow import keras
+    from scripts.data_loader import SignLanguageDataLoader
+    from scripts.model_cnn_lstm import build_cnn_lstm_model, compile_model
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader = SignLanguageDataLoader(csv_path, keypoints_dir)
+        if mode == "in-memory":
+            splits = loader.get_all_splits()
+            fit_args = dict(x=splits['train'][0], y=splits['train'][1], batch_size=batch_size,
+                            validation_data=splits['val'], shuffle=True)
+        else:
+            cache = '' if mode == "streaming+cache" else None
+            fit_args = dict(x=loader.as_tf_dataset('train', batch_size, 1000, cache=cache),
+                            validation_data=loader.as_tf_dataset('val', batch_size, 0, cache=cache), shuffle=False)
+        model = compile_model(build_cnn_lstm_model(input_shape=(loader.max_length, 126),
+                                                   num_classes=loader.num_classes,
+                                                   cnn_filters=16, lstm_units=16, num_cnn_layers=1))
+
+    epoch_times = []
+
+    class EpochTimer(keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            epoch_times.append(time.perf_counter() - self.start)
+
+    model.fit(**fit_args, epochs=epochs, verbose=0, callbacks=[EpochTimer()])
+    results.put((mode, epoch_times, baseline_kb, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def bench_tf_dataset(args):
+    import multiprocessing
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Writing {args.clips} synthetic clips...")
+        csv_path = write_synthetic_dataset(tmp, args.clips, args.min_frames, args.max_frames)
+
+        # One fresh process per mode, so peak RSS isn't shared between them
+        context = multiprocessing.get_context("spawn")
+        print(f"\n{'mode':<18}{'first epoch':>13}{'later epochs':>14}{'peak RSS':>11}{'data RSS':>11}")
+        for mode in ("in-memory", "streaming", "streaming+cache"):
+            results = context.Queue()
+            process = context.Process(target=_train_epochs_worker,
+                                      args=(mode, csv_path, tmp, args.epochs, args.batch_size, results))
+            process.start()
+            _, epoch_times, baseline_kb, peak_kb = results.get()
+            process.join()
+            later = np.mean(epoch_times[1:]) if len(epoch_times) > 1 else float('nan')
+            print(f"{mode:<18}{epoch_times[0]:>12.2f}s{later:>13.2f}s"
+                  f"{peak_kb / 1024:>9.0f}MB{(peak_kb - baseline_kb) / 1024:>9.0f}MB")
+    print("\n(data RSS = peak RSS minus the RSS after importing TensorFlow)")
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Streaming normalization statistics
+# ---------------------------------------------------------------------------
+
+def bench_normalization_stats(args):
+    import tempfile
+    from scripts.data_loader import SignLanguageDataLoader
+    from scripts.extract_keypoints import normalize_keypoints
+    from scripts.model_cnn_lstm import build_cnn_lstm_model
+    from scripts.normalization_stats import NORMALIZATION_STATS_NAME, FeatureStats
+    from scripts.predict import SignLanguagePredictor
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Writing {args.clips} synthetic clips...")
+        csv_path = write_synthetic_dataset(tmp, args.clips, args.min_frames, args.max_frames)
+        # Stored clips are translation-normalized, as extract_keypoints writes them
+        for path in Path(tmp).rglob("*.npy"):
+            np.save(path, normalize_keypoints(np.load(path), minimal=True))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            loader = SignLanguageDataLoader(csv_path, tmp, normalize=True)
+            X_train, _ = loader.get_split_data('train')
+        paths = loader._split_rows('train')[0]
+
+        def concatenated():
+            frames = np.concatenate([loader._load_clip(path)[:loader.max_length] for path in paths])
+            return (np.mean(frames, axis=0).astype(np.float32),
+                    (np.std(frames, axis=0) + 1e-8).astype(np.float32))
+
+        def streaming():
+            stats = loader.compute_normalization_stats('train')
+            return stats.mean, stats.std
+
+        (reference_mean, reference_std), reference_peak = _measure_peak(concatenated)
+        (mean, std), streaming_peak = _measure_peak(streaming)
+        reference_time = time_call(concatenated, repeats=args.repeats)
+        streaming_time = time_call(streaming, repeats=args.repeats)
+        print(f"concatenate + np.mean/np.std: {reference_time:.2f}s, peak {reference_peak / 2**20:.1f} MiB")
+        print(f"streaming (Chan/Welford):     {streaming_time:.2f}s, peak {streaming_peak / 2**20:.1f} MiB")
+
+        all_ok = report_parity("mean", reference_mean, mean, 1e-6)
+        all_ok &= report_parity("std", reference_std, std, 1e-6)
+        all_ok &= report_parity("get_split_data vs streaming mean", loader.normalization_stats.mean, mean, 1e-6)
+
+        # Stats saved with a model must give the predictor exactly the loader's training inputs
+        model_dir = Path(tmp) / "model"
+        model_dir.mkdir()
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = build_cnn_lstm_model(input_shape=(loader.max_length, 126), num_classes=loader.num_classes,
+                                         cnn_filters=8, lstm_units=8, num_cnn_layers=1)
+            model.save(model_dir / "best_model.keras")
+            loader.normalization_stats.save(model_dir / NORMALIZATION_STATS_NAME)
+            predictor = SignLanguagePredictor(model_dir / "best_model.keras")
+            loaded = FeatureStats.load(model_dir / NORMALIZATION_STATS_NAME)
+            predicted_inputs = np.concatenate([
+                predictor.preprocess_keypoints(np.load(Path(tmp) / path.replace("keypoints/", "", 1)))
+                for path in paths[:args.parity_clips]])
+        all_ok &= report_parity("saved vs in-memory std", loader.normalization_stats.std, loaded.std, 0.0)
+        all_ok &= report_parity("predictor vs loader inputs", X_train[:args.parity_clips], predicted_inputs, 1e-5)
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Import time / cold start of the entry points
+# ---------------------------------------------------------------------------
+
+# (name, python arguments, wall-time budget in seconds): no entry point may load TensorFlow
+# or MediaPipe before it needs a model or a detector (they take 5+ seconds each)
+IMPORT_TIME_BUDGETS = [
+    ("import scripts.extract_keypoints", ["-c", "import scripts.extract_keypoints"], 1.0),
+    ("import scripts.data_loader", ["-c", "import scripts.data_loader"], 1.5),
+    ("import scripts.predict", ["-c", "import scripts.predict"], 1.0),
+    ("train_model.py --help", ["scripts/train_model.py", "--help"], 1.5),
+    ("predict.py --help", ["scripts/predict.py", "--help"], 1.0),
+    ("visualize_results.py --help", ["scripts/visualize_results.py", "--help"], 2.5),
+    ("dataset_shard.py --help", ["scripts/dataset_shard.py", "--help"], 1.0),
+    ("keypoint_format.py --help", ["scripts/keypoint_format.py", "--help"], 1.0),
+    ("numpy_model.py --help", ["scripts/numpy_model.py", "--help"], 1.0),
+    ("app.py GET /model-status", ["-c", "import app; assert app.app.test_client().get('/model-status').status_code == 200"],
+     1.5),
+]
+HEAVY_MODULES = ("tensorflow", "keras", "mediapipe")
+
+
+def _run_entry_point(arguments, importtime=False):
+    """Run `python <arguments>` from the repository root; return (wall seconds, stderr)"""
+    import subprocess
+
+    root = Path(__file__).parent.parent
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + arguments
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=root, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(arguments)} failed:\n{result.stderr[-2000:]}")
+    return elapsed, result.stderr
+
+
+def bench_import_time(args):
+    all_ok = True
+    print(f"{'entry point':<34}{'best':>8}{'median':>9}{'budget':>9}  heavy modules loaded")
+    for name, arguments, budget in IMPORT_TIME_BUDGETS:
+        times = sorted(_run_entry_point(arguments)[0] for _ in range(args.repeats))
+        # Top-level packages imported, from the -X importtime report ("import time: self | cumulative | name")
+        _, report = _run_entry_point(arguments, importtime=True)
+        imported = {line.rsplit("|", 1)[1].strip().split(".")[0]
+                    for line in report.splitlines() if line.startswith("import time:") and "|" in line}
+        heavy = sorted(imported.intersection(HEAVY_MODULES))
+        ok = times[0] * args.budget_scale <= budget and not heavy
+        all_ok &= ok
+        print(f"{'✅' if ok else '❌'} {name:<32}{times[0]:>7.2f}s{times[len(times) // 2]:>8.2f}s{budget:>8.1f}s  "
+              f"{', '.join(heavy) or '-'}")
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Batched augmentation vs model throughput
+# ---------------------------------------------------------------------------
+
+def _synthetic_padded_batch(num_clips, steps, seed=0):
+    """Padded (num_clips, steps, 126) clips with absent second hands and random lengths"""
+    rng = np.random.default_rng(seed)
+    hands = rng.normal(0, 0.1, size=(num_clips, steps, 2, 21, 3)).astype(np.float32)
+    hands[rng.random((num_clips, steps)) < 0.3, 1] = 0
+    lengths = rng.integers(steps // 3, steps + 1, num_clips)
+    hands[np.arange(steps)[None, :] >= lengths[:, None]] = 0
+    return hands.reshape(num_clips, steps, -1), lengths
+
+
+def bench_augmentation(args):
+    from tensorflow import keras
+    from scripts.augmentation import KeypointAugmenter, augmented_batches
+    from scripts.model_cnn_lstm import build_cnn_lstm_model, compile_model
+
+    X, lengths = _synthetic_padded_batch(args.clips, args.frames)
+    y = np.arange(args.clips) % 10
+    augmenter = KeypointAugmenter()
+    rng = np.random.default_rng(0)
+
+    # Invariants: absent hands and padding stay zero, a no-op configuration returns the input
+    augmented = augmenter(X, lengths, rng).reshape(args.clips, args.frames, 2, -1)
+    padding = np.arange(args.frames)[None, :] >= lengths[:, None]
+    all_ok = bool(np.all(augmented[padding] == 0))
+    print(f"  {'✅' if all_ok else '❌'} padded time steps stay zero")
+    unwarped = KeypointAugmenter(time_warp=0)(X, lengths, rng).reshape(augmented.shape)
+    same_presence = np.array_equal(unwarped.any(axis=3), X.reshape(augmented.shape).any(axis=3))
+    print(f"  {'✅' if same_presence else '❌'} absent hands stay zero (hand presence unchanged without time warp)")
+    all_ok &= same_presence
+    all_ok &= report_parity("no-op augmenter", X, KeypointAugmenter(0, 0, 0, 0, 0)(X, lengths, rng), 1e-6)
+
+    def augment_all():
+        for start in range(0, args.clips, args.batch_size):
+            augmenter(X[start:start + args.batch_size], lengths[start:start + args.batch_size], rng)
+
+    augment_time = time_call(augment_all, repeats=args.repeats)
+    start = time.perf_counter()
+    for _ in augmented_batches(X, y, args.batch_size, augmenter, seed=0, epochs=1):
+        pass
+    generator_time = time.perf_counter() - start
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = compile_model(build_cnn_lstm_model(input_shape=(args.frames, X.shape[2]), num_classes=10))
+    model.train_on_batch(X[:args.batch_size], y[:args.batch_size])  # Build / trace
+    steps = max(1, min(args.model_steps, args.clips // args.batch_size))
+    start = time.perf_counter()
+    for i in range(steps):
+        batch = slice(i * args.batch_size, (i + 1) * args.batch_size)
+        model.train_on_batch(X[batch], y[batch])
+    step_time = (time.perf_counter() - start) / steps
+
+    augment_rate = args.clips / augment_time
+    generator_rate = args.clips / generator_time
+    model_rate = args.batch_size / step_time
+    print(f"\naugmenter (one thread):         {augment_rate:>9.0f} samples/s")
+    print(f"augmented_batches (producer):   {generator_rate:>9.0f} samples/s")
+    print(f"model training steps:           {model_rate:>9.0f} samples/s "
+          f"({1 / step_time:.1f} steps/s at batch size {args.batch_size})")
+    headroom = generator_rate / model_rate
+    print(f"  {'✅' if headroom > 1 else '❌'} augmentation is {headroom:.1f}x faster than training consumes it")
+    all_ok &= headroom > 1
+
+    # End to end: one epoch from arrays vs from the background augmentation generator
+    def fit_arrays():
+        model.fit(X, y, batch_size=args.batch_size, epochs=1, verbose=0, shuffle=True)
+
+    def fit_augmented():
+        batches = augmented_batches(X, y, args.batch_size, augmenter, seed=0)
+        model.fit(batches, steps_per_epoch=int(np.ceil(args.clips / args.batch_size)), epochs=1, verbose=0,
+                  shuffle=False)
+        batches.close()
+
+    fit_arrays()
+    fit_augmented()  # Trace both input paths first
+    print(f"\nepoch from arrays: {time_call(fit_arrays, repeats=1):.2f}s, "
+          f"with background augmentation: {time_call(fit_augmented, repeats=1):.2f}s")
+    keras.backend.clear_session()
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Length-bucketed batching (use_smart_sampling=False)
+# ---------------------------------------------------------------------------
+
+def _padding_overhead(dataset):
+    """Fraction of the time steps in one pass over a dataset that are padding"""
+    total = real = 0
+    for X, _ in dataset:
+        X = X.numpy()
+        total += X.shape[0] * X.shape[1]
+        real += int(np.count_nonzero(np.any(X != 0, axis=2)))
+    return 1 - real / total
+
+
+def bench_bucketing(args):
+    import tempfile
+    from tensorflow import keras
+    from scripts.data_loader import SignLanguageDataLoader
+    from scripts.model_cnn_lstm import build_cnn_lstm_model, compile_model
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Writing {args.clips} synthetic clips ({args.min_frames}-{args.max_frames} frames, "
+              f"every {args.long_every}th a {args.long_frames}-frame session)...")
+        csv_path = write_synthetic_dataset(tmp, args.clips, args.min_frames, args.max_frames)
+        rng = np.random.default_rng(1)
+        for path in sorted(Path(tmp).rglob("*.npy"))[::args.long_every]:
+            # Dense hands, so the padding count below only counts padding
+            np.save(path, rng.normal(0, 0.1, size=(args.long_frames, 2, 21, 3)).astype(np.float32))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            loader = SignLanguageDataLoader(csv_path, tmp, use_smart_sampling=False)
+            padded = loader.as_tf_dataset('train', args.batch_size, shuffle_buffer=1000, cache='')
+            bucketed = loader.as_tf_dataset('train', args.batch_size, shuffle_buffer=1000, cache='',
+                                            bucket_by_length=True, num_buckets=args.buckets)
+        # Synthetic second hands are absent in ~30% of frames but the first hand never is,
+        # so every non-padded frame has data
+        overhead = {'padded': _padding_overhead(padded), 'bucketed': _padding_overhead(bucketed)}
+
+        results = {}
+        for mode, dataset, input_shape in [('padded', padded, (loader.max_length, 126)),
+                                           ('bucketed', bucketed, (None, 126))]:
+            keras.backend.clear_session()
+            with contextlib.redirect_stdout(io.StringIO()):
+                model = compile_model(build_cnn_lstm_model(input_shape=input_shape, num_classes=loader.num_classes,
+                                                           mask_padding=mode == 'bucketed'))
+            epoch_times = []
+            for _ in range(args.epochs):
+                start = time.perf_counter()
+                model.fit(dataset, epochs=1, verbose=0, shuffle=False)
+                epoch_times.append(time.perf_counter() - start)
+            results[mode] = (epoch_times, model)
+
+        print(f"\n{'mode':<10}{'padding':>9}{'first epoch':>13}{'later epochs':>14}")
+        for mode, (epoch_times, _) in results.items():
+            later = np.mean(epoch_times[1:]) if len(epoch_times) > 1 else float('nan')
+            print(f"{mode:<10}{overhead[mode]:>8.0%}{epoch_times[0]:>12.2f}s{later:>13.2f}s")
+
+        # A masked model's prediction must not depend on how far a clip is padded
+        model = results['bucketed'][1]
+        X, _ = next(iter(bucketed))
+        X = X.numpy()
+        batch_predictions = model.predict(X, verbose=0)
+        lengths = np.any(X != 0, axis=2).sum(axis=1)
+        alone = np.concatenate([model.predict(X[i:i + 1, :n], verbose=0) for i, n in enumerate(lengths)])
+        return report_parity("bucketed batch vs unpadded clips", alone, batch_predictions, 1e-5)
+
+
+# ---------------------------------------------------------------------------
+# Dataset catalog (per-clip metadata in the CSV)
+# ---------------------------------------------------------------------------
+
+def _describe_clip_reference(path):
+    """Catalog metadata the straightforward way: np.load, hash_file and stat separately"""
+    from scripts.extract_keypoints import hash_file
+
+    keypoints = np.load(path)
+    presence = [float(np.mean(np.any(keypoints[:, hand] != 0, axis=(1, 2)))) for hand in range(2)]
+    return {'frames': keypoints.shape[0], 'shape': "x".join(map(str, keypoints.shape)),
+            'dtype': keypoints.dtype.name, 'hand0_presence': round(presence[0], 4),
+            'hand1_presence': round(presence[1], 4), 'file_size': path.stat().st_size,
+            'sha256': hash_file(path)}
+
+
+def bench_catalog(args):
+    import tempfile
+    import pandas as pd
+    from scripts.create_dataset_csv import create_csv_dataset
+    from scripts.data_loader import SignLanguageDataLoader
+    from scripts.dataset_catalog import CATALOG_COLUMNS, file_stats_path
+    from scripts.dataset_shard import resolve_keypoints_path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "keypoints"
+        print(f"Writing {args.clips} synthetic clips ({args.min_frames}-{args.max_frames} frames)...")
+        write_synthetic_dataset(root, args.clips, args.min_frames, args.max_frames).unlink()
+        catalog_csv = Path(tmp) / "catalog.csv"
+        plain_csv = Path(tmp) / "plain.csv"
+
+        def build(workers):
+            with contextlib.redirect_stdout(io.StringIO()):
+                create_csv_dataset(root, catalog_csv, num_workers=workers)
+
+        build(None)  # Warm the page cache
+        serial_time = time_call(lambda: build(1), repeats=args.repeats)
+        parallel_time = time_call(lambda: build(args.workers), repeats=args.repeats)
+        print(f"\nBuild catalog: 1 thread {serial_time:.2f}s, {args.workers or 'default'} threads "
+              f"{parallel_time:.2f}s ({serial_time / parallel_time:.2f}x)")
+
+        catalog = pd.read_csv(catalog_csv)
+        catalog[['path', 'label', 'split']].to_csv(plain_csv, index=False)  # Same splits, no metadata
+        mismatches = 0
+        for _, row in catalog.iterrows():
+            expected = _describe_clip_reference(resolve_keypoints_path(root, row['path']))
+            mismatches += any(row[column] != expected[column] for column in CATALOG_COLUMNS)
+        print(f"  catalog rows matching np.load + hash_file + stat: {len(catalog) - mismatches}/{len(catalog)}")
+        all_ok = mismatches == 0
+        machine_specific = [column for column in catalog.columns if 'mtime' in column]
+        print(f"  machine-specific CSV columns: {machine_specific or 'none'}")
+        all_ok &= not machine_specific
+
+        def plan(csv_path):
+            with contextlib.redirect_stdout(io.StringIO()):
+                loader = SignLanguageDataLoader(csv_path, root)
+                return {split: loader._split_rows(split) for split in ('train', 'val', 'test')}
+
+        header_time = time_call(lambda: plan(plain_csv), repeats=args.repeats)
+        catalog_time = time_call(lambda: plan(catalog_csv), repeats=args.repeats)
+        print(f"Plan every split (frame counts): file headers {header_time * 1000:.0f} ms, "
+              f"catalog {catalog_time * 1000:.0f} ms ({header_time / catalog_time:.2f}x)")
+        reference, candidate = plan(plain_csv), plan(catalog_csv)
+        for split in reference:
+            same = (list(reference[split][0]) == list(candidate[split][0])
+                    and reference[split][1] == candidate[split][1])
+            print(f"  {split} lengths identical: {same}")
+            all_ok &= same
+
+        # Fresh clone: same contents, new mtimes, no file stats sidecar - nothing is stale, files are hashed once
+        for path in root.rglob("*.npy"):
+            path.touch()
+        file_stats_path(catalog_csv).unlink()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            rehash_time = time_call(lambda: plan(catalog_csv), repeats=1)
+        verified_time = time_call(lambda: plan(catalog_csv), repeats=args.repeats)
+        fresh_ok = "changed since the catalog" not in output.getvalue() and file_stats_path(catalog_csv).exists()
+        print(f"Fresh clone (touched files, no file stats): no clip stale: {fresh_ok}; "
+              f"first plan {rehash_time * 1000:.0f} ms (hashing), then {verified_time * 1000:.0f} ms")
+        all_ok &= fresh_ok
+
+        # A clip rewritten after the catalog was built must be detected and re-read
+        first = catalog.iloc[0]
+        path = resolve_keypoints_path(root, first['path'])
+        np.save(path, np.zeros((int(first['frames']) + 7, 2, 21, 3), dtype=np.float32))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            loader = SignLanguageDataLoader(catalog_csv, root)
+            paths, lengths, _ = loader._split_rows(first['split'])
+        detected = lengths[list(paths).index(first['path'])] == int(first['frames']) + 7
+        print(f"Stale clip detected and re-read: {detected}")
+        return all_ok and detected
+
+
+# ---------------------------------------------------------------------------
+# Long session recordings (windowed reader)
+# ---------------------------------------------------------------------------
+
+def _merge_window_words(windows, min_confidence):
+    """Merge consecutive window predictions of the same word (reference for recognize_session)"""
+    words = []
+    previous_end = None
+    for window in windows:
+        if window['confidence'] < min_confidence:
+            previous_end = None
+            continue
+        if previous_end is not None and words[-1]['word'] == window['word']:
+            words[-1]['end_frame'] = window['end_frame']
+            words[-1]['confidence'] = max(words[-1]['confidence'], window['confidence'])
+            words[-1]['windows'] += 1
+        else:
+            words.append({'word': window['word'], 'confidence': window['confidence'],
+                          'start_frame': window['start_frame'], 'end_frame': window['end_frame'], 'windows': 1})
+        previous_end = window['end_frame']
+    return words
+
+
+def bench_session(args):
+    import tempfile
+    from scripts.keypoint_format import save_keypoints_compact
+    from scripts.session_reader import SessionReader, recognize_session
+
+    num_frames = int(args.minutes * 60 * args.fps)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "session.npy"
+        rng = np.random.default_rng(0)
+        # Written in chunks so the benchmark itself doesn't hold the whole session
+        session = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(num_frames, 2, 21, 3))
+        for start in range(0, num_frames, 10000):
+            chunk = rng.normal(0, 0.1, size=(min(10000, num_frames - start), 2, 21, 3))
+            chunk[rng.random(len(chunk)) < 0.3, 1] = 0
+            session[start:start + len(chunk)] = chunk
+        session.flush()
+        del session
+        print(f"Session: {num_frames} frames ({args.minutes:g} min at {args.fps} fps), "
+              f"{path.stat().st_size / 2**20:.0f} MB .npy")
+
+        def full_load():
+            keypoints = np.load(path)
+            return sum(float(keypoints[start:end, 0, 0, 0].astype(np.float32).sum(dtype=np.float64))
+                       for start, end in SessionReader(path, args.window).spans())
+
+        def windowed():
+            return sum(float(window[:, 0, 0, 0].sum(dtype=np.float64)) for _, _, window in SessionReader(path, args.window))
+
+        (reference, full_peak), (candidate, windowed_peak) = _measure_peak(full_load), _measure_peak(windowed)
+        print(f"\nPeak memory over all windows: np.load {full_peak / 2**20:.1f} MB, "
+              f"windowed reader {windowed_peak / 2**20:.2f} MB")
+        all_ok = report_parity("window contents", np.array([reference]), np.array([candidate]), 0.0)
+
+        compact = Path(tmp) / "start.kpc"  # Not session.kpc: it would take precedence over session.npy
+        save_keypoints_compact(compact, np.load(path)[:args.window * 20])
+        spans = list(SessionReader(compact, args.window))
+        reference = np.load(path)[:args.window * 20].astype(np.float32)
+        all_ok &= report_parity(".kpc windows", np.concatenate([reference[s:e] for s, e, _ in spans]),
+                                np.concatenate([w for _, _, w in spans]), 1e-3)
+
+        if not args.model:
+            print("\n(--model not given: skipping recognition latency and parity)")
+            return all_ok
+
+        from scripts.predict import SignLanguagePredictor
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor = SignLanguagePredictor(args.model)
+
+        start = time.perf_counter()
+        words = recognize_session(predictor, path, window=args.window, hop=args.hop, min_confidence=0.0)
+        first_word = next(words)
+        first_time = time.perf_counter() - start
+        load_time = time_call(lambda: np.load(path), repeats=1)
+        window = np.load(path, mmap_mode='r')[:args.window]
+        with contextlib.redirect_stdout(io.StringIO()):
+            window_time = time_call(lambda: predictor.predict_from_keypoints(window), repeats=5)
+        num_windows = sum(1 for _ in SessionReader(path, args.window, args.hop).spans())
+        print(f"\nFirst word: windowed {first_time * 1000:.0f} ms; np.load + predict_multiple_words would need "
+              f"~{load_time + num_windows * window_time:.0f} s ({load_time:.2f} s load + {num_windows} windows "
+              f"x {window_time * 1000:.0f} ms) before any output")
+
+        # Parity on a prefix: recognize_session vs predict_multiple_words' sliding windows, merged
+        prefix = Path(tmp) / "prefix.npy"
+        keypoints = np.load(path, mmap_mode='r')[:args.parity_frames]
+        np.save(prefix, keypoints)
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor.max_length = args.window
+            windows = predictor.predict_multiple_words(np.array(keypoints), min_confidence=0.0, segment_method='sliding')
+            expected = _merge_window_words(
+                [{'word': w['word'], 'confidence': w['confidence'], 'start_frame': w['start_frame'],
+                  'end_frame': w['end_frame']} for w in windows], args.min_confidence)
+        streamed = list(recognize_session(predictor, prefix, window=args.window, min_confidence=args.min_confidence))
+        same = ([(w['word'], w['start_frame'], w['end_frame']) for w in streamed]
+                == [(w['word'], w['start_frame'], w['end_frame']) for w in expected])
+        print(f"Words on the first {len(keypoints)} frames match predict_multiple_words (sliding): {same} "
+              f"({len(streamed)} words)")
+        return all_ok and same and first_word is not None
+
+
+# ---------------------------------------------------------------------------
+# Batched segment inference (predict_multiple_words)
+# ---------------------------------------------------------------------------
+
+def _predict_multiple_words_loop(predictor, keypoints, segments, min_confidence=0.1):
+    """Original per-segment predict_from_keypoints loop (reference)"""
+    predictions = []
+    for seg_idx, (start, end) in enumerate(segments):
+        try:
+            result = predictor.predict_from_keypoints(keypoints[start:end])
+        except Exception:
+            continue
+        if result['confidence'] >= min_confidence:
+            predictions.append({'word': result['prediction'], 'confidence': result['confidence'],
+                                'start_frame': int(start), 'end_frame': int(end), 'segment_index': seg_idx,
+                                'all_predictions': result['all_predictions']})
+    return predictions
+
+
+def bench_batched_segments(args):
+    from scripts.predict import SignLanguagePredictor
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = SignLanguagePredictor(args.model)
+    rng = np.random.default_rng(0)
+    hop = predictor.max_length // 2
+
+    print(f"{'segments':>9}{'loop':>11}{'batched':>11}{'speedup':>9}")
+    all_ok = True
+    for num_segments in args.segments:
+        # Sliding segmentation: one segment per hop (the last one half a window long)
+        keypoints = rng.normal(0, 0.1, size=(hop * num_segments, 2, 21, 3)).astype(np.float32)
+        keypoints[rng.random(len(keypoints)) < 0.3, 1] = 0
+        keypoints[hop:hop + 20] = 0  # Some frames without hands
+        segments = [(start, min(start + predictor.max_length, len(keypoints)))
+                    for start in range(0, len(keypoints), hop)
+                    if min(start + predictor.max_length, len(keypoints)) - start >= predictor.max_length // 2]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            reference = _predict_multiple_words_loop(predictor, keypoints, segments, min_confidence=0.0)
+            candidate = predictor.predict_multiple_words(keypoints, min_confidence=0.0, segment_method='sliding')
+            loop_time = time_call(lambda: _predict_multiple_words_loop(predictor, keypoints, segments),
+                                  repeats=args.repeats)
+            batched_time = time_call(lambda: predictor.predict_multiple_words(keypoints, segment_method='sliding'),
+                                     repeats=args.repeats)
+        print(f"{len(segments):>9}{loop_time * 1000:>9.0f}ms{batched_time * 1000:>9.0f}ms"
+              f"{loop_time / batched_time:>8.1f}x")
+
+        same_words = ([(w['word'], w['start_frame'], w['end_frame']) for w in reference]
+                      == [(w['word'], w['start_frame'], w['end_frame']) for w in candidate])
+        all_ok &= same_words and report_parity(
+            f"{len(segments)} segments, class probabilities",
+            np.array([list(w['all_predictions'].values()) for w in reference]),
+            np.array([list(w['all_predictions'].values()) for w in candidate]), 1e-5)
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Single-clip latency (traced fixed-signature forward pass)
+# ---------------------------------------------------------------------------
+
+def _latencies(fn, requests):
+    """Wall time of every call (seconds)"""
+    times = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.array(times)
+
+
+def bench_latency(args):
+    from scripts.model_cnn_lstm import load_sign_model
+    from scripts.predict import SignLanguagePredictor
+
+    X = np.random.default_rng(0).normal(0, 0.1, size=(1, 96, 126)).astype(np.float32)
+
+    # First request after loading: a fresh model's predict() vs the predictor (warmed in __init__)
+    model = load_sign_model(args.model)
+    X = X[:, :model.input_shape[1] or 96]
+    first_predict = _latencies(lambda: model.predict(X, verbose=0), 1)[0]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = SignLanguagePredictor(args.model)
+    load_time = time.perf_counter() - start
+    first_direct = _latencies(lambda: predictor.predict_probabilities(X), 1)[0]
+
+    old = _latencies(lambda: model.predict(X, verbose=0), args.requests)
+    new = _latencies(lambda: predictor.predict_probabilities(X), args.requests)
+    print(f"Single clip {X.shape}, {args.requests} requests (predictor load incl. warm-up: {load_time:.2f}s)")
+    print(f"\n{'path':<25}{'first':>9}{'p50':>9}{'p99':>9}")
+    for name, first, times in [("model.predict", first_predict, old), ("traced, fixed signature", first_direct, new)]:
+        print(f"{name:<25}{first * 1000:>7.1f}ms{np.percentile(times, 50) * 1000:>7.2f}ms"
+              f"{np.percentile(times, 99) * 1000:>7.2f}ms")
+
+    all_ok = report_parity("single clip", model.predict(X, verbose=0), predictor.predict_probabilities(X), 1e-5)
+    batch = np.repeat(X, 100, axis=0)  # Above DIRECT_CALL_MAX_BATCH: model.predict fallback
+    all_ok &= report_parity("100-clip batch", model.predict(batch, verbose=0), predictor.predict_probabilities(batch),
+                            1e-5)
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# TF Lite export vs Keras backend
+# ---------------------------------------------------------------------------
+
+def _backend_worker(model_path, num_threads, clips, requests, results):
+    """
+    Load a predictor in this (fresh) process; report load time, latency, test probabilities,
+    peak RSS and whether TensorFlow got imported
+    """
+    from scripts.predict import SignLanguagePredictor
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = SignLanguagePredictor(model_path, num_threads=num_threads)
+    load_time = time.perf_counter() - start
+
+    X = predictor.preprocess_batch(clips)
+    latencies = _latencies(lambda: predictor.predict_probabilities(X[:1]), requests)
+    probabilities = predictor.predict_probabilities(X)
+    # VmHWM rather than ru_maxrss, which a spawned child inherits from its parent across exec
+    with open("/proc/self/status") as f:
+        peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    results.put((load_time, latencies, probabilities, peak_kb, "tensorflow" in sys.modules))
+
+
+def bench_tflite(args):
+    import multiprocessing
+    import shutil
+    import tempfile
+    import pandas as pd
+    from scripts.dataset_shard import resolve_keypoints_path
+    from scripts.export_tflite import TFLITE_VARIANTS, export_tflite
+    from scripts.keypoint_format import load_keypoints_file
+
+    model_path = Path(args.model)
+    with open(model_path.parent / "label_mapping.json") as f:
+        label_names = json.load(f)['classes']
+    df = pd.read_csv(args.csv)
+    df = df[df['split'] == args.split]
+    clips = [load_keypoints_file(resolve_keypoints_path(args.keypoints_dir, p)) for p in df['path']]
+    y = np.array([label_names.index(label) for label in df['label']])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Export into a copy of the run directory (label mapping and training params next to the models)
+        for path in model_path.parent.glob("*.json"):
+            shutil.copy(path, tmp)
+        shutil.copy(model_path, tmp)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            exported = export_tflite(model_path, TFLITE_VARIANTS, output_dir=tmp)
+        print(f"Exported {', '.join(exported)} in {time.perf_counter() - start:.1f}s; "
+              f"{len(clips)} {args.split} clips, {args.requests} single-clip requests, {args.threads} thread(s)")
+
+        # One fresh process per backend, so peak RSS includes only what that backend loads
+        context = multiprocessing.get_context("spawn")
+        rows = {}
+        for name, path in [("keras", Path(tmp) / model_path.name)] + [(f"tflite {v}", p) for v, p in exported.items()]:
+            results = context.Queue()
+            process = context.Process(target=_backend_worker,
+                                      args=(str(path), args.threads, clips, args.requests, results))
+            process.start()
+            rows[name] = results.get() + (path.stat().st_size,)
+            process.join()
+
+    reference = rows['keras'][2]
+    print(f"\n{'backend':<16}{'size':>9}{'load':>8}{'p50':>9}{'p99':>9}{'peak RSS':>10}{'accuracy':>10}"
+          f"{'agree':>8}{'max diff':>10}")
+    for name, (load_time, latencies, probabilities, peak_kb, _, size) in rows.items():
+        accuracy = np.mean(probabilities.argmax(axis=1) == y)
+        agree = np.mean(probabilities.argmax(axis=1) == reference.argmax(axis=1))
+        print(f"{name:<16}{size / 2**20:>7.2f}MB{load_time:>7.2f}s{np.percentile(latencies, 50) * 1000:>7.2f}ms"
+              f"{np.percentile(latencies, 99) * 1000:>7.2f}ms{peak_kb / 1024:>8.0f}MB{accuracy:>10.1%}{agree:>8.1%}"
+              f"{np.abs(probabilities - reference).max():>10.1e}")
+
+    all_ok = report_parity("tflite float32 vs keras", reference, rows['tflite float32'][2], args.max_diff)
+    # Default backend: the fastest one with the Keras model's test predictions and probabilities
+    candidates = [name for name, row in rows.items()
+                  if np.array_equal(row[2].argmax(axis=1), reference.argmax(axis=1))
+                  and np.abs(row[2] - reference).max() <= args.max_diff]
+    best = min(candidates, key=lambda name: np.percentile(rows[name][1], 50))
+    print(f"\nFastest backend matching Keras (same test predictions, probabilities within {args.max_diff:g}): {best}")
+    return all_ok
+
+
+# ---------------------------------------------------------------------------
+# Pure-NumPy forward pass vs Keras backend
+# ---------------------------------------------------------------------------
+
+def bench_numpy_model(args):
+    import multiprocessing
+    import shutil
+    import tempfile
+    import pandas as pd
+    from scripts.dataset_shard import resolve_keypoints_path
+    from scripts.keypoint_format import load_keypoints_file
+    from scripts.numpy_model import export_numpy_weights, numpy_model_path
+
+    model_path = Path(args.model)
+    with open(model_path.parent / "label_mapping.json") as f:
+        label_names = json.load(f)['classes']
+    df = pd.read_csv(args.csv)
+    df = df[df['split'] == args.split]
+    clips = [load_keypoints_file(resolve_keypoints_path(args.keypoints_dir, p)) for p in df['path']]
+    y = np.array([label_names.index(label) for label in df['label']])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Export into a copy of the run directory (label mapping and training params next to the models)
+        for path in model_path.parent.glob("*.json"):
+            shutil.copy(path, tmp)
+        shutil.copy(model_path, tmp)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            exported = export_numpy_weights(model_path, numpy_model_path(model_path, tmp))
+        print(f"Exported {exported.name} in {time.perf_counter() - start:.1f}s; "
+              f"{len(clips)} {args.split} clips, {args.requests} single-clip requests")
+
+        # One fresh process per backend, so peak RSS and imports include only what that backend loads
+        context = multiprocessing.get_context("spawn")
+        rows = {}
+        for name, path in [("keras", Path(tmp) / model_path.name), ("numpy", exported)]:
+            results = context.Queue()
+            process = context.Process(target=_backend_worker,
+                                      args=(str(path), None, clips, args.requests, results))
+            process.start()
+            rows[name] = results.get() + (path.stat().st_size,)
+            process.join()
+
+    reference = rows['keras'][2]
+    print(f"\n{'backend':<10}{'size':>9}{'load':>8}{'p50':>9}{'p99':>9}{'peak RSS':>10}{'TF loaded':>11}"
+          f"{'accuracy':>10}{'agree':>8}")
+    for name, (load_time, latencies, probabilities, peak_kb, loaded_tf, size) in rows.items():
+        accuracy = np.mean(probabilities.argmax(axis=1) == y)
+        agree = np.mean(probabilities.argmax(axis=1) == reference.argmax(axis=1))
+        print(f"{name:<10}{size / 2**20:>7.2f}MB{load_time:>7.2f}s{np.percentile(latencies, 50) * 1000:>7.2f}ms"
+              f"{np.percentile(latencies, 99) * 1000:>7.2f}ms{peak_kb / 1024:>8.0f}MB{'yes' if loaded_tf else 'no':>11}"
+              f"{accuracy:>10.1%}{agree:>8.1%}")
+
+    numpy_probabilities, numpy_loaded_tf = rows['numpy'][2], rows['numpy'][4]
+    all_ok = report_parity(f"numpy vs keras ({len(clips)} {args.split} clips)", reference, numpy_probabilities,
+                           args.max_diff)
+    same_predictions = np.array_equal(numpy_probabilities.argmax(axis=1), reference.argmax(axis=1))
+    print(f"  {'✅' if same_predictions else '❌'} same predicted class on every clip")
+    print(f"  {'❌' if numpy_loaded_tf else '✅'} numpy backend {'imported' if numpy_loaded_tf else 'did not import'} "
+          f"TensorFlow")
+    return all_ok and same_predictions and not numpy_loaded_tf
+
+
+# ---------------------------------------------------------------------------
+# Word boundary detection (vectorized and streaming)
+# ---------------------------------------------------------------------------
+
+def _boundary_recall(reference, candidate, tolerance):
+    """Fraction of reference boundaries with a candidate boundary at most `tolerance` frames away"""
+    reference_starts = np.array([start for start, _ in reference[1:]])
+    candidate_starts = np.array([start for start, _ in candidate[1:]])
+    if len(reference_starts) == 0:
+        return 1.0
+    if len(candidate_starts) == 0:
+        return 0.0
+    nearest = np.abs(reference_starts[:, None] - candidate_starts[None]).min(axis=1)
+    return float(np.mean(nearest <= tolerance))
+
+
+def bench_word_boundaries(args):
+    import tempfile
+    from scripts.word_segmentation import (
+        STILLNESS_PERCENTILE, detect_word_boundaries, frame_movements, moving_average, session_word_boundaries
+    )
+
+    all_ok = True
+    print(f"{'frames':>9}{'segments':>10}{'loop':>11}{'vectorized':>12}{'speedup':>9}  parity")
+    for num_frames in args.frames:
+        keypoints = synthetic_signing(num_frames, seed=num_frames)
+        loop_time = time_call(lambda: detect_word_boundaries_loop(keypoints), repeats=1)
+        vectorized_time = time_call(lambda: detect_word_boundaries(keypoints), repeats=args.repeats)
+        reference = detect_word_boundaries_loop(keypoints)
+        same = detect_word_boundaries(keypoints) == reference
+        all_ok &= same
+        print(f"{num_frames:>9}{len(reference):>10}{loop_time * 1000:>9.1f}ms{vectorized_time * 1000:>10.2f}ms"
+              f"{loop_time / vectorized_time:>8.0f}x  {'✅' if same else '❌'}")
+
+    # Real clips, alone and back to back (recorded words in a row)
+    files = sorted(Path(args.keypoints_dir).rglob("*.npy"))[:args.clips]
+    if files:
+        clips = [np.load(f) for f in files]
+        sequences = clips + [np.concatenate(clips[i:i + 8]) for i in range(0, len(clips), 8)]
+        same = all(detect_word_boundaries(c) == detect_word_boundaries_loop(c) for c in sequences)
+        all_ok &= same
+        print(f"{'✅' if same else '❌'} {len(clips)} clips from {args.keypoints_dir} and "
+              f"{len(sequences) - len(clips)} concatenations: vectorized segments match the loop")
+
+    # Streaming with the offline threshold: same smoothing and state machine, so the same segments
+    keypoints = synthetic_signing(args.frames[-1], seed=1)
+    movements = frame_movements(keypoints)
+    threshold = float(np.percentile(moving_average(movements, 5), STILLNESS_PERCENTILE))
+    offline = detect_word_boundaries(keypoints)
+    for chunk_frames in (1, 37, 4096):
+        same = stream_segments(keypoints, chunk_frames, threshold=threshold) == offline
+        all_ok &= same
+        print(f"{'✅' if same else '❌'} streaming, offline threshold, {chunk_frames}-frame chunks: "
+              f"segments match detect_word_boundaries")
+
+    # Streaming with the running percentile on a long session file
+    num_frames = int(args.minutes * 60 * args.fps)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "session.npy"
+        session = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(num_frames, 2, 21, 3))
+        for start in range(0, num_frames, 20000):
+            chunk = synthetic_signing(min(20000, num_frames - start), seed=start)
+            session[start:start + len(chunk)] = chunk - chunk[0] + (session[start - 1] if start else 0.5)
+        session.flush()
+        del session
+        print(f"\nSession: {num_frames} frames ({args.minutes:g} min at {args.fps} fps)")
+
+        def offline_segments():
+            return detect_word_boundaries(np.load(path))
+
+        def streamed_segments():
+            return list(session_word_boundaries(path))
+
+        # Timed outside tracemalloc, which slows down every Python allocation
+        offline_time = time_call(offline_segments, repeats=1)
+        streamed_time = time_call(streamed_segments, repeats=1)
+        offline, offline_peak = _measure_peak(offline_segments)
+        streamed, streamed_peak = _measure_peak(streamed_segments)
+        start = time.perf_counter()
+        first = next(session_word_boundaries(path))
+        first_time = time.perf_counter() - start
+
+        print(f"  offline:   {offline_time:.2f}s, peak {offline_peak / 2**20:.1f} MB, {len(offline)} segments")
+        print(f"  streaming: {streamed_time:.2f}s ({num_frames / streamed_time / 1000:.0f}k frames/s), "
+              f"peak {streamed_peak / 2**20:.2f} MB, {len(streamed)} segments, first segment {first} "
+              f"after {first_time * 1000:.0f} ms")
+        recall = _boundary_recall(offline, streamed, args.tolerance)
+        precision = _boundary_recall(streamed, offline, args.tolerance)
+        print(f"  running-percentile boundaries vs offline (within {args.tolerance} frames): "
+              f"recall {recall:.1%}, precision {precision:.1%}")
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keypoint pipeline fast paths against their references")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("normalize", help="Vectorized vs loop normalize_keypoints")
+    p.add_argument("--keypoints-dir", type=str, default="Data/Keypoints")
+    p.add_argument("--target-frames", type=int, default=96)
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_normalize)
+
+    p = subparsers.add_parser("sampling", help="Cached sampling plans vs list-based smart_frame_sampling")
+    p.add_argument("--target-frames", type=int, default=96)
+    p.add_argument("--repeats", type=int, default=5)
+    p.set_defaults(func=bench_sampling)
+
+    p = subparsers.add_parser("extractor", help="Per-call detector creation vs a warm HandKeypointExtractor")
+    p.add_argument("--videos", type=str, nargs="*", default=[],
+                   help="Videos to extract (default: first sample videos in output/)")
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_extractor)
+
+    p = subparsers.add_parser("extraction-report",
+                              help="Extraction time and top-1 agreement over a grid of fps/downscale settings")
+    p.add_argument("--videos", type=str, nargs="*", default=[],
+                   help="Videos to extract (default: sample videos in output/)")
+    p.add_argument("--model", type=str, default=None,
+                   help="Trained model (.keras) used for top-1 agreement")
+    p.add_argument("--fps", type=str, nargs="+", default=["none", "20", "15", "10"],
+                   help="Target fps values ('none' = every frame)")
+    p.add_argument("--max-side", type=str, nargs="+", default=["none", "640", "480", "320"],
+                   help="Max frame side values ('none' = full resolution)")
+    p.set_defaults(func=bench_extraction_report)
+
+    p = subparsers.add_parser("running-mode", help="IMAGE (detect every frame) vs VIDEO (tracking) extraction")
+    p.add_argument("--videos", type=str, nargs="*", default=[],
+                   help="Videos to extract (default: sample videos in output/)")
+    p.set_defaults(func=bench_running_mode)
+
+    p = subparsers.add_parser("pipeline", help="Sequential vs pipelined (reader thread) decode/detect")
+    p.add_argument("--videos", type=str, nargs="*", default=[],
+                   help="Videos to extract (default: sample videos in output/)")
+    p.add_argument("--max-in-flight", type=int, default=4)
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_pipeline)
+
+    p = subparsers.add_parser("landmarks", help="Per-frame loop conversion vs preallocated float32 keypoint buffers")
+    p.add_argument("--keypoints-dir", type=str, default="Data/Keypoints")
+    p.add_argument("--frames", type=int, default=9000, help="Stream length (default: 5 min at 30 fps)")
+    p.add_argument("--videos", type=str, nargs="*", default=[],
+                   help="Videos for the color conversion timing (default: first sample video in output/)")
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_landmarks)
+
+    p = subparsers.add_parser("compact-format", help="Size, load time and round-trip error of .kpc vs .npy clips")
+    p.add_argument("--keypoints-dir", type=str, default="Data/Keypoints")
+    p.add_argument("--dtypes", type=str, nargs="+", default=["int16", "float16"], choices=["int16", "float16"])
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_compact_format)
+
+    p = subparsers.add_parser("shard", help="Per-file loading vs one memory-mapped dataset shard")
+    p.add_argument("--csv", type=str, default="Data/Labels/dataset.csv")
+    p.add_argument("--keypoints-dir", type=str, default="Data/Keypoints/rawVideos")
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_shard)
+
+    p = subparsers.add_parser("split-loading", help="Row-by-row vs parallel, vectorized get_split_data")
+    p.add_argument("--clips", type=int, default=10000, help="Number of synthetic clips")
+    p.add_argument("--min-frames", type=int, default=30)
+    p.add_argument("--max-frames", type=int, default=150)
+    p.add_argument("--workers", type=int, default=None, help="Loader threads (default: ThreadPoolExecutor's)")
+    p.add_argument("--repeats", type=int, default=1)
+    p.set_defaults(func=bench_split_loading)
+
+    p = subparsers.add_parser("preprocessed-cache", help="Rebuilding split tensors vs the preprocessed cache")
+    p.add_argument("--csv", type=str, default="Data/Labels/dataset.csv")
+    p.add_argument("--keypoints-dir", type=str, default="Data/Keypoints/rawVideos")
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_preprocessed_cache)
+
+    p = subparsers.add_parser("tf-dataset", help="Epoch time and peak RSS: in-memory arrays vs tf.data streaming")
+    p.add_argument("--clips", type=int, default=3000, help="Number of synthetic clips")
+    p.add_argument("--min-frames", type=int, default=30)
+    p.add_argument("--max-frames", type=int, default=150)
+    p.add_argument("--epochs", type=int, default=3)
+    p.add_argument("--batch-size", type=int, default=32)
+    p.set_defaults(func=bench_tf_dataset)
+
+    p = subparsers.add_parser("normalization-stats",
+                              help="Concatenated vs streaming normalization stats, and predictor parity")
+    p.add_argument("--clips", type=int, default=3000, help="Number of synthetic clips")
+    p.add_argument("--min-frames", type=int, default=30)
+    p.add_argument("--max-frames", type=int, default=150)
+    p.add_argument("--parity-clips", type=int, default=50, help="Clips preprocessed by the predictor")
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_normalization_stats)
+
+    p = subparsers.add_parser("import-time",
+                              help="Cold-start time of every entry point against IMPORT_TIME_BUDGETS")
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--budget-scale", type=float, default=1.0,
+                   help="Multiply measured times by this before comparing (e.g. <1 on slow CI machines)")
+    p.set_defaults(func=bench_import_time)
+
+    p = subparsers.add_parser("augmentation", help="Batched augmentation throughput vs model training steps")
+    p.add_argument("--clips", type=int, default=512, help="Number of synthetic clips")
+    p.add_argument("--frames", type=int, default=96)
+    p.add_argument("--batch-size", type=int, default=8)
+    p.add_argument("--model-steps", type=int, default=30, help="Training steps timed")
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_augmentation)
+
+    p = subparsers.add_parser("bucketing", help="Padding overhead and epoch time with and without length buckets")
+    p.add_argument("--clips", type=int, default=400, help="Number of synthetic clips")
+    p.add_argument("--min-frames", type=int, default=20)
+    p.add_argument("--max-frames", type=int, default=120)
+    p.add_argument("--long-every", type=int, default=20, help="Every Nth clip is a long session recording")
+    p.add_argument("--long-frames", type=int, default=600)
+    p.add_argument("--buckets", type=int, default=8)
+    p.add_argument("--batch-size", type=int, default=8)
+    p.add_argument("--epochs", type=int, default=3)
+    p.set_defaults(func=bench_bucketing)
+
+    p = subparsers.add_parser("catalog", help="Building the per-clip CSV catalog and planning splits from it")
+    p.add_argument("--clips", type=int, default=2000, help="Number of synthetic clips")
+    p.add_argument("--min-frames", type=int, default=40)
+    p.add_argument("--max-frames", type=int, default=200)
+    p.add_argument("--workers", type=int, default=None, help="Threads for the parallel build")
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_catalog)
+
+    p = subparsers.add_parser("session", help="Memory and first-word latency of windowed session recognition")
+    p.add_argument("--minutes", type=float, default=60.0, help="Length of the synthetic session")
+    p.add_argument("--fps", type=int, default=30)
+    p.add_argument("--window", type=int, default=96)
+    p.add_argument("--hop", type=int, default=None)
+    p.add_argument("--model", type=str, default=None, help="Trained .keras model for the recognition checks")
+    p.add_argument("--min-confidence", type=float, default=0.1)
+    p.add_argument("--parity-frames", type=int, default=1500, help="Session prefix compared with predict_multiple_words")
+    p.set_defaults(func=bench_session)
+
+    p = subparsers.add_parser("batched-segments",
+                              help="Per-segment model calls vs one batched call in predict_multiple_words")
+    p.add_argument("--model", type=str, required=True, help="Trained .keras model")
+    p.add_argument("--segments", type=int, nargs="+", default=[1, 2, 5, 10, 20, 50])
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_batched_segments)
+
+    p = subparsers.add_parser("latency", help="p50/p99 single-clip latency: model.predict vs the traced forward pass")
+    p.add_argument("--model", type=str, required=True, help="Trained .keras model")
+    p.add_argument("--requests", type=int, default=300)
+    p.set_defaults(func=bench_latency)
+
+    p = subparsers.add_parser("tflite", help="Accuracy parity, latency and RSS of the TF Lite exports vs Keras")
+    p.add_argument("--model", type=str, required=True, help="Trained .keras model")
+    p.add_argument("--csv", type=str, default="Data/Labels/dataset.csv")
+    p.add_argument("--keypoints-dir", type=str, default="Data/Keypoints/rawVideos")
+    p.add_argument("--split", type=str, default="test")
+    p.add_argument("--threads", type=int, default=1, help="TF Lite interpreter threads")
+    p.add_argument("--requests", type=int, default=300)
+    p.add_argument("--max-diff", type=float, default=1e-4, help="Probability tolerance for matching Keras")
+    p.set_defaults(func=bench_tflite)
+
+    p = subparsers.add_parser("numpy-model", help="Parity, latency, RSS and imports of the NumPy forward pass vs Keras")
+    p.add_argument("--model", type=str, required=True, help="Trained .keras model")
+    p.add_argument("--csv", type=str, default="Data/Labels/dataset.csv")
+    p.add_argument("--keypoints-dir", type=str, default="Data/Keypoints/rawVideos")
+    p.add_argument("--split", type=str, default="test")
+    p.add_argument("--requests", type=int, default=300)
+    p.add_argument("--max-diff", type=float, default=1e-5, help="Probability tolerance for matching Keras")
+    p.set_defaults(func=bench_numpy_model)
+
+    p = subparsers.add_parser("word-boundaries",
+                              help="Loop vs vectorized detect_word_boundaries, and streaming WordBoundaryDetector")
+    p.add_argument("--frames", type=int, nargs="+", default=[100, 1000, 10000, 100000],
+                   help="Synthetic sequence lengths")
+    p.add_argument("--keypoints-dir", type=str, default="Data/Keypoints")
+    p.add_argument("--clips", type=int, default=200, help="Real clips checked for parity")
+    p.add_argument("--minutes", type=float, default=60.0, help="Length of the synthetic session")
+    p.add_argument("--fps", type=int, default=30)
+    p.add_argument("--tolerance", type=int, default=5, help="Frames between matching boundaries")
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=bench_word_boundaries)
+
+    args = parser.parse_args()
+    ok = args.func(args)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
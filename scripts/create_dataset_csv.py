@@ -1,14 +1,23 @@
 import os
 import csv
 import re
+import sys
 from pathlib import Path
 import random
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.dataset_catalog import CATALOG_COLUMNS, describe_clips, record_file_stats, save_file_stats
+from scripts.file_utils import atomic_write
+
 
 def get_all_npy_files(keypoints_dir):
     """
     Collect all .npy files from the keypoints directory, organized by label
     
+    Clips migrated to the compact format (.kpc without a .npy) are listed under
+    their .npy name, so the CSV and the splits don't change after a migration.
+    
     Args:
         keypoints_dir: Path to the Keypoints directory (e.g., Data/Keypoints/rawVideos)
     
@@ -26,7 +35,8 @@ def get_all_npy_files(keypoints_dir):
     for label_dir in sorted(keypoints_path.iterdir()):
         if label_dir.is_dir():
             label_name = label_dir.name
-            npy_files = sorted([f for f in label_dir.glob("*.npy")])
+            npy_files = sorted({f.with_suffix(".npy") for pattern in ("*.npy", "*.kpc")
+                                for f in label_dir.glob(pattern)})
             
             if npy_files:
                 labels_dict[label_name] = npy_files
@@ -70,10 +80,16 @@ def split_files(files, train_ratio=0.6, val_ratio=0.2, test_ratio=0.2, seed=42):
 
 
 def create_csv_dataset(keypoints_dir, output_csv, base_path="keypoints", 
-                       train_ratio=0.6, val_ratio=0.2, test_ratio=0.2, seed=42):
+                       train_ratio=0.6, val_ratio=0.2, test_ratio=0.2, seed=42,
+                       with_metadata=True, num_workers=None):
     """
     Create a CSV file with dataset information (path, label, split)
     
+    With with_metadata, every row also carries the clip's catalog columns (frame count,
+    shape, dtype, per-hand presence, file size and hash - see dataset_catalog.py),
+    read from all files in one parallel pass; the files' mtimes go to the CSV's local
+    file stats sidecar, not into the CSV.
+    
     Args:
         keypoints_dir: Path to the Keypoints directory (e.g., Data/Keypoints/rawVideos)
         output_csv: Path to output CSV file
@@ -82,6 +98,8 @@ def create_csv_dataset(keypoints_dir, output_csv, base_path="keypoints",
         val_ratio: Ratio for validation set (default: 0.2)
         test_ratio: Ratio for test set (default: 0.2)
         seed: Random seed for reproducibility
+        with_metadata: Add the per-clip catalog columns (default: True)
+        num_workers: Threads used to read clips for the catalog
     """
     keypoints_path = Path(keypoints_dir)
     
@@ -121,7 +139,8 @@ def create_csv_dataset(keypoints_dir, output_csv, base_path="keypoints",
             csv_rows.append({
                 'path': relative_path,
                 'label': label_upper,
-                'split': 'train'
+                'split': 'train',
+                '_file': file_path,
             })
         
         # Add val files
@@ -130,7 +149,8 @@ def create_csv_dataset(keypoints_dir, output_csv, base_path="keypoints",
             csv_rows.append({
                 'path': relative_path,
                 'label': label_upper,
-                'split': 'val'
+                'split': 'val',
+                '_file': file_path,
             })
         
         # Add test files
@@ -139,7 +159,8 @@ def create_csv_dataset(keypoints_dir, output_csv, base_path="keypoints",
             csv_rows.append({
                 'path': relative_path,
                 'label': label_upper,
-                'split': 'test'
+                'split': 'test',
+                '_file': file_path,
             })
         
         print(f"Label {label_upper}: {len(train_files)} train, {len(val_files)} val, {len(test_files)} test")
@@ -148,14 +169,25 @@ def create_csv_dataset(keypoints_dir, output_csv, base_path="keypoints",
     split_order = {'train': 0, 'val': 1, 'test': 2}
     csv_rows_sorted = sorted(csv_rows, key=lambda x: (x['label'], split_order[x['split']], x['path']))
     
-    # Write CSV file
-    with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['path', 'label', 'split']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        
+    # Per-clip metadata, one read of every file on a thread pool
+    fieldnames = ['path', 'label', 'split']
+    if with_metadata:
+        fieldnames += CATALOG_COLUMNS
+        catalog = describe_clips([row['_file'] for row in csv_rows_sorted], num_workers)
+        file_stats = {}
+        for row, metadata in zip(csv_rows_sorted, catalog):
+            if metadata is not None:  # Unreadable clips keep empty metadata columns
+                row.update({column: metadata[column] for column in CATALOG_COLUMNS})
+                record_file_stats(file_stats, metadata)
+        save_file_stats(output_csv, file_stats)
+    
+    # Write CSV file (atomically: an interrupted run leaves the previous CSV in place)
+    def write_rows(csvfile):
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore', lineterminator='\n')
         writer.writeheader()
-        for row in csv_rows_sorted:
-            writer.writerow(row)
+        writer.writerows(csv_rows_sorted)
+    
+    atomic_write(output_csv, write_rows, mode='w', encoding='utf-8')
     
     print(f"\nCSV file created: {output_csv}")
     print(f"Total entries: {len(csv_rows_sorted)}")
@@ -6,21 +6,28 @@ Loads data from CSV file and prepares it for GRU model training
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from sklearn.preprocessing import LabelEncoder
-from tensorflow.keras.preprocessing.sequence import pad_sequences
 from typing import Tuple, List, Dict
+import hashlib
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from scripts.extract_keypoints import smart_frame_sampling
+from scripts.dataset_catalog import NUM_HAND_SLOTS, has_catalog, is_stale, load_file_stats, save_file_stats
+from scripts.dataset_shard import DatasetShard, SHARD_DATA_NAME, resolve_keypoints_path
+from scripts.keypoint_format import compact_path, keypoints_file_length, load_keypoints_file
+from scripts.normalization_stats import FeatureStats
+from scripts.preprocessed_cache import PreprocessedCache
 
 
 class SignLanguageDataLoader:
     """Data loader for sign language keypoints dataset"""
     
     def __init__(self, csv_path: str, keypoints_base_dir: str = "Data/Keypoints/rawVideos", 
-                 normalize: bool = False, use_smart_sampling: bool = True, target_frames: int = 96):
+                 normalize: bool = False, use_smart_sampling: bool = True, target_frames: int = 96,
+                 shard_dir: str = None, num_workers: int = None, cache_dir: str = None,
+                 skip_start_ratio: float = 0.2, min_hand_presence: float = None):
         """
         Initialize data loader
         
@@ -30,18 +37,43 @@ class SignLanguageDataLoader:
             normalize: Whether to apply z-score normalization (default: False, since keypoints are already normalized in extraction)
             use_smart_sampling: Whether to use smart frame sampling (skip start, focus on relevant part)
             target_frames: Target number of frames for smart sampling (default: 96)
+            shard_dir: Optional packed dataset shard (see dataset_shard.py); clips found in it
+                       are read from the memory-mapped shard instead of their own files
+            num_workers: Threads used to load clips (default: ThreadPoolExecutor's default)
+            cache_dir: Optional directory caching each split's final tensors (see preprocessed_cache.py);
+                       entries are rebuilt when the CSV, a source file or a parameter changes
+            skip_start_ratio: Start ratio skipped by smart frame sampling (default: 0.2)
+            min_hand_presence: Drop clips in which no hand was detected in at least this fraction
+                               of frames; needs the CSV's catalog columns (see dataset_catalog.py)
         """
         self.csv_path = Path(csv_path)
         self.keypoints_base_dir = Path(keypoints_base_dir)
+        from sklearn.preprocessing import LabelEncoder  # Imported here - it takes over a second
         self.label_encoder = LabelEncoder()
         self.max_length = None
         self.num_classes = None
         self.normalize = normalize  # Store normalization flag
         self.use_smart_sampling = use_smart_sampling
         self.target_frames = target_frames
+        self.skip_start_ratio = skip_start_ratio
+        self.cache = PreprocessedCache(cache_dir) if cache_dir else None
+        self.shard = DatasetShard(shard_dir) if shard_dir else None
+        self.num_workers = num_workers
+        self._split_rows_cache = {}
+        self.normalization_stats = None  # FeatureStats of the training split (when normalize=True)
         
         # Load CSV
         self.df = pd.read_csv(self.csv_path)
+        self.has_catalog = has_catalog(self.df)
+        if min_hand_presence is not None:
+            if not self.has_catalog:
+                raise ValueError(f"min_hand_presence needs the catalog columns in {self.csv_path} "
+                                 f"(run scripts/dataset_catalog.py)")
+            presence = self.df[[f"hand{i}_presence" for i in range(NUM_HAND_SLOTS)]].max(axis=1)
+            kept = presence >= min_hand_presence  # Unreadable clips (no metadata) are dropped too
+            if not kept.all():
+                print(f"Dropping {int((~kept).sum())} clips with hand presence below {min_hand_presence}")
+            self.df = self.df[kept].reset_index(drop=True)
         
         # Encode labels
         all_labels = self.df['label'].unique()
@@ -51,6 +83,10 @@ class SignLanguageDataLoader:
         print(f"Found {len(self.df)} samples")
         print(f"Labels: {list(all_labels)}")
         print(f"Number of classes: {self.num_classes}")
+        if self.shard is not None:
+            print(f"✅ Reading clips from shard {shard_dir} ({len(self.shard)} clips)")
+            if not self.shard.matches_csv(self.csv_path):
+                print(f"⚠️  Shard was packed from a different CSV - clips missing from it are read from files")
         if not normalize:
             print("⚠️  Normalization DISABLED (keypoints already normalized in extraction)")
         else:
@@ -58,7 +94,7 @@ class SignLanguageDataLoader:
     
     def load_keypoints(self, relative_path: str) -> np.ndarray:
         """
-        Load keypoints from .npy file
+        Load keypoints from a .npy file (or its compact .kpc version, see keypoint_format)
         
         Args:
             relative_path: Relative path from CSV (e.g., "keypoints/HELLO/hello_01.npy")
@@ -67,21 +103,18 @@ class SignLanguageDataLoader:
             numpy array with shape (num_frames, features)
             Features are flattened from (num_frames, 2, 21, 3) -> (num_frames, 126)
         """
-        # Extract actual path - handle both formats:
-        # 1. "keypoints/LABEL/file.npy" (old format)
-        # 2. "LABEL/file.npy" (new format)
-        if relative_path.startswith("keypoints/"):
-            # Remove "keypoints/" prefix
-            relative_path = relative_path.replace("keypoints/", "", 1)
-        actual_path = self.keypoints_base_dir / relative_path
-        
         # Load keypoints array (shape: num_frames, 2, 21, 3)
-        keypoints = np.load(actual_path)
+        if self.shard is not None and relative_path in self.shard:
+            # Zero-copy view into the memory-mapped shard
+            keypoints = self.shard.get(relative_path)
+        else:
+            keypoints = load_keypoints_file(resolve_keypoints_path(self.keypoints_base_dir, relative_path))
         
         # Apply smart frame sampling if enabled
         # This skips the similar start frames and focuses on the actual gesture
         if self.use_smart_sampling:
-            keypoints = smart_frame_sampling(keypoints, target_frames=self.target_frames, skip_start_ratio=0.2)
+            keypoints = smart_frame_sampling(keypoints, target_frames=self.target_frames,
+                                             skip_start_ratio=self.skip_start_ratio)
         
         # Flatten to (num_frames, features) where features = 2 * 21 * 3 = 126
         # Reshape from (num_frames, 2, 21, 3) to (num_frames, 126)
@@ -90,10 +123,51 @@ class SignLanguageDataLoader:
         
         return keypoints_flat
     
+    def _load_clip(self, relative_path: str):
+        """load_keypoints for the thread pool: prints the error and returns None if the clip can't be loaded"""
+        try:
+            return self.load_keypoints(relative_path)
+        except Exception as e:
+            print(f"Error loading {relative_path}: {e}")
+            return None
+    
+    def _split_cache_key(self, split: str, split_df: pd.DataFrame) -> str:
+        """Cache key of a split: CSV, the split's source files and everything that shapes the tensors"""
+        source_files = []
+        for relative_path in split_df['path']:
+            if self.shard is not None and relative_path in self.shard:
+                source_files.append(self.shard.shard_dir / SHARD_DATA_NAME)
+            else:
+                path = resolve_keypoints_path(self.keypoints_base_dir, relative_path)
+                source_files.extend([path, compact_path(path)])
+        
+        # Padding length and normalization stats carried over from the training split
+        max_length = self.max_length
+        if max_length is None and split != 'train':
+            max_length = getattr(self, '_max_length', None)
+        stats = None
+        if self.normalize and split != 'train' and self.normalization_stats is not None:
+            stats = hashlib.sha256(self._normalization_mean.tobytes() + self._normalization_std.tobytes()).hexdigest()
+        
+        params = {
+            'split': split,
+            'target_frames': self.target_frames,
+            'skip_start_ratio': self.skip_start_ratio,
+            'use_smart_sampling': self.use_smart_sampling,
+            'normalize': self.normalize,
+            'max_length': max_length,
+            'normalization_stats': stats,
+        }
+        return self.cache.make_key(self.csv_path, list(dict.fromkeys(source_files)), params)
+    
     def get_split_data(self, split: str) -> Tuple[np.ndarray, np.ndarray]:
         """
         Get data for a specific split (train, val, or test)
         
+        Clips are loaded (and sampled) concurrently in a thread pool; padding and
+        normalization then run on the whole split at once. With a cache_dir, the
+        result is read from / written to the preprocessed cache.
+        
         Args:
             split: 'train', 'val', or 'test'
             
@@ -102,26 +176,34 @@ class SignLanguageDataLoader:
             - X: padded sequences of keypoints (num_samples, max_length, features)
             - y: encoded labels (num_samples,)
         """
-        split_df = self.df[self.df['split'] == split].copy()
+        split_df = self.df[self.df['split'] == split]
         
-        X = []
-        y = []
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._split_cache_key(split, split_df)
+            cached = self.cache.load(split, cache_key)
+            if cached is not None:
+                if split == 'train' and self.max_length is not None:
+                    self._max_length = self.max_length
+                self.max_length = int(cached['max_length'])
+                if 'mean' in cached:
+                    self._set_normalization_stats(
+                        FeatureStats.from_mean_std(cached['mean'], cached['std'], cached['stats_count']))
+                X_padded, y = cached['X'], cached['y']
+                print(f"\nLoaded {split} data from cache ({self.cache.cache_dir})")
+                print(f"X shape: {X_padded.shape}")
+                print(f"y shape: {y.shape}")
+                return X_padded, y
         
         print(f"\nLoading {split} data...")
-        for idx, row in split_df.iterrows():
-            try:
-                keypoints = self.load_keypoints(row['path'])
-                X.append(keypoints)
-                
-                # Encode label
-                label_encoded = self.label_encoder.transform([row['label']])[0]
-                y.append(label_encoded)
-            except Exception as e:
-                print(f"Error loading {row['path']}: {e}")
-                continue
-        
-        # Convert y to numpy array
-        y = np.array(y)
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            loaded = list(executor.map(self._load_clip, split_df['path']))
+        
+        kept = np.array([seq is not None for seq in loaded], dtype=bool)
+        X = [seq for seq in loaded if seq is not None]
+        
+        # Encode all labels in one call
+        y = self.label_encoder.transform(split_df['label'].to_numpy()[kept]) if len(X) > 0 else np.array([])
         
         # Pad sequences to same length
         if self.max_length is None:
@@ -140,93 +222,43 @@ class SignLanguageDataLoader:
             if split == 'train':
                 self._max_length = self.max_length
         
-        # Pad sequences using numpy (pad_sequences doesn't work well with object arrays)
+        # Actual (truncated) sequence lengths and a mask of the non-padded time steps
         num_samples = len(X)
         num_features = X[0].shape[1] if len(X) > 0 else 126
-        X_padded = np.zeros((num_samples, self.max_length, num_features), dtype='float32')
+        seq_lengths = np.array([min(len(seq), self.max_length) for seq in X], dtype=np.int64)
+        mask = np.arange(self.max_length) < seq_lengths[:, None]  # (num_samples, max_length)
         
-        # Store actual sequence lengths for normalization
-        seq_lengths = []
-        for i, seq in enumerate(X):
-            seq_length = min(len(seq), self.max_length)
-            X_padded[i, :seq_length, :] = seq[:seq_length]
-            seq_lengths.append(seq_length)
+        # All non-padded frames back to back: (total_frames, features)
+        frames = (np.concatenate([seq[:length] for seq, length in zip(X, seq_lengths)]).astype('float32', copy=False)
+                  if num_samples > 0 else np.zeros((0, num_features), dtype='float32'))
         
         # Normalize data (zero mean, unit variance) for better training
-        # CRITICAL: Exclude padding zeros from normalization statistics!
+        # CRITICAL: Exclude padding zeros from normalization statistics - they are computed
+        # over the non-padded frames only, and padding stays zero
         # NOTE: Keypoints are already normalized in extraction, so normalization here is optional
-        if self.normalize and split == 'train':
-            # Calculate mean and std only from non-zero (non-padded) data
-            # Create a mask: True for actual data, False for padding
-            # We'll use a simple heuristic: if a feature is all zeros across time, it's likely padding
-            # But better: track actual sequence lengths and only normalize those parts
-            
-            # Method: Calculate stats only from non-zero regions
-            # For each sample, find where actual data ends (where all features become zero)
-            # Actually, simpler: use variance to detect padding - padding has zero variance
-            # But even simpler: normalize per feature, ignoring zeros
-            
-            # Calculate mean and std per feature, but only from non-zero values
-            # This is more complex, so let's use a simpler approach:
-            # Normalize per feature across all non-padded time steps
-            
-            # Use stored sequence lengths
-            max_actual_length = max(seq_lengths) if seq_lengths else self.max_length
-            
-            # Calculate stats only from actual data (not padding)
-            # For each sample, only use data up to its actual length
-            non_padded_data = []
-            for i, seq_len in enumerate(seq_lengths):
-                non_padded_data.append(X_padded[i, :seq_len, :])
-            
-            if non_padded_data:
-                # Concatenate all non-padded data
-                all_non_padded = np.concatenate(non_padded_data, axis=0)  # Shape: (total_frames, features)
-                
-                # Calculate mean and std per feature
-                self.mean = np.mean(all_non_padded, axis=0, keepdims=True)  # Shape: (1, num_features)
-                self.std = np.std(all_non_padded, axis=0, keepdims=True) + 1e-8  # Shape: (1, num_features)
-                
-                # Reshape for broadcasting: (1, 1, num_features)
-                self.mean = self.mean.reshape(1, 1, -1)
-                self.std = self.std.reshape(1, 1, -1)
-                
-                # Normalize only non-padded parts (keep padding as zeros)
-                # This is critical - padding should stay as zeros, not be normalized
-                for i, seq_len in enumerate(seq_lengths):
-                    X_padded[i, :seq_len, :] = (X_padded[i, :seq_len, :] - self.mean[0, 0, :]) / self.std[0, 0, :]
-                # Padding remains as zeros (already zero, so no change needed)
-                
-                # Store normalization stats for val/test
-                self._normalization_mean = self.mean
-                self._normalization_std = self.std
-            else:
-                # Fallback to old method if no data
-                self.mean = np.mean(X_padded, axis=(0, 1), keepdims=True)
-                self.std = np.std(X_padded, axis=(0, 1), keepdims=True) + 1e-8
-                X_padded = (X_padded - self.mean) / self.std
-                self._normalization_mean = self.mean
-                self._normalization_std = self.std
-        elif self.normalize:
-            # Use training statistics for validation/test
-            if hasattr(self, '_normalization_mean') and hasattr(self, '_normalization_std'):
-                # Normalize only non-padded parts (keep padding as zeros)
-                for i, seq_len in enumerate(seq_lengths):
-                    X_padded[i, :seq_len, :] = (X_padded[i, :seq_len, :] - self._normalization_mean[0, 0, :]) / self._normalization_std[0, 0, :]
-                # Padding remains as zeros
+        if self.normalize and len(frames) > 0:
+            if split == 'train':
+                # Per-feature mean and std in one streaming (chunked) pass; stored for val/test
+                self._set_normalization_stats(FeatureStats(num_features).update(frames))
+                stats = self.normalization_stats
+            elif self.normalization_stats is not None:
+                # Use training statistics for validation/test
+                stats = self.normalization_stats
             else:
                 # Fallback: normalize with current data stats (shouldn't happen)
                 print("WARNING: Using fallback normalization for validation/test")
-                # Calculate stats from non-padded data
-                non_padded_data = []
-                for i, seq_len in enumerate(seq_lengths):
-                    non_padded_data.append(X_padded[i, :seq_len, :])
-                if non_padded_data:
-                    all_non_padded = np.concatenate(non_padded_data, axis=0)
-                    mean = np.mean(all_non_padded, axis=0, keepdims=True).reshape(1, 1, -1)
-                    std = np.std(all_non_padded, axis=0, keepdims=True).reshape(1, 1, -1) + 1e-8
-                    for i, seq_len in enumerate(seq_lengths):
-                        X_padded[i, :seq_len, :] = (X_padded[i, :seq_len, :] - mean[0, 0, :]) / std[0, 0, :]
+                stats = FeatureStats(num_features).update(frames)
+            frames = stats.apply(frames)
+        
+        # Scatter the frames into the padded array in one go (padding remains zeros)
+        X_padded = np.zeros((num_samples, self.max_length, num_features), dtype='float32')
+        X_padded[mask] = frames
+        
+        if cache_key is not None:
+            stats = {}
+            if self.normalize and split == 'train' and self.normalization_stats is not None:
+                stats = {'mean': self.mean, 'std': self.std, 'stats_count': self.normalization_stats.count}
+            self.cache.save(split, cache_key, X=X_padded, y=y, max_length=self.max_length, **stats)
         
         print(f"Loaded {len(X_padded)} samples")
         print(f"X shape: {X_padded.shape}")
@@ -234,6 +266,204 @@ class SignLanguageDataLoader:
         
         return X_padded, y
     
+    def _set_normalization_stats(self, stats: FeatureStats):
+        """Use training statistics for every split (also exposed as mean/std with shape (1, 1, features))"""
+        self.normalization_stats = stats
+        self.mean = stats.mean.reshape(1, 1, -1)
+        self.std = stats.std.reshape(1, 1, -1)
+        self._normalization_mean = self.mean
+        self._normalization_std = self.std
+    
+    def compute_normalization_stats(self, split: str = 'train', chunk_clips: int = 256) -> FeatureStats:
+        """
+        Per-feature statistics of a split's (sampled, truncated) frames in one streaming pass
+        
+        Clips are loaded chunk_clips at a time, so memory stays bounded however large the split is.
+        Requires max_length (set by loading or streaming the training split).
+        """
+        if self.max_length is None:
+            raise ValueError("max_length not set. Load training data first.")
+        paths = self._split_rows(split)[0]
+        stats = FeatureStats(2 * 21 * 3)
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            for start in range(0, len(paths), chunk_clips):
+                for seq in executor.map(self._load_clip, paths[start:start + chunk_clips]):
+                    if seq is not None:
+                        stats.update(seq[:self.max_length])
+        return stats
+    
+    def _clip_length(self, relative_path: str) -> int:
+        """Number of frames of a clip without reading its keypoints (None if it can't be read)"""
+        if self.shard is not None and relative_path in self.shard:
+            return self.shard.length_of(relative_path)
+        try:
+            return keypoints_file_length(resolve_keypoints_path(self.keypoints_base_dir, relative_path))
+        except Exception as e:
+            print(f"Error loading {relative_path}: {e}")
+            return None
+    
+    def _catalog_lengths(self, split_df: pd.DataFrame):
+        """Frame counts from the CSV catalog; clips that changed since (or aren't in the shard) are re-read"""
+        file_stats = load_file_stats(self.csv_path)
+        verified = dict(file_stats)
+        lengths = []
+        stale = 0
+        for path, frames, size, sha256 in zip(split_df['path'], split_df['frames'],
+                                              split_df['file_size'], split_df['sha256']):
+            if self.shard is not None and path in self.shard:
+                lengths.append(self._clip_length(path))
+            elif is_stale(resolve_keypoints_path(self.keypoints_base_dir, path), size, sha256, file_stats):
+                stale += 1
+                lengths.append(self._clip_length(path))
+            else:
+                lengths.append(int(frames))
+        if file_stats != verified:  # Files hashed this time: skip hashing them next time
+            save_file_stats(self.csv_path, file_stats)
+        if stale:
+            print(f"⚠️  {stale} clips changed since the catalog was built - run scripts/dataset_catalog.py")
+        return lengths
+    
+    def _split_rows(self, split: str):
+        """(paths, frame counts, encoded labels) of the readable clips of a split, from the catalog or headers"""
+        if split not in self._split_rows_cache:
+            split_df = self.df[self.df['split'] == split]
+            if self.has_catalog:
+                lengths = self._catalog_lengths(split_df)
+            else:
+                lengths = [self._clip_length(path) for path in split_df['path']]
+            kept = np.array([length is not None for length in lengths], dtype=bool)
+            labels = split_df['label'].to_numpy()[kept]
+            self._split_rows_cache[split] = (
+                split_df['path'].to_numpy()[kept],
+                [length for length in lengths if length is not None],
+                self.label_encoder.transform(labels) if len(labels) > 0 else np.array([], dtype=int),
+            )
+        return self._split_rows_cache[split]
+    
+    def get_split_labels(self, split: str) -> np.ndarray:
+        """Encoded labels of a split (in the order as_tf_dataset yields them without shuffling)"""
+        return self._split_rows(split)[2]
+    
+    def as_tf_dataset(self, split: str, batch_size: int = 8, shuffle_buffer: int = 1000,
+                      cache=None, seed: int = 42, augmenter=None, bucket_by_length: bool = False,
+                      num_buckets: int = 8):
+        """
+        Stream a split as a tf.data.Dataset instead of materializing it in memory
+        
+        Clips are read lazily, sampled/flattened/padded in parallel map calls and
+        prefetched. Batches match get_split_data (same padding length and normalization).
+        
+        With bucket_by_length, clips are grouped into num_buckets length ranges (quantiles of
+        the split's lengths) and each batch is padded only to its own longest clip - useful
+        with use_smart_sampling=False, where clips keep their own lengths. Batches then have
+        a variable time dimension (see build_cnn_lstm_model's mask_padding).
+        
+        Args:
+            split: 'train', 'val', or 'test'
+            batch_size: Batch size
+            shuffle_buffer: Shuffle buffer size (0 = keep CSV order, e.g. for val/test)
+            cache: None (re-read clips every epoch), '' (cache in memory after the first
+                   epoch) or a file path prefix (cache on disk)
+            seed: Shuffle and augmentation seed
+            augmenter: Optional KeypointAugmenter applied to every batch (see augmentation.py)
+            bucket_by_length: Batch clips of similar length, padded per batch
+            num_buckets: Number of length buckets (with bucket_by_length)
+            
+        Returns:
+            tf.data.Dataset of (X, y) batches with X: (batch, max_length, features)
+            (X: (batch, longest clip in the batch, features) with bucket_by_length)
+        """
+        import tensorflow as tf
+        
+        if augmenter is not None and self.normalize:
+            raise ValueError("Augmentation works on keypoint coordinates - it can't be combined with normalize=True")
+        
+        paths, lengths, y = self._split_rows(split)
+        if len(paths) == 0:
+            raise ValueError(f"No readable clips in split '{split}'")
+        
+        # Same padding length as get_split_data: smart sampling always yields target_frames
+        sampled_lengths = [self.target_frames if self.use_smart_sampling and length > 0 else length
+                           for length in lengths]
+        if split == 'train':
+            if self.max_length is None:
+                self.max_length = max(sampled_lengths)
+            self._max_length = self.max_length
+        elif self.max_length is None:
+            if not hasattr(self, '_max_length'):
+                raise ValueError("max_length not set. Load training data first.")
+            self.max_length = self._max_length
+        max_length = self.max_length
+        
+        if self.normalize and self.normalization_stats is None:
+            # Statistics always come from the training split (one streaming pass over its clips)
+            print("Computing normalization statistics (train split)...")
+            self._set_normalization_stats(self.compute_normalization_stats('train'))
+        stats = self.normalization_stats if self.normalize else None
+        num_features = 2 * 21 * 3
+        
+        def load_clip(index):
+            keypoints = self.load_keypoints(paths[int(index)])[:max_length].astype('float32', copy=False)
+            if stats is not None:
+                keypoints = stats.apply(keypoints)
+            return keypoints.reshape(-1, num_features)
+        
+        def load_padded(index):
+            keypoints = load_clip(index)
+            padded = np.zeros((max_length, num_features), dtype='float32')
+            padded[:len(keypoints)] = keypoints
+            return padded
+        
+        def load(index, label):
+            if bucket_by_length:
+                X = tf.numpy_function(load_clip, [index], tf.float32)
+                X.set_shape((None, num_features))
+            else:
+                X = tf.numpy_function(load_padded, [index], tf.float32)
+                X.set_shape((max_length, num_features))
+            return X, label
+        
+        dataset = tf.data.Dataset.from_tensor_slices((np.arange(len(paths)), y))
+        if cache is None:
+            # Shuffle the (cheap) indices, then load
+            if shuffle_buffer:
+                dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+            dataset = dataset.map(load, num_parallel_calls=tf.data.AUTOTUNE)
+        else:
+            # Load once, cache, then shuffle the cached samples every epoch
+            dataset = dataset.map(load, num_parallel_calls=tf.data.AUTOTUNE).cache(cache)
+            if shuffle_buffer:
+                dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+        
+        if bucket_by_length:
+            # Bucket upper bounds at length quantiles, so buckets hold similar numbers of clips
+            clip_lengths = np.minimum(sampled_lengths, max_length)
+            quantiles = np.quantile(clip_lengths, np.linspace(0, 1, num_buckets + 1)[1:-1])
+            boundaries = sorted(set(int(q) + 1 for q in quantiles))
+            dataset = dataset.bucket_by_sequence_length(
+                lambda X, label: tf.shape(X)[0], boundaries, [batch_size] * (len(boundaries) + 1))
+        else:
+            dataset = dataset.batch(batch_size)
+        if augmenter is not None:
+            # Whole batches at once, after the cache so every epoch sees new augmentations. Each
+            # batch draws from its own generator, seeded by a seeded per-epoch stream of keys, so
+            # parallel map calls don't share one (thread-unsafe) generator and the augmentation of
+            # every batch is reproducible whatever the thread scheduling
+            def augment_batch(batch, key):
+                return augmenter(batch, rng=np.random.default_rng(int(key) & 0x7FFFFFFFFFFFFFFF))
+            
+            def augment(batch, key):
+                X, label = batch
+                X = tf.numpy_function(augment_batch, [X, key], tf.float32)
+                X.set_shape((None, None if bucket_by_length else max_length, num_features))
+                return X, label
+            
+            keys = tf.data.Dataset.random(seed=seed, rerandomize_each_iteration=True)
+            dataset = tf.data.Dataset.zip((dataset, keys)).map(augment, num_parallel_calls=tf.data.AUTOTUNE)
+        
+        print(f"Streaming {split} data: {len(paths)} samples, max_length {max_length}")
+        return dataset.prefetch(tf.data.AUTOTUNE)
+    
     def get_all_splits(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
         """
         Get all splits (train, val, test)
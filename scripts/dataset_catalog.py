@@ -0,0 +1,226 @@
+"""
+Per-clip metadata for the dataset CSV
+
+Next to path,label,split, create_csv_dataset() writes for every clip:
+    - frames, shape and dtype of the stored keypoints
+    - hand0_presence / hand1_presence: fraction of frames in which each hand slot was detected
+    - file_size and sha256 of the file the clip is read from (.npy or .kpc)
+Each file is read once (hash and decode from the same bytes), on a thread pool.
+Unreadable clips keep empty metadata columns.
+
+The CSV is committed, so it holds nothing machine-specific: file mtimes live in a
+local, untracked sidecar next to it (dataset.csv -> dataset.file_stats.json) that
+maps each file to its (size, mtime_ns, sha256) when last verified, like the
+preprocessed cache's file_hashes.json.
+
+SignLanguageDataLoader plans splits (frame counts, bucketing) from these columns
+and only opens a clip's file when it no longer matches the catalog: a different
+size, or - when its mtime isn't the one recorded in the sidecar (fresh clone, touched
+file) - a different sha256. Add or refresh the columns of an existing CSV (only
+stale rows are re-read):
+
+    python scripts/dataset_catalog.py Data/Labels/dataset.csv
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.dataset_shard import resolve_keypoints_path
+from scripts.extract_keypoints import hash_file
+from scripts.file_utils import atomic_write
+from scripts.keypoint_format import COMPACT_SUFFIX, compact_header, decode_compact, resolve_keypoints_file
+
+NUM_HAND_SLOTS = 2
+CATALOG_COLUMNS = ['frames', 'shape', 'dtype'] + [f"hand{i}_presence" for i in range(NUM_HAND_SLOTS)] + [
+    'file_size', 'sha256']
+FILE_STATS_SUFFIX = ".file_stats.json"
+
+
+def describe_clip(path):
+    """
+    Metadata of one keypoints clip (see resolve_keypoints_file for which file is read)
+
+    Args:
+        path: Path of the clip's .npy (or .kpc) file
+
+    Returns:
+        dict with the CATALOG_COLUMNS, plus 'file' (the file read) and 'mtime_ns' for
+        the file stats sidecar
+    """
+    path = resolve_keypoints_file(path)
+    stat = path.stat()
+    data = path.read_bytes()
+    if path.suffix == COMPACT_SUFFIX:
+        keypoints = decode_compact(data)
+        dtype = compact_header(data)['dtype']
+    else:
+        keypoints = np.load(io.BytesIO(data))
+        dtype = keypoints.dtype.name
+
+    presence = np.zeros(NUM_HAND_SLOTS)
+    if len(keypoints):
+        hands = keypoints.reshape(keypoints.shape[0], keypoints.shape[1], -1).any(axis=2).mean(axis=0)
+        presence[:len(hands)] = hands[:NUM_HAND_SLOTS]
+
+    metadata = {
+        'frames': int(keypoints.shape[0]),
+        'shape': "x".join(str(n) for n in keypoints.shape),
+        'dtype': dtype,
+    }
+    metadata.update({f"hand{i}_presence": round(float(ratio), 4) for i, ratio in enumerate(presence)})
+    metadata.update({
+        'file_size': stat.st_size,
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'file': path,
+        'mtime_ns': stat.st_mtime_ns,
+    })
+    return metadata
+
+
+def _describe_or_none(path):
+    try:
+        return describe_clip(path)
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        return None
+
+
+def describe_clips(paths, num_workers=None):
+    """describe_clip for many clips on a thread pool (None for clips that can't be read)"""
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        return list(executor.map(_describe_or_none, paths))
+
+
+def file_stats_path(csv_path):
+    """Local file stats sidecar of a dataset CSV (dataset.csv -> dataset.file_stats.json)"""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(f"{csv_path.stem}{FILE_STATS_SUFFIX}")
+
+
+def load_file_stats(csv_path):
+    """File stats sidecar of a dataset CSV: {absolute file path: {size, mtime_ns, sha256}} (empty if missing)"""
+    path = file_stats_path(csv_path)
+    if path.exists():
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def save_file_stats(csv_path, file_stats):
+    """Write the file stats sidecar of a dataset CSV (atomically)"""
+    atomic_write(file_stats_path(csv_path), lambda f: json.dump(file_stats, f), mode='w')
+
+
+def record_file_stats(file_stats, metadata):
+    """Remember the size, mtime and hash of a file describe_clip just read"""
+    file_stats[str(Path(metadata['file']).absolute())] = {
+        'size': metadata['file_size'], 'mtime_ns': metadata['mtime_ns'], 'sha256': metadata['sha256']}
+
+
+def is_stale(path, file_size, sha256, file_stats=None):
+    """
+    Whether a clip changed since it was cataloged
+
+    True when the file is gone, when the catalog has no entry (NaN), when its size
+    differs (e.g. a newer .kpc / .npy now takes precedence) or when its contents no
+    longer hash to sha256. The file is only hashed when file_stats (see
+    load_file_stats) has no entry with its current size and mtime; files that hash
+    to sha256 are then recorded in file_stats.
+    """
+    if file_size != file_size or not isinstance(sha256, str):  # NaN: not cataloged
+        return True
+    try:
+        path = resolve_keypoints_file(path)
+        stat = path.stat()
+    except FileNotFoundError:
+        return True
+    if stat.st_size != int(file_size):
+        return True
+
+    key = str(path.absolute())
+    entry = (file_stats or {}).get(key)
+    if entry is not None and (entry['size'], entry['mtime_ns'], entry['sha256']) == (
+            stat.st_size, stat.st_mtime_ns, sha256):
+        return False
+    if hash_file(path) != sha256:
+        return True
+    if file_stats is not None:
+        file_stats[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+    return False
+
+
+def has_catalog(df):
+    """Whether a dataset DataFrame carries the catalog columns"""
+    return all(column in df.columns for column in CATALOG_COLUMNS)
+
+
+def update_catalog(csv_path, keypoints_base_dir, num_workers=None):
+    """
+    Add the catalog columns to a dataset CSV, or refresh the rows whose file changed
+
+    Args:
+        csv_path: Dataset CSV (path,label,split[, catalog columns])
+        keypoints_base_dir: Base directory of the CSV paths (e.g. Data/Keypoints/rawVideos)
+        num_workers: Threads used to read clips
+
+    Returns:
+        dict with 'clips', 'refreshed' and 'unreadable' counts
+    """
+    import pandas as pd
+
+    csv_path = Path(csv_path)
+    df = pd.read_csv(csv_path)
+    df = df.drop(columns=['mtime_ns'], errors='ignore')  # Written by older versions of the catalog
+    for column in CATALOG_COLUMNS:
+        if column not in df.columns:
+            df[column] = np.nan
+    df = df.astype({column: object for column in CATALOG_COLUMNS})
+
+    file_stats = load_file_stats(csv_path)
+    files = [resolve_keypoints_path(keypoints_base_dir, p) for p in df['path']]
+    stale = [i for i, (path, size, sha256) in enumerate(zip(files, df['file_size'], df['sha256']))
+             if is_stale(path, size, sha256, file_stats)]
+    unreadable = 0
+    for i, metadata in zip(stale, describe_clips([files[i] for i in stale], num_workers)):
+        if metadata is None:
+            unreadable += 1
+            metadata = dict.fromkeys(CATALOG_COLUMNS, np.nan)
+        else:
+            record_file_stats(file_stats, metadata)
+        for column in CATALOG_COLUMNS:
+            df.at[df.index[i], column] = metadata[column]
+
+    atomic_write(csv_path, lambda f: df.to_csv(f, index=False, lineterminator='\n'), mode='w', encoding='utf-8')
+    save_file_stats(csv_path, file_stats)
+    return {'clips': len(df), 'refreshed': len(stale), 'unreadable': unreadable}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add or refresh the per-clip metadata columns of a dataset CSV")
+    parser.add_argument("csv", type=str, nargs="?", default="Data/Labels/dataset.csv",
+                       help="Dataset CSV to update in place (default: Data/Labels/dataset.csv)")
+    parser.add_argument("--keypoints-dir", type=str, default="Data/Keypoints/rawVideos",
+                       help="Base directory of the CSV paths (default: Data/Keypoints/rawVideos)")
+    parser.add_argument("--workers", type=int, default=None,
+                       help="Threads used to read clips (default: ThreadPoolExecutor's default)")
+    args = parser.parse_args()
+
+    summary = update_catalog(args.csv, args.keypoints_dir, num_workers=args.workers)
+    print(f"✅ {args.csv}: {summary['clips']} clips, {summary['refreshed']} (re)cataloged, "
+          f"{summary['unreadable']} unreadable")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Pack a keypoints dataset into a single memory-mapped shard
+
+Loading the dataset file by file opens (and parses the header of) every clip, for
+every split and every script that needs the data. A shard is a directory with:
+    - keypoints.npy: every clip's frames concatenated into one (total_frames, 2, 21, 3) array
+    - index.json:    per clip, its CSV path, label, split, offset and length in keypoints.npy
+
+DatasetShard memory-maps keypoints.npy, so a clip is a zero-copy view into it.
+SignLanguageDataLoader reads clips from a shard when one is given:
+
+    python scripts/dataset_shard.py --csv Data/Labels/dataset.csv --output Data/Shards/dataset
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.file_utils import atomic_write
+from scripts.keypoint_format import load_keypoints_file
+
+SHARD_VERSION = 1
+SHARD_DATA_NAME = "keypoints.npy"
+SHARD_INDEX_NAME = "index.json"
+
+
+def resolve_keypoints_path(keypoints_base_dir, relative_path):
+    """
+    Map a CSV path to a file under keypoints_base_dir - handles both formats:
+    "keypoints/LABEL/file.npy" (old format) and "LABEL/file.npy" (new format)
+    """
+    if relative_path.startswith("keypoints/"):
+        relative_path = relative_path.replace("keypoints/", "", 1)
+    return Path(keypoints_base_dir) / relative_path
+
+
+def _hash_csv(csv_path):
+    return hashlib.sha256(Path(csv_path).read_bytes()).hexdigest()[:16]
+
+
+def pack_dataset_shard(csv_path, keypoints_base_dir, output_dir):
+    """
+    Concatenate every clip listed in a dataset CSV into one shard
+
+    Args:
+        csv_path: Path to CSV file with columns: path, label, split
+        keypoints_base_dir: Base directory where keypoint files are stored
+        output_dir: Shard directory to (over)write
+
+    Returns:
+        dict with 'clips', 'frames', 'bytes' and 'missing' (CSV paths that couldn't be loaded)
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    clips = []
+    entries = []
+    missing = []
+    offset = 0
+    for path, label, split in zip(df['path'], df['label'], df['split']):
+        try:
+            keypoints = load_keypoints_file(resolve_keypoints_path(keypoints_base_dir, path))
+        except (OSError, ValueError) as e:
+            missing.append((path, str(e)))
+            continue
+        clips.append(keypoints)
+        entries.append({'path': path, 'label': label, 'split': split,
+                        'offset': offset, 'length': len(keypoints)})
+        offset += len(keypoints)
+
+    if not clips:
+        raise ValueError(f"No clips from {csv_path} could be loaded from {keypoints_base_dir}")
+    frame_shape = clips[0].shape[1:]
+    if any(clip.shape[1:] != frame_shape for clip in clips):
+        raise ValueError("All clips in a shard must have the same frame shape")
+    dtype = np.result_type(*clips)
+
+    # Write the data and then the index, each atomically - the index is what marks the shard as complete
+    def write_data(f):
+        # .npy header for the whole array, then the clips in offset order
+        np.lib.format.write_array_header_1_0(f, {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                                                 'fortran_order': False, 'shape': (offset,) + frame_shape})
+        for clip in clips:
+            f.write(np.ascontiguousarray(clip, dtype=dtype).tobytes())
+
+    atomic_write(output_dir / SHARD_DATA_NAME, write_data)
+
+    index = {
+        'version': SHARD_VERSION,
+        'csv_hash': _hash_csv(csv_path),
+        'dtype': np.dtype(dtype).name,
+        'frame_shape': list(frame_shape),
+        'clips': entries,
+    }
+    atomic_write(output_dir / SHARD_INDEX_NAME, lambda f: json.dump(index, f), mode='w')
+
+    return {'clips': len(entries), 'frames': offset,
+            'bytes': (output_dir / SHARD_DATA_NAME).stat().st_size, 'missing': missing}
+
+
+class DatasetShard:
+    """Read-only view of a packed shard: clips are zero-copy slices of one memory-mapped array"""
+
+    def __init__(self, shard_dir):
+        self.shard_dir = Path(shard_dir)
+        with open(self.shard_dir / SHARD_INDEX_NAME) as f:
+            index = json.load(f)
+        if index.get('version') != SHARD_VERSION:
+            raise ValueError(f"Unsupported shard version {index.get('version')} in {self.shard_dir}")
+        self.csv_hash = index['csv_hash']
+
+        clips = index['clips']
+        self.paths = [entry['path'] for entry in clips]
+        self.labels = np.array([entry['label'] for entry in clips])
+        self.splits = np.array([entry['split'] for entry in clips])
+        self.offsets = np.array([entry['offset'] for entry in clips], dtype=np.int64)
+        self.lengths = np.array([entry['length'] for entry in clips], dtype=np.int64)
+        self._position = {path: i for i, path in enumerate(self.paths)}
+
+        self.data = np.load(self.shard_dir / SHARD_DATA_NAME, mmap_mode='r')
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        return path in self._position
+
+    def matches_csv(self, csv_path):
+        """Whether the shard was packed from this exact CSV"""
+        return self.csv_hash == _hash_csv(csv_path)
+
+    def clip(self, i):
+        """Clip i as a read-only view with shape (num_frames, 2, 21, 3)"""
+        start = self.offsets[i]
+        return self.data[start:start + self.lengths[i]]
+
+    def get(self, path):
+        """Clip for a CSV path (as written in the dataset CSV)"""
+        return self.clip(self._position[path])
+
+    def length_of(self, path):
+        """Number of frames of the clip for a CSV path, without touching the data"""
+        return int(self.lengths[self._position[path]])
+
+    def split_indices(self, split):
+        """Positions of the clips in a split, in CSV order"""
+        return np.flatnonzero(self.splits == split)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack all clips of a dataset CSV into one memory-mapped shard")
+    parser.add_argument("--csv", type=str, default="Data/Labels/dataset.csv",
+                       help="Path to CSV file with dataset info")
+    parser.add_argument("--keypoints-dir", type=str, default="Data/Keypoints/rawVideos",
+                       help="Directory containing keypoint files")
+    parser.add_argument("--output", type=str, default="Data/Shards/dataset",
+                       help="Shard directory to write")
+    args = parser.parse_args()
+
+    print(f"Packing {args.csv} into {args.output}...")
+    summary = pack_dataset_shard(args.csv, args.keypoints_dir, args.output)
+    print(f"✅ Packed {summary['clips']} clips ({summary['frames']} frames, {summary['bytes'] / 2**20:.2f} MB)")
+    if summary['missing']:
+        print(f"⚠️  {len(summary['missing'])} clips could not be loaded and were left out:")
+        for path, error in summary['missing'][:10]:
+            print(f"   {path}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Export a trained model to TF Lite for SignLanguagePredictor's interpreter backend
+
+Writes one .tflite file per variant next to the model (best_model.keras ->
+best_model.float32.tflite, ...):
+    - float32: same weights and ops, exact up to float rounding
+    - float16: weights stored as float16 (half the size)
+    - int8: dynamic-range quantization (int8 weights, float activations)
+
+The export takes a single clip with a fixed (1, time, 126) input: TF Lite can then
+unroll the BiLSTM into builtin ops. Variable-length (length-bucketed) models are
+exported at their longest training clip and mask the padding as usual.
+
+    python scripts/export_tflite.py models/run_.../best_model.keras
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.file_utils import atomic_write
+from scripts.inference_backends import TFLITE_SUFFIX
+
+TFLITE_VARIANTS = ("float32", "float16", "int8")
+
+
+def tflite_path(model_path, variant, output_dir=None):
+    """Path of a model's TF Lite export (best_model.keras -> best_model.<variant>.tflite)"""
+    model_path = Path(model_path)
+    return Path(output_dir or model_path.parent) / f"{model_path.stem}.{variant}{TFLITE_SUFFIX}"
+
+
+def _save_serving_model(model, directory, input_spec):
+    """SavedModel with one serving signature for input_spec (Keras 3 export, or tf.saved_model on Keras 2)"""
+    import tensorflow as tf
+
+    if int(tf.keras.__version__.split(".")[0]) >= 3:
+        model.export(directory, verbose=False, input_signature=[input_spec])
+        return
+    # TF 2.13 - 2.15 (Keras 2): Model.export has no input_signature
+    serve = tf.function(lambda X: model(X, training=False), input_signature=[input_spec])
+    tf.saved_model.save(model, directory, signatures=serve.get_concrete_function())
+
+
+def export_tflite(model_path, variants=TFLITE_VARIANTS, output_dir=None):
+    """
+    Convert a .keras model to TF Lite
+
+    Args:
+        model_path: Trained .keras model (its run directory provides training_params.json)
+        variants: Any of 'float32', 'float16', 'int8'
+        output_dir: Directory of the .tflite files (default: the model's directory)
+
+    Returns:
+        dict mapping each variant to its .tflite path
+    """
+    import tensorflow as tf
+    from scripts.model_cnn_lstm import load_sign_model
+
+    unknown = set(variants) - set(TFLITE_VARIANTS)
+    if unknown:
+        raise ValueError(f"Unknown TF Lite variants: {sorted(unknown)} (expected some of {TFLITE_VARIANTS})")
+
+    model_path = Path(model_path)
+    model = load_sign_model(model_path)
+    steps, num_features = model.input_shape[1:]
+    if steps is None:
+        training_params_path = model_path.parent / "training_params.json"
+        training_params = {}
+        if training_params_path.exists():
+            with open(training_params_path) as f:
+                training_params = json.load(f)
+        steps = training_params.get('max_clip_length') or 96
+
+    exported = {}
+    saved_model_dir = tempfile.mkdtemp(prefix="tflite_export_")
+    try:
+        _save_serving_model(model, saved_model_dir, tf.TensorSpec((1, steps, num_features), tf.float32))
+        for variant in variants:
+            converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+            if variant != "float32":
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            if variant == "float16":
+                converter.target_spec.supported_types = [tf.float16]
+            data = converter.convert()
+
+            exported[variant] = atomic_write(tflite_path(model_path, variant, output_dir), lambda f: f.write(data))
+    finally:
+        shutil.rmtree(saved_model_dir, ignore_errors=True)
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a trained .keras model to TF Lite")
+    parser.add_argument("model", type=str, help="Path to the trained model (.keras file)")
+    parser.add_argument("--variants", type=str, nargs="+", choices=TFLITE_VARIANTS, default=list(TFLITE_VARIANTS),
+                       help="Variants to write (default: all)")
+    parser.add_argument("--output-dir", type=str, default=None,
+                       help="Directory of the .tflite files (default: next to the model)")
+    args = parser.parse_args()
+
+    model_size = Path(args.model).stat().st_size
+    for variant, path in export_tflite(args.model, args.variants, args.output_dir).items():
+        print(f"✅ {variant:<8} {path} ({path.stat().st_size / 2**20:.2f} MB, "
+              f"{model_size / path.stat().st_size:.1f}x smaller than the .keras file)")
+
+
+if __name__ == "__main__":
+    main()
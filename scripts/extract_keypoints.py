@@ -1,26 +1,84 @@
 import os
+import hashlib
+import json
+import multiprocessing
+import queue
+import threading
 import cv2
 import numpy as np
 from pathlib import Path
 from tqdm import tqdm
 import urllib.request
+from collections import namedtuple
+from functools import lru_cache
+from operator import attrgetter
+from types import SimpleNamespace
+import sys
 
-try:
-    # Try new API (MediaPipe 0.10+)
-    from mediapipe.tasks import python
-    from mediapipe.tasks.python import vision
-    from mediapipe import Image, ImageFormat
-    USE_NEW_API = True
-except ImportError:
-    # Fall back to old API
-    import mediapipe as mp
-    USE_NEW_API = False
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.file_utils import atomic_write
+
+
+@lru_cache(maxsize=None)
+def _mediapipe():
+    """
+    Import MediaPipe on first use - it takes seconds, and most importers of this module
+    (data loading, training, the web app before its first video) never detect hands
+    
+    Returns:
+        SimpleNamespace with new_api and either python/vision/Image/ImageFormat
+        (MediaPipe 0.10+) or mp (older versions)
+    """
+    try:
+        # Try new API (MediaPipe 0.10+)
+        from mediapipe.tasks import python
+        from mediapipe.tasks.python import vision
+        from mediapipe import Image, ImageFormat
+        return SimpleNamespace(new_api=True, python=python, vision=vision, Image=Image, ImageFormat=ImageFormat)
+    except ImportError:
+        # Fall back to old API
+        import mediapipe as mp
+        return SimpleNamespace(new_api=False, mp=mp)
+
+
+def __getattr__(name):
+    # USE_NEW_API is resolved lazily, so reading it is what imports MediaPipe
+    if name == 'USE_NEW_API':
+        return _mediapipe().new_api
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Model URL for Hand Landmarker
 MODEL_URL = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task"
 MODELS_DIR = Path("models")
 MODEL_PATH = MODELS_DIR / "hand_landmarker.task"
 
+# Incremental extraction manifest (one per keypoints output directory)
+MANIFEST_NAME = "extraction_manifest.json"
+MANIFEST_VERSION = 1
+# Bump when a code change alters extracted keypoints, so existing outputs are re-extracted
+EXTRACTION_VERSION = 1
+# HandKeypointExtractor settings used by process_all_videos
+DEFAULT_EXTRACTOR_OPTIONS = {
+    'max_hands': 2,
+    'min_detection_confidence': 0.3,
+    'min_presence_confidence': 0.3,
+    'min_tracking_confidence': 0.3,
+    'normalization': 'minimal',
+    'target_fps': None,
+    'max_side': None,
+    'running_mode': 'image',
+}
+# Settings at these values match extraction before the setting existed, so they are
+# left out of the config hash and don't invalidate existing outputs
+CONFIG_HASH_NEUTRAL_VALUES = {
+    'target_fps': None,
+    'max_side': None,
+    'running_mode': 'image',
+}
+# Frame rate assumed for VIDEO mode timestamps when it is unknown
+DEFAULT_STREAM_FPS = 30.0
+
 def download_model_if_needed():
     """Download the Hand Landmarker model if it doesn't exist"""
     # Create models directory if it doesn't exist
@@ -32,7 +90,7 @@ def download_model_if_needed():
         print(f"Model downloaded to {MODEL_PATH}")
     return str(MODEL_PATH)
 
-def normalize_keypoints(keypoints_array, minimal=False):
+def normalize_keypoints(keypoints_array, minimal=False, dtype=np.float32):
     """
     Advanced normalization for hand keypoints to make recognition invariant to:
     1. Hand position in frame (translation)
@@ -40,15 +98,24 @@ def normalize_keypoints(keypoints_array, minimal=False):
     3. Left/Right hand (mirror to consistent orientation) - only if minimal=False
     4. Hand rotation in XY plane (align to consistent direction) - only if minimal=False
     
+    All frames and hands are processed at once with array operations, so a
+    whole clip (or a stack of clips) costs a handful of NumPy calls instead of
+    one Python iteration per frame and hand.
+    
     Args:
         keypoints_array: numpy array with shape (num_frames, num_hands, 21, 3)
+                         or a stack of clips (num_clips, num_frames, num_hands, 21, 3)
         minimal: If True, only translate (no rotate/scale) - preserves more differences
+        dtype: Output/compute dtype (default: float32). None keeps the input dtype.
     
     Returns:
         Normalized numpy array with same shape
     """
     # Create a copy to avoid modifying original
-    normalized = keypoints_array.copy()
+    normalized = np.array(keypoints_array, dtype=dtype, copy=True)
+    
+    if normalized.size == 0:
+        return normalized
     
     # MediaPipe landmark indices
     WRIST_IDX = 0
@@ -56,138 +123,107 @@ def normalize_keypoints(keypoints_array, minimal=False):
     INDEX_FINGER_MCP_IDX = 5
     PINKY_MCP_IDX = 17
     
-    num_frames, num_hands, num_keypoints, num_coords = normalized.shape
+    # Wrist of every hand in the batch: shape (..., 1, 3)
+    wrist = normalized[..., WRIST_IDX:WRIST_IDX + 1, :]
     
-    for frame_idx in range(num_frames):
-        for hand_idx in range(num_hands):
-            hand_keypoints = normalized[frame_idx, hand_idx, :, :].copy()  # Shape: (21, 3)
-            
-            # Check if hand was detected (wrist not at origin)
-            wrist = hand_keypoints[WRIST_IDX, :]
-            
-            # Skip normalization if no hand detected (all zeros)
-            if np.allclose(wrist, 0.0):
-                continue
-            
-            # Step 1: Translate so wrist is at (0, 0, 0)
-            hand_keypoints = hand_keypoints - wrist
-            
-            # If minimal normalization, stop here (preserve size/rotation differences)
-            if minimal:
-                normalized[frame_idx, hand_idx, :, :] = hand_keypoints
-                continue
-            
-            # Step 2: Determine if left or right hand and flip if needed
-            # Use the direction from wrist to index finger MCP to determine hand orientation
-            index_mcp = hand_keypoints[INDEX_FINGER_MCP_IDX, :]
-            pinky_mcp = hand_keypoints[PINKY_MCP_IDX, :]
-            
-            # Cross product to determine hand orientation
-            # For right hand: index is to the right, pinky is to the left (in camera view)
-            # We want to normalize to a consistent orientation (right-hand orientation)
-            hand_direction = index_mcp - pinky_mcp
-            
-            # If the x-component is negative, it's likely a left hand, flip it
-            if hand_direction[0] < 0:
-                # Mirror the hand across the YZ plane (flip X coordinates)
-                hand_keypoints[:, 0] = -hand_keypoints[:, 0]
-            
-            # Step 3: Rotate hand to align with a consistent direction
-            # Align the hand so the middle finger MCP is in a consistent direction
-            middle_mcp = hand_keypoints[MIDDLE_FINGER_MCP_IDX, :]
-            
-            # Project to XY plane for rotation alignment
-            middle_mcp_xy = middle_mcp[:2]
-            middle_mcp_xy_norm = np.linalg.norm(middle_mcp_xy)
-            
-            if middle_mcp_xy_norm > 1e-6:
-                # Calculate angle to align middle finger MCP to positive Y direction
-                target_direction = np.array([0.0, 1.0])
-                current_direction = middle_mcp_xy / middle_mcp_xy_norm
-                
-                # Calculate rotation angle
-                cos_angle = np.dot(current_direction, target_direction)
-                sin_angle = np.cross(current_direction, target_direction)
-                angle = np.arctan2(sin_angle, cos_angle)
-                
-                # Apply rotation to XY plane
-                cos_a = np.cos(-angle)
-                sin_a = np.sin(-angle)
-                rotation_matrix = np.array([[cos_a, -sin_a, 0],
-                                          [sin_a, cos_a, 0],
-                                          [0, 0, 1]])
-                
-                # Rotate all keypoints
-                hand_keypoints = hand_keypoints @ rotation_matrix.T
-            
-            # Step 4: Scale by hand size (distance from wrist to middle finger MCP)
-            middle_mcp = hand_keypoints[MIDDLE_FINGER_MCP_IDX, :]
-            hand_size = np.linalg.norm(middle_mcp)
-            
-            # Avoid division by zero
-            if hand_size > 1e-6:  # Very small threshold
-                hand_keypoints = hand_keypoints / hand_size
-            
-            normalized[frame_idx, hand_idx, :, :] = hand_keypoints
+    # Hand was detected if the wrist is not at the origin (same test as np.allclose(wrist, 0))
+    # Missing hands (all zeros) are left untouched
+    present = np.any(np.abs(wrist) > 1e-8, axis=(-2, -1))  # Shape: (...)
+    if not present.any():
+        return normalized
+    
+    # Step 1: Translate so wrist is at (0, 0, 0)
+    hands = normalized - wrist
+    
+    # If minimal normalization, stop here (preserve size/rotation differences)
+    if not minimal:
+        # Step 2: Mirror left hands (index MCP left of pinky MCP) across the YZ plane
+        hand_direction = hands[..., INDEX_FINGER_MCP_IDX, :] - hands[..., PINKY_MCP_IDX, :]
+        flip = hand_direction[..., 0] < 0
+        hands[..., 0] = np.where(flip[..., np.newaxis], -hands[..., 0], hands[..., 0])
+        
+        # Step 3: Rotate each hand in the XY plane based on the middle finger MCP direction
+        middle_mcp_xy = hands[..., MIDDLE_FINGER_MCP_IDX, :2]
+        middle_mcp_xy_norm = np.hypot(middle_mcp_xy[..., 0], middle_mcp_xy[..., 1])
+        can_rotate = middle_mcp_xy_norm > 1e-6
+        safe_norm = np.where(can_rotate, middle_mcp_xy_norm, 1.0)
+        
+        # Unit direction (dx, dy) of the middle finger MCP. The rotation angle is
+        # atan2(dx, dy), applied as a rotation by -angle, so
+        # cos(-angle) = dy and sin(-angle) = -dx (identity when the hand can't be rotated)
+        cos_a = np.where(can_rotate, middle_mcp_xy[..., 1] / safe_norm, 1.0)[..., np.newaxis]
+        sin_a = np.where(can_rotate, -middle_mcp_xy[..., 0] / safe_norm, 0.0)[..., np.newaxis]
+        x = hands[..., 0].copy()
+        y = hands[..., 1]
+        hands[..., 0] = cos_a * x - sin_a * y
+        hands[..., 1] = sin_a * x + cos_a * y
+        
+        # Step 4: Scale by hand size (distance from wrist to middle finger MCP)
+        hand_size = np.linalg.norm(hands[..., MIDDLE_FINGER_MCP_IDX, :], axis=-1)
+        
+        # Avoid division by zero
+        hand_size = np.where(hand_size > 1e-6, hand_size, 1.0)
+        hands /= hand_size[..., np.newaxis, np.newaxis]
+    
+    normalized = np.where(present[..., np.newaxis, np.newaxis], hands, normalized)
     
     return normalized
 
-def smart_frame_sampling(keypoints_array, target_frames=96, skip_start_ratio=0.2):
+SamplingPlan = namedtuple('SamplingPlan', ['indices', 'weights'])
+SamplingPlan.__doc__ = """
+Precomputed frame selection for smart_frame_sampling
+
+Fields:
+    indices: int array with shape (target_frames, 2) - source frames to blend (left, right)
+    weights: float64 array with shape (target_frames,) - blend weight of the right frame,
+             or None when the plan is a plain gather of the left frames
+"""
+
+
+@lru_cache(maxsize=1024)
+def get_sampling_plan(num_frames, target_frames=96, skip_start_ratio=0.2):
     """
-    Smart frame sampling that focuses on the relevant part of the video.
+    Build (and cache) the sampling plan smart_frame_sampling uses for a clip length.
     
-    Problem: Short videos (~30 frames) and similar start in all videos.
-    Solution:
-    1. Skip the first frames (similar start)
-    2. Focus on middle/end part (the actual gesture)
-    3. Use temporal interpolation if video is too short
+    The plan only depends on the clip length and the sampling parameters, so it is
+    computed once per (num_frames, target_frames, skip_start_ratio) and reused for
+    every clip of that length.
     
     Args:
-        keypoints_array: numpy array with shape (num_frames, num_hands, 21, 3)
-        target_frames: desired number of frames (default: 96, matching model input)
-        skip_start_ratio: portion of start to skip (0.2 = 20% of start)
+        num_frames: number of frames in the source clip (must be > 0)
+        target_frames: desired number of frames
+        skip_start_ratio: portion of start to skip
     
     Returns:
-        numpy array with shape (target_frames, num_hands, 21, 3)
+        SamplingPlan (arrays are read-only since plans are shared)
     """
-    num_frames = len(keypoints_array)
-    
-    if num_frames == 0:
-        return keypoints_array
+    skip_frames = max(1, int(num_frames * skip_start_ratio))
+    weights = None
     
     # If video is shorter than target, use temporal interpolation
     if num_frames <= target_frames:
         # Skip the start (similar part)
-        skip_frames = max(1, int(num_frames * skip_start_ratio))
-        relevant = keypoints_array[skip_frames:]
+        start = min(skip_frames, num_frames)
+        num_relevant = num_frames - start
         
-        if len(relevant) < 2:
-            # If less than 2 frames remain, repeat them
-            if len(relevant) == 0:
-                # If no frames, return original
-                relevant = keypoints_array
-            # Repeat frames
-            repeat_factor = (target_frames // len(relevant)) + 1
-            repeated = np.tile(relevant, (repeat_factor, 1, 1, 1))
-            return repeated[:target_frames]
-        
-        # Temporal interpolation to extend the video
-        indices = np.linspace(0, len(relevant)-1, target_frames)
-        sampled = []
-        for idx in indices:
-            idx_int = int(idx)
-            if idx_int < len(relevant) - 1:
-                # Linear interpolation between frames
-                alpha = idx - idx_int
-                frame = (1-alpha) * relevant[idx_int] + alpha * relevant[idx_int+1]
-            else:
-                frame = relevant[-1]
-            sampled.append(frame)
-        return np.array(sampled)
+        if num_relevant < 2:
+            # If less than 2 frames remain, repeat them (or the whole clip if none remain)
+            if num_relevant == 0:
+                start, num_relevant = 0, num_frames
+            left = start + np.arange(target_frames) % num_relevant
+            right = left
+        else:
+            # Temporal interpolation to extend the video
+            positions = np.linspace(0, num_relevant - 1, target_frames)
+            floor = positions.astype(np.int64)
+            interpolate = floor < num_relevant - 1
+            left = start + np.where(interpolate, floor, num_relevant - 1)
+            right = start + np.where(interpolate, floor + 1, num_relevant - 1)
+            # Last frame(s) use a zero weight: (1 - 0) * a + 0 * a == a for finite values
+            weights = np.where(interpolate, positions - floor, 0.0)
     
     else:
         # Long video - skip start, take more from end
-        skip_frames = max(1, int(num_frames * skip_start_ratio))
         start_idx = skip_frames
         end_idx = num_frames
         
@@ -198,208 +234,781 @@ def smart_frame_sampling(keypoints_array, target_frames=96, skip_start_ratio=0.2
         first_part_frames = int(target_frames * 0.3)
         second_part_frames = target_frames - first_part_frames
         
-        indices = []
-        
+        parts = [np.empty(0, dtype=int)]
         if first_part_frames > 0:
-            indices.extend(np.linspace(start_idx, mid_point, first_part_frames, dtype=int))
-        
+            parts.append(np.linspace(start_idx, mid_point, first_part_frames, dtype=int))
         if second_part_frames > 0:
-            indices.extend(np.linspace(mid_point, end_idx-1, second_part_frames, dtype=int))
+            parts.append(np.linspace(mid_point, end_idx - 1, second_part_frames, dtype=int))
         
-        indices = sorted(set(indices))  # Remove duplicates
+        indices = np.unique(np.concatenate(parts)).tolist()  # Sorted, duplicates removed
         
         # If less than target_frames, complete from end
-        while len(indices) < target_frames and end_idx - 1 not in indices:
+        present = set(indices)
+        while len(indices) < target_frames and end_idx - 1 not in present:
             indices.append(end_idx - 1)
+            present.add(end_idx - 1)
             end_idx -= 1
             if end_idx <= start_idx:
                 break
         
         # Trim if too many
-        indices = sorted(indices)[:target_frames]
-        return keypoints_array[indices]
+        left = np.array(sorted(indices)[:target_frames], dtype=int)
+        right = left
+    
+    plan_indices = np.stack([left, right], axis=1)
+    plan_indices.setflags(write=False)
+    if weights is not None:
+        weights.setflags(write=False)
+    return SamplingPlan(plan_indices, weights)
 
-def extract_hand_keypoints_from_video(video_path, max_hands=2):
+
+def apply_sampling_plan(keypoints_array, plan):
     """
-    Extracts hand keypoints from a video using MediaPipe Hand Landmarker
+    Apply a SamplingPlan with a single gather (and lerp) over the frame axis.
     
     Args:
-        video_path: Path to the video file
-        max_hands: Maximum number of hands to detect (1 or 2)
+        keypoints_array: clip (num_frames, num_hands, 21, 3) or stack of clips
+                         (num_clips, num_frames, num_hands, 21, 3) of equal length
+        plan: SamplingPlan from get_sampling_plan
     
     Returns:
-        numpy array with shape (num_frames, num_hands, 21, 3) 
-        where each hand contains 21 keypoints with coordinates (x, y, z)
+        Sampled array with target_frames on the frame axis
     """
-    # Open the video
-    cap = cv2.VideoCapture(str(video_path))
+    frame_axis = keypoints_array.ndim - 4
+    left = np.take(keypoints_array, plan.indices[:, 0], axis=frame_axis)
+    if plan.weights is None:
+        return left
     
-    if not cap.isOpened():
-        print(f"Error: Cannot open file {video_path}")
-        return None
+    right = np.take(keypoints_array, plan.indices[:, 1], axis=frame_axis)
+    alpha = plan.weights.reshape((-1,) + (1,) * (keypoints_array.ndim - frame_axis - 1))
+    # Same expression (and float64 weights) as the original per-frame interpolation
+    return (1 - alpha) * left + alpha * right
+
+
+def smart_frame_sampling(keypoints_array, target_frames=96, skip_start_ratio=0.2):
+    """
+    Smart frame sampling that focuses on the relevant part of the video.
+    
+    Problem: Short videos (~30 frames) and similar start in all videos.
+    Solution:
+    1. Skip the first frames (similar start)
+    2. Focus on middle/end part (the actual gesture)
+    3. Use temporal interpolation if video is too short
+    
+    The frame selection is a cached SamplingPlan (see get_sampling_plan), applied
+    to the whole clip at once.
+    
+    Args:
+        keypoints_array: numpy array with shape (num_frames, num_hands, 21, 3),
+                         or a stack of equal-length clips (num_clips, num_frames, num_hands, 21, 3)
+        target_frames: desired number of frames (default: 96, matching model input)
+        skip_start_ratio: portion of start to skip (0.2 = 20% of start)
+    
+    Returns:
+        numpy array with shape (target_frames, num_hands, 21, 3)
+        (or (num_clips, target_frames, num_hands, 21, 3) for a stack)
+    """
+    num_frames = keypoints_array.shape[keypoints_array.ndim - 4]
+    
+    if num_frames == 0:
+        return keypoints_array
+    
+    plan = get_sampling_plan(num_frames, target_frames, skip_start_ratio)
+    return apply_sampling_plan(keypoints_array, plan)
+
+
+def create_hand_detector(max_hands=2, min_detection_confidence=0.3, min_presence_confidence=0.3,
+                         min_tracking_confidence=0.3, running_mode='image'):
+    """
+    Create a MediaPipe hand detector
+    
+    The caller owns the detector and must close() it. Creating the detector
+    initializes the MediaPipe graph, so prefer a long-lived HandKeypointExtractor.
     
-    if USE_NEW_API:
+    Args:
+        max_hands: Maximum number of hands to detect (1 or 2)
+        min_detection_confidence: Minimum palm detection confidence
+        min_presence_confidence: Minimum hand presence confidence (new API only)
+        min_tracking_confidence: Minimum landmark tracking confidence
+        running_mode: 'image' (palm detection on every frame, detect()) or
+                      'video' (landmark tracking between frames, detect_for_video()).
+                      The old API always tracks.
+    
+    Returns:
+        HandLandmarker (MediaPipe 0.10+) or mp.solutions.hands.Hands (older versions)
+    """
+    if running_mode not in ('image', 'video'):
+        raise ValueError(f"running_mode must be 'image' or 'video', got {running_mode!r}")
+
+    mediapipe = _mediapipe()
+    if mediapipe.new_api:
         # Use new API (MediaPipe 0.10+)
         # Download model if needed
         model_path = download_model_if_needed()
+        python, vision = mediapipe.python, mediapipe.vision
         base_options = python.BaseOptions(model_asset_path=model_path)
         options = vision.HandLandmarkerOptions(
             base_options=base_options,
+            running_mode=vision.RunningMode.VIDEO if running_mode == 'video' else vision.RunningMode.IMAGE,
             num_hands=max_hands,
-            min_hand_detection_confidence=0.3,  # Lower threshold for better detection
-            min_hand_presence_confidence=0.3,  # Lower threshold for better detection
-            min_tracking_confidence=0.3  # Lower threshold for better tracking
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_presence_confidence,
+            min_tracking_confidence=min_tracking_confidence
         )
-        detector = vision.HandLandmarker.create_from_options(options)
-        
-        all_keypoints = []
-        
-        while True:
+        return vision.HandLandmarker.create_from_options(options)
+    
+    # Use old API (MediaPipe < 0.10)
+    mp_hands = mediapipe.mp.solutions.hands
+    return mp_hands.Hands(
+        static_image_mode=False,
+        max_num_hands=max_hands,
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence
+    )
+
+
+def read_video_frames(cap, target_fps=None):
+    """
+    Yield BGR frames from an opened cv2.VideoCapture until the stream ends
+    
+    Args:
+        cap: Opened cv2.VideoCapture
+        target_fps: If set and lower than the video's fps, keep only enough frames to
+                    reach this rate. Dropped frames are grab()bed but never decoded.
+    """
+    for _, frame in iter_video_frames(cap, target_fps):
+        yield frame
+
+
+def iter_video_frames(cap, target_fps=None):
+    """
+    Like read_video_frames, but yields (timestamp_ms, frame) pairs
+    
+    Timestamps come from the frame index and the capture's fps (DEFAULT_STREAM_FPS
+    if the container doesn't report one), so they stay correct when frames are skipped.
+    """
+    source_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    step = source_fps / target_fps if target_fps and source_fps > target_fps else 1.0
+    frame_ms = 1000.0 / (source_fps if source_fps > 0 else DEFAULT_STREAM_FPS)
+    
+    frame_index = 0
+    next_kept = 0.0
+    while True:
+        if frame_index + 1e-9 >= next_kept:
             ret, frame = cap.read()
             if not ret:
                 break
-            
-            # Convert to RGB (MediaPipe expects RGB)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            mp_image = Image(image_format=ImageFormat.SRGB, data=rgb_frame)
-            
-            # Process the frame
-            detection_result = detector.detect(mp_image)
-            
-            # Prepare array for keypoints of current frame
-            frame_keypoints = np.zeros((max_hands, 21, 3))
-            
-            if detection_result.hand_landmarks:
-                for idx, hand_landmarks in enumerate(detection_result.hand_landmarks):
-                    if idx >= max_hands:
-                        break
-                    
-                    # Extract 21 keypoints
-                    for i, landmark in enumerate(hand_landmarks):
-                        frame_keypoints[idx, i, 0] = landmark.x
-                        frame_keypoints[idx, i, 1] = landmark.y
-                        frame_keypoints[idx, i, 2] = landmark.z
-            
-            all_keypoints.append(frame_keypoints)
+            next_kept += step
+            yield frame_index * frame_ms, frame
+        elif not cap.grab():
+            break
+        frame_index += 1
+
+
+def expected_frame_count(cap, target_fps=None):
+    """
+    Estimate how many frames iter_video_frames will yield, from CAP_PROP_FRAME_COUNT
+    
+    Containers don't always report an exact (or any) frame count, so this is only
+    a sizing hint for preallocated buffers - callers must handle more or fewer frames.
+    """
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    if total <= 0:
+        return 0
+    source_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    if target_fps and source_fps > target_fps:
+        return int(np.ceil(total * target_fps / source_fps))
+    return total
+
+
+def to_rgb_frame(frame, max_side=None, out=None):
+    """
+    Prepare a BGR frame for MediaPipe: downscale (see downscale_frame) and convert to RGB
+    
+    Args:
+        frame: BGR frame
+        max_side: Optional max side length in pixels
+        out: Optional buffer to convert into (reused if its shape matches)
+    
+    Returns:
+        RGB frame (out itself when it could be reused)
+    """
+    # Landmarks are relative to the image size, so downscaling keeps their frame
+    frame = downscale_frame(frame, max_side)
+    # Convert to RGB (MediaPipe expects RGB)
+    if out is not None and out.shape == frame.shape and out.dtype == frame.dtype:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def reused_rgb_frames(timed_frames, max_side=None):
+    """
+    Convert (timestamp_ms, BGR frame) pairs to RGB into a single reused buffer
+    
+    Each yielded frame is only valid until the next one is requested, which is all
+    the detector needs and saves allocating a new RGB image per frame.
+    """
+    buffer = None
+    for timestamp_ms, frame in timed_frames:
+        buffer = to_rgb_frame(frame, max_side, out=buffer)
+        yield timestamp_ms, buffer
+
+
+_END_OF_STREAM = object()
+
+
+def pipelined_rgb_frames(cap, target_fps=None, max_side=None, max_in_flight=4):
+    """
+    Decode and color-convert frames on a reader thread while the caller runs detection
+    
+    The reader fills a fixed pool of max_in_flight RGB buffers, so at most that many
+    decoded frames exist at once. A buffer yielded here is handed back to the reader
+    when the caller asks for the next frame, so don't keep references to it.
+    
+    Args:
+        cap: Opened cv2.VideoCapture (release it only after this generator is closed)
+        target_fps: See iter_video_frames
+        max_side: See downscale_frame
+        max_in_flight: Number of frame buffers shared by reader and caller (>= 1)
+    
+    Yields:
+        (timestamp_ms, RGB frame buffer)
+    """
+    free_buffers = queue.Queue()
+    ready = queue.Queue()
+    for _ in range(max(1, max_in_flight)):
+        free_buffers.put(None)  # Allocated on first use, once the frame size is known
+    stop = threading.Event()
+    
+    def reader():
+        try:
+            for timestamp_ms, frame in iter_video_frames(cap, target_fps):
+                buffer = free_buffers.get()  # Blocks while max_in_flight frames are in flight
+                if stop.is_set():
+                    return
+                ready.put((timestamp_ms, to_rgb_frame(frame, max_side, out=buffer)))
+            ready.put(_END_OF_STREAM)
+        except BaseException as e:
+            ready.put(e)
+    
+    thread = threading.Thread(target=reader, name="frame-reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = ready.get()
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            timestamp_ms, rgb_frame = item
+            yield timestamp_ms, rgb_frame
+            free_buffers.put(rgb_frame)
+    finally:
+        # Wake the reader if it is waiting for a buffer, then wait for it to finish
+        stop.set()
+        free_buffers.put(None)
+        thread.join()
+
+
+def downscale_frame(frame, max_side):
+    """Shrink a frame so its longest side is at most max_side pixels (no-op if already smaller)"""
+    height, width = frame.shape[:2]
+    longest = max(height, width)
+    if not max_side or longest <= max_side:
+        return frame
+    scale = max_side / longest
+    new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
+
+
+_LANDMARK_XYZ = attrgetter('x', 'y', 'z')
+
+
+def write_hand_landmarks(frame_keypoints, hands_landmarks):
+    """
+    Write detected landmarks into one frame's (max_hands, 21, 3) keypoint array in place
+    
+    Each hand's 21 (x, y, z) keypoints go in with a single assignment; extra hands
+    are dropped and slots without a hand are zeroed.
+    """
+    num_hands = min(len(hands_landmarks), len(frame_keypoints))
+    for idx in range(num_hands):
+        frame_keypoints[idx] = list(map(_LANDMARK_XYZ, hands_landmarks[idx]))
+    frame_keypoints[num_hands:] = 0
+
+
+class HandKeypointExtractor:
+    """
+    Long-lived hand keypoint extractor that owns one MediaPipe detector
+    
+    Building the detector (model download check + graph initialization) is the
+    expensive part of extraction, so create one extractor per process and call
+    extract() for every clip. Detector state is reset between clips, and calls
+    are serialized so one extractor can be shared by request threads.
+    """
+    
+    def __init__(self, max_hands=2, min_detection_confidence=0.3, min_presence_confidence=0.3,
+                 min_tracking_confidence=0.3, normalization='minimal', target_fps=None, max_side=None,
+                 running_mode='image', max_in_flight=4):
+        """
+        Initialize extractor and build its detector
         
-        cap.release()
-        detector.close()
+        Args:
+            max_hands: Maximum number of hands to detect (1 or 2)
+            min_detection_confidence: Minimum palm detection confidence
+            min_presence_confidence: Minimum hand presence confidence (new API only)
+            min_tracking_confidence: Minimum landmark tracking confidence
+            normalization: 'minimal' (translate only) or 'full' (see normalize_keypoints)
+            target_fps: Effective frame rate for video files (None = every frame).
+                        Skipped frames are not decoded.
+            max_side: Downscale frames so the longest side is at most this many pixels
+                      before detection (None = full resolution)
+            running_mode: 'image' (palm detection on every frame) or 'video' (track landmarks
+                          between frames; palm detection only reruns when tracking is lost)
+            max_in_flight: For video files, decode on a reader thread with this many frame
+                           buffers in flight, overlapping decoding with detection
+                           (0 = decode and detect one after another)
+        """
+        if normalization not in ('minimal', 'full'):
+            raise ValueError(f"normalization must be 'minimal' or 'full', got {normalization!r}")
+        self.max_hands = max_hands
+        self.normalization = normalization
+        self.target_fps = target_fps
+        self.max_side = max_side
+        self.options = {
+            'max_hands': max_hands,
+            'min_detection_confidence': min_detection_confidence,
+            'min_presence_confidence': min_presence_confidence,
+            'min_tracking_confidence': min_tracking_confidence,
+            'running_mode': running_mode,
+        }
+        self.running_mode = running_mode
+        self.max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self.detector = create_hand_detector(**self.options)
         
-    else:
-        # Use old API (MediaPipe < 0.10)
-        mp_hands = mp.solutions.hands
+        # VIDEO mode timestamps must increase for the detector's whole lifetime,
+        # so clips are laid out one after another on a single timeline
+        self._last_timestamp_ms = -1
+        self._clip_start_ms = 0
+        self._blank_image = None
+        mediapipe = _mediapipe()
+        if mediapipe.new_api and running_mode == 'video':
+            self._blank_image = mediapipe.Image(image_format=mediapipe.ImageFormat.SRGB,
+                                                data=np.zeros((64, 64, 3), dtype=np.uint8))
+    
+    @property
+    def config(self):
+        """Every setting that affects the extracted keypoints (see extraction_config_hash)"""
+        return {**self.options, 'normalization': self.normalization,
+                'target_fps': self.target_fps, 'max_side': self.max_side}
+    
+    def reset(self):
+        """Drop any tracking state so the next frame starts an independent clip"""
+        if not _mediapipe().new_api:
+            # Old API tracks hands across frames
+            self.detector.reset()
+        elif self._blank_image is not None and self._last_timestamp_ms >= 0:
+            # VIDEO mode keeps tracked hands in the graph - a blank frame loses them all,
+            # so the next clip starts with fresh palm detection
+            self._last_timestamp_ms += 1000
+            self.detector.detect_for_video(self._blank_image, self._last_timestamp_ms)
+        self._clip_start_ms = self._last_timestamp_ms + 1
+    
+    def close(self):
+        """Release the detector"""
+        if self.detector is not None:
+            self.detector.close()
+            self.detector = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def extract(self, video_path_or_frames, fps=None):
+        """
+        Extract normalized hand keypoints from one clip
         
-        with mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=max_hands,
-            min_detection_confidence=0.3,  # Lower threshold for better detection
-            min_tracking_confidence=0.3  # Lower threshold for better tracking
-        ) as hands:
-            
-            all_keypoints = []
+        Args:
+            video_path_or_frames: Path to a video file, or an iterable of BGR frames
+                                  (as returned by cv2.VideoCapture.read; target_fps
+                                  only applies to video files)
+            fps: Frame rate of an iterable of frames, used for VIDEO mode timestamps
+                 (default: DEFAULT_STREAM_FPS). Video files use their own fps.
+        
+        Returns:
+            numpy array with shape (num_frames, max_hands, 21, 3),
+            or None if the video file can't be opened
+        """
+        if isinstance(video_path_or_frames, (str, os.PathLike)):
+            # Open the video
+            cap = cv2.VideoCapture(str(video_path_or_frames))
+            if not cap.isOpened():
+                print(f"Error: Cannot open file {video_path_or_frames}")
+                return None
+            if self.max_in_flight and self.max_in_flight > 0:
+                rgb_frames = pipelined_rgb_frames(cap, self.target_fps, self.max_side, self.max_in_flight)
+            else:
+                rgb_frames = reused_rgb_frames(iter_video_frames(cap, self.target_fps), self.max_side)
+            try:
+                return self._extract_rgb_frames(rgb_frames, expected_frame_count(cap, self.target_fps))
+            finally:
+                # Stop the reader before releasing the capture it reads from
+                rgb_frames.close()
+                cap.release()
+        
+        frame_ms = 1000.0 / (fps or DEFAULT_STREAM_FPS)
+        timed_frames = ((i * frame_ms, frame) for i, frame in enumerate(video_path_or_frames))
+        expected_frames = len(video_path_or_frames) if hasattr(video_path_or_frames, '__len__') else 0
+        return self._extract_rgb_frames(reused_rgb_frames(timed_frames, self.max_side), expected_frames)
+    
+    def _extract_rgb_frames(self, timed_frames, expected_frames=0):
+        """
+        Run the detector over (timestamp_ms, RGB frame) pairs and return normalized keypoints
+        
+        Keypoints are written straight into a preallocated float32 buffer sized from
+        expected_frames (a hint); it doubles in size if the clip turns out to be longer.
+        """
+        if self.detector is None:
+            raise RuntimeError("HandKeypointExtractor is closed")
+        
+        keypoints = np.empty((max(int(expected_frames), 16), self.max_hands, 21, 3), dtype=np.float32)
+        num_frames = 0
+        mediapipe = _mediapipe()
+        
+        with self._lock:
+            self.reset()
             
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Convert to RGB (MediaPipe expects RGB)
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
+            for frame_time_ms, rgb_frame in timed_frames:
                 # Process the frame
-                results = hands.process(rgb_frame)
-                
-                # Prepare array for keypoints of current frame
-                frame_keypoints = np.zeros((max_hands, 21, 3))
+                if mediapipe.new_api:
+                    mp_image = mediapipe.Image(image_format=mediapipe.ImageFormat.SRGB, data=rgb_frame)
+                    if self.running_mode == 'video':
+                        timestamp_ms = max(self._clip_start_ms + int(frame_time_ms), self._last_timestamp_ms + 1)
+                        self._last_timestamp_ms = timestamp_ms
+                        detection_result = self.detector.detect_for_video(mp_image, timestamp_ms)
+                    else:
+                        detection_result = self.detector.detect(mp_image)
+                    hands_landmarks = detection_result.hand_landmarks or []
+                else:
+                    results = self.detector.process(rgb_frame)
+                    hands_landmarks = [hand.landmark for hand in (results.multi_hand_landmarks or [])]
                 
-                if results.multi_hand_landmarks:
-                    for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                        if idx >= max_hands:
-                            break
-                        
-                        # Extract 21 keypoints
-                        for i, landmark in enumerate(hand_landmarks.landmark):
-                            frame_keypoints[idx, i, 0] = landmark.x
-                            frame_keypoints[idx, i, 1] = landmark.y
-                            frame_keypoints[idx, i, 2] = landmark.z
+                if num_frames == len(keypoints):
+                    # Frame count hint was too low - grow geometrically
+                    grown = np.empty((2 * len(keypoints),) + keypoints.shape[1:], dtype=np.float32)
+                    grown[:num_frames] = keypoints
+                    keypoints = grown
                 
-                all_keypoints.append(frame_keypoints)
-            
-            cap.release()
+                write_hand_landmarks(keypoints[num_frames], hands_landmarks)
+                num_frames += 1
+        
+        # Keypoints array: (num_frames, num_hands, 21, 3)
+        keypoints_array = keypoints[:num_frames]
+        
+        # Normalize keypoints - MINIMAL by default: only translate (no rotate/scale)
+        # This preserves size and rotation differences which help distinguish classes
+        # (normalize_keypoints returns a trimmed copy, so the spare capacity is released)
+        keypoints_array = normalize_keypoints(keypoints_array, minimal=self.normalization == 'minimal')
+        
+        return keypoints_array
+
+
+def extract_hand_keypoints_from_video(video_path, max_hands=2, extractor=None):
+    """
+    Extracts hand keypoints from a video using MediaPipe Hand Landmarker
+    
+    Args:
+        video_path: Path to the video file
+        max_hands: Maximum number of hands to detect (1 or 2)
+        extractor: Optional HandKeypointExtractor to reuse. If None, a detector is
+                   built for this call and closed afterwards (slow - prefer reusing one).
+    
+    Returns:
+        numpy array with shape (num_frames, num_hands, 21, 3) 
+        where each hand contains 21 keypoints with coordinates (x, y, z)
+    """
+    if extractor is not None:
+        return extractor.extract(video_path)
+    
+    # Don't build a detector for a file that can't be opened
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        print(f"Error: Cannot open file {video_path}")
+        return None
     
-    # Convert to numpy array: (num_frames, num_hands, 21, 3)
-    keypoints_array = np.array(all_keypoints)
+    try:
+        with HandKeypointExtractor(max_hands=max_hands) as extractor:
+            return extractor.extract(read_video_frames(cap))
+    finally:
+        cap.release()
+
+
+def save_keypoints_atomic(output_file, keypoints):
+    """
+    Save a keypoints array as .npy without ever leaving a partial file behind
+    (writes to a temporary file in the same directory, then renames it)
+    """
+    atomic_write(output_file, lambda f: np.save(f, keypoints))
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extraction_config_hash(config):
+    """
+    Hash of everything that changes extraction output for the same video
+    (extractor settings, MediaPipe API and EXTRACTION_VERSION)
+    """
+    payload = {
+        'version': EXTRACTION_VERSION,
+        'mediapipe_api': 'tasks' if _mediapipe().new_api else 'solutions',
+        **{key: value for key, value in config.items()
+           if key not in CONFIG_HASH_NEUTRAL_VALUES or value != CONFIG_HASH_NEUTRAL_VALUES[key]},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def load_manifest(output_dir):
+    """
+    Load the extraction manifest of a keypoints directory
     
-    # Normalize keypoints - MINIMAL: only translate (no rotate/scale)
-    # This preserves size and rotation differences which help distinguish classes
-    keypoints_array = normalize_keypoints(keypoints_array, minimal=True)
+    The manifest maps each output .npy (relative to output_dir) to the video it came
+    from, the video's content hash and the extraction config hash.
     
-    return keypoints_array
+    Returns:
+        Manifest dictionary (empty if missing, unreadable or from another version)
+    """
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable manifest {manifest_path}: {e}")
+    return {'version': MANIFEST_VERSION, 'entries': {}}
+
+
+def save_manifest(output_dir, manifest):
+    """Write the extraction manifest atomically"""
+    atomic_write(Path(output_dir) / MANIFEST_NAME, lambda f: json.dump(manifest, f, indent=2, sort_keys=True),
+                 mode='w', encoding='utf-8')
+
+
+# Extractor owned by the current extraction worker (see _init_extraction_worker)
+_worker_extractor = None
+
+
+def _init_extraction_worker(extractor_options):
+    """Build the per-worker extractor once; it is reused for every file the worker handles"""
+    global _worker_extractor
+    _worker_extractor = HandKeypointExtractor(**extractor_options)
+
+
+def _close_extraction_worker():
+    global _worker_extractor
+    if _worker_extractor is not None:
+        _worker_extractor.close()
+        _worker_extractor = None
 
 
-def process_all_videos(input_dir, output_dir, skip_existing=False, overwrite=True):
+def _extract_video_task(task):
+    """
+    Extract and save keypoints for one video (runs inside an extraction worker)
+    
+    Args:
+        task: (video_file, output_file)
+    
+    Returns:
+        Dictionary with 'video', 'output', 'status' ('saved', 'empty' or 'failed')
+        and 'shape' or 'error'
+    """
+    video_file, output_file = task
+    result = {'video': str(video_file), 'output': str(output_file)}
+    try:
+        keypoints = _worker_extractor.extract(video_file)
+        if keypoints is None:
+            result['status'] = 'failed'
+            result['error'] = "Cannot open video file"
+            return result
+        if len(keypoints) == 0:
+            result['status'] = 'empty'
+            return result
+        
+        save_keypoints_atomic(output_file, keypoints)
+        result['status'] = 'saved'
+        result['shape'] = keypoints.shape
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def process_all_videos(input_dir, output_dir, skip_existing=False, overwrite=True, workers=1, max_hands=2,
+                       incremental=False, extractor_options=None):
     """
     Iterates through all videos in the directory and extracts keypoints from them
     
+    Every saved file is recorded in a manifest (extraction_manifest.json in output_dir)
+    with the video's content hash and the extraction config hash.
+    
     Args:
         input_dir: Input directory with videos
         output_dir: Output directory for saving .npy files
         skip_existing: If True, skip files that already exist (default: False)
         overwrite: If True, overwrite existing files (default: True)
                    Note: overwrite takes precedence over skip_existing
+        workers: Number of extraction processes (default: 1 = in-process).
+                 Each worker builds one detector and reuses it for all its files.
+        max_hands: Maximum number of hands to detect
+        incremental: If True, only extract videos that are new, whose content changed
+                     or that were extracted with a different config, and delete outputs
+                     whose video is gone. Takes precedence over skip_existing/overwrite.
+        extractor_options: Extra HandKeypointExtractor settings (confidences, normalization)
+    
+    Returns:
+        Summary dictionary with 'saved', 'unchanged', 'skipped', 'pruned', 'empty'
+        and 'failed' lists ('failed' holds (video, error) tuples)
     """
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
+    extractor_options = {**DEFAULT_EXTRACTOR_OPTIONS, 'max_hands': max_hands, **(extractor_options or {})}
+    config_hash = extraction_config_hash(extractor_options)
+    manifest = load_manifest(output_path)
+    entries = manifest['entries']
+    
     # Find all video files
     video_extensions = ['.mp4', '.avi', '.mov', '.mkv']
     video_files = []
     
     for ext in video_extensions:
         video_files.extend(input_path.rglob(f'*{ext}'))
+    video_files.sort()
     
     print(f"Found {len(video_files)} video files to process")
     
-    # Process each video
-    skipped_count = 0
-    for video_file in tqdm(video_files, desc="Processing videos"):
-        try:
-            # Create output path preserving directory structure
-            relative_path = video_file.relative_to(input_path)
-            output_file = output_path / relative_path.with_suffix('.npy')
-            
-            # Check if file exists and should be skipped
-            file_existed = output_file.exists()
-            if file_existed and skip_existing and not overwrite:
-                skipped_count += 1
+    summary = {'saved': [], 'unchanged': [], 'skipped': [], 'pruned': [], 'empty': [], 'failed': []}
+    
+    tasks = []
+    existing = set()
+    pending_entries = {}
+    current_keys = set()
+    for video_file in video_files:
+        # Create output path preserving directory structure
+        relative_path = video_file.relative_to(input_path)
+        output_file = output_path / relative_path.with_suffix('.npy')
+        key = relative_path.with_suffix('.npy').as_posix()
+        current_keys.add(key)
+        
+        # Content hash (reused from the manifest while size and mtime are unchanged)
+        stat = video_file.stat()
+        entry = entries.get(key)
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            video_hash = entry['video_hash']
+        else:
+            video_hash = hash_file(video_file)
+        new_entry = {
+            'video': relative_path.as_posix(),
+            'video_hash': video_hash,
+            'config_hash': config_hash,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        
+        # A clip migrated to the compact format (see keypoint_format) still counts as extracted
+        if output_file.exists() or output_file.with_suffix('.kpc').exists():
+            if incremental:
+                if entry and entry['video_hash'] == video_hash and entry['config_hash'] == config_hash:
+                    entries[key] = new_entry  # Refresh size/mtime so the hash is reused next time
+                    summary['unchanged'].append(str(video_file))
+                    continue
+            elif skip_existing and not overwrite:
+                summary['skipped'].append(str(video_file))
                 continue  # Skip existing file
-            
-            # Extract keypoints
-            keypoints = extract_hand_keypoints_from_video(video_file, max_hands=2)
-            
-            if keypoints is not None and len(keypoints) > 0:
-                # Create necessary directories
-                output_file.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Save as .npy
-                np.save(output_file, keypoints)
-                
-                action = "Overwritten" if file_existed else "Saved"
-                print(f"{action}: {output_file} (shape: {keypoints.shape})")
+            existing.add(str(output_file))
+        
+        pending_entries[str(output_file)] = (key, new_entry)
+        tasks.append((video_file, output_file))
+    
+    if incremental:
+        # Prune outputs whose source video was removed or renamed
+        for key in sorted(set(entries) - current_keys):
+            stale_file = output_path / key
+            for stale in (stale_file, stale_file.with_suffix('.kpc')):
+                if stale.exists():
+                    stale.unlink()
+            del entries[key]
+            summary['pruned'].append(str(stale_file))
+    
+    def handle(result):
+        key, new_entry = pending_entries[result['output']]
+        if result['status'] == 'saved':
+            entries[key] = new_entry
+            summary['saved'].append(result['video'])
+            action = "Overwritten" if result['output'] in existing else "Saved"
+            tqdm.write(f"{action}: {result['output']} (shape: {result['shape']})")
+        else:
+            # The previous output (if any) no longer matches this video - retry next run
+            entries.pop(key, None)
+            if result['status'] == 'empty':
+                summary['empty'].append(result['video'])
             else:
-                print(f"Warning: No keypoints found in {video_file}")
-                
-        except Exception as e:
-            print(f"Error processing {video_file}: {str(e)}")
+                summary['failed'].append((result['video'], result['error']))
+    
+    try:
+        workers = max(1, min(workers, len(tasks)))
+        if workers > 1:
+            # Spawned (not forked) workers - MediaPipe's graph threads don't survive fork
+            ctx = multiprocessing.get_context('spawn')
+            with ctx.Pool(workers, initializer=_init_extraction_worker, initargs=(extractor_options,)) as pool:
+                # imap yields results in submission order, so progress stays ordered
+                for result in tqdm(pool.imap(_extract_video_task, tasks), total=len(tasks),
+                                   desc=f"Processing videos ({workers} workers)"):
+                    handle(result)
+        elif tasks:
+            _init_extraction_worker(extractor_options)
+            try:
+                for task in tqdm(tasks, desc="Processing videos"):
+                    handle(_extract_video_task(task))
+            finally:
+                _close_extraction_worker()
+    finally:
+        # Record progress even if the run is interrupted
+        save_manifest(output_path, manifest)
     
-    if skipped_count > 0:
-        print(f"\nSkipped {skipped_count} existing file(s). Use --skip-existing to skip files.")
+    print_extraction_summary(summary)
+    return summary
 
 
-if __name__ == "__main__":
-    import sys
+def print_extraction_summary(summary):
+    """Print the result of process_all_videos, listing every file that was not saved"""
+    print(f"\nSaved: {len(summary['saved'])}, unchanged: {len(summary['unchanged'])}, "
+          f"skipped: {len(summary['skipped'])}, pruned: {len(summary['pruned'])}, "
+          f"no keypoints: {len(summary['empty'])}, failed: {len(summary['failed'])}")
     
+    if summary['skipped']:
+        print(f"Skipped {len(summary['skipped'])} existing file(s) (--skip-existing).")
+    for stale_file in summary['pruned']:
+        print(f"  🗑 Removed stale output {stale_file}")
+    for video in summary['empty']:
+        print(f"  ⚠ No keypoints found in {video}")
+    for video, error in summary['failed']:
+        print(f"  ❌ {video}: {error}")
+
+
+if __name__ == "__main__":
     # Set up paths
     base_dir = Path("Data")
     raw_videos_dir = base_dir / "rawVideos"
@@ -407,23 +1016,51 @@ if __name__ == "__main__":
     keypoints_dir = base_dir / "Keypoints"
     
     # Check for command line arguments
+    # Default: INCREMENTAL - only new, changed or config-stale videos (see extraction_manifest.json)
+    force = "--force" in sys.argv or "-f" in sys.argv
     skip_mode = "--skip-existing" in sys.argv or "-s" in sys.argv
-    overwrite = not skip_mode  # By default, overwrite existing files
+    incremental = not force and not skip_mode
+    overwrite = force
     skip_existing = skip_mode
     
+    # --workers N: extract with N processes (each keeps its own detector)
+    workers = 1
+    for flag in ("--workers", "-w"):
+        if flag in sys.argv:
+            workers = int(sys.argv[sys.argv.index(flag) + 1])
+    
+    extractor_options = {'normalization': 'full' if "--full-normalization" in sys.argv else 'minimal'}
+    # --target-fps N / --max-side N: frame stride and downscale before detection
+    if "--target-fps" in sys.argv:
+        extractor_options['target_fps'] = float(sys.argv[sys.argv.index("--target-fps") + 1])
+    if "--max-side" in sys.argv:
+        extractor_options['max_side'] = int(sys.argv[sys.argv.index("--max-side") + 1])
+    # --video-mode: track landmarks between frames instead of detecting on every frame
+    if "--video-mode" in sys.argv:
+        extractor_options['running_mode'] = 'video'
+    
     print("=" * 60)
     print("Extracting hand keypoints from all videos")
-    if overwrite:
+    if incremental:
+        print("Mode: INCREMENTAL (new, changed or re-configured videos only; use --force to reprocess all)")
+    elif overwrite:
         print("Mode: OVERWRITE (will reprocess all existing files)")
     else:
-        print("Mode: SKIP EXISTING (use --skip-existing to skip existing files)")
+        print("Mode: SKIP EXISTING (skips any video whose .npy exists)")
+    print(f"Normalization: {extractor_options['normalization']}")
+    print(f"Running mode: {extractor_options.get('running_mode', 'image').upper()}")
+    if 'target_fps' in extractor_options or 'max_side' in extractor_options:
+        print(f"Target fps: {extractor_options.get('target_fps') or 'all frames'}, "
+              f"max side: {extractor_options.get('max_side') or 'full resolution'}")
+    print(f"Workers: {workers}")
     print("=" * 60)
     
     # Process videos from rawVideos
     if raw_videos_dir.exists():
         print("\n[1/2] Processing videos from rawVideos...")
         process_all_videos(raw_videos_dir, keypoints_dir / "rawVideos", 
-                          skip_existing=skip_existing, overwrite=overwrite)
+                          skip_existing=skip_existing, overwrite=overwrite, workers=workers,
+                          incremental=incremental, extractor_options=extractor_options)
     else:
         print(f"⚠ Directory not found: {raw_videos_dir}")
     
@@ -431,7 +1068,8 @@ if __name__ == "__main__":
     if sessions_dir.exists():
         print("\n[2/2] Processing videos from Sessions...")
         process_all_videos(sessions_dir, keypoints_dir / "Sessions",
-                          skip_existing=skip_existing, overwrite=overwrite)
+                          skip_existing=skip_existing, overwrite=overwrite, workers=workers,
+                          incremental=incremental, extractor_options=extractor_options)
     else:
         print(f"⚠ Directory not found: {sessions_dir}")
     
@@ -0,0 +1,55 @@
+"""
+File helpers shared by the pipeline scripts
+"""
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+
+def _current_umask():
+    umask = os.umask(0)  # The umask can only be read by setting it
+    os.umask(umask)
+    return umask
+
+
+# Read once at import: swapping the umask isn't safe once worker threads create files
+NEW_FILE_MODE = 0o666 & ~_current_umask()
+
+
+def atomic_write(path, writer, mode='wb', encoding=None):
+    """
+    Write a file without ever leaving a partial one behind
+
+    writer(f) writes the contents to a temporary file in the same directory, which
+    then replaces path in one rename; on any error the temporary file is removed.
+    The file gets the permissions of the file it replaces, or those open() would
+    give a new file (mkstemp creates it owner-only).
+
+    Args:
+        path: File to write (parent directories are created)
+        writer: Callable taking the open temporary file
+        mode: 'wb' or 'w'
+        encoding: Text encoding for mode 'w'
+
+    Returns:
+        path as a Path
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            writer(f)
+        try:
+            file_mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            file_mode = NEW_FILE_MODE
+        os.chmod(tmp_path, file_mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
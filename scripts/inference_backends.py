@@ -0,0 +1,145 @@
+"""
+Model backends for SignLanguagePredictor
+
+A backend maps a preprocessed batch (num_clips, time, 126) to class probabilities:
+    - KerasBackend: the trained .keras model, called through a warmed-up traced function
+    - TFLiteBackend: a .tflite export (see export_tflite.py) run by the TF Lite interpreter
+      with XNNPACK; uses the standalone LiteRT / tflite-runtime interpreter when installed,
+      so serving doesn't need to load the full TensorFlow runtime
+    - NumpyBackend: an .npz weight export (see numpy_model.py) run by a pure-NumPy forward
+      pass - no TensorFlow or TF Lite runtime at all
+
+load_backend() picks the backend from the model file's suffix.
+"""
+
+import threading
+
+import numpy as np
+
+DIRECT_CALL_MAX_BATCH = 64  # Larger Keras batches use model.predict (batched, bounded memory)
+TFLITE_SUFFIX = ".tflite"
+NUMPY_SUFFIX = ".npz"
+
+
+class KerasBackend:
+    """Keras model with a traced, fixed-signature forward pass"""
+
+    name = "keras"
+
+    def __init__(self, model_path, max_length=96):
+        """
+        Args:
+            model_path: Saved .keras model
+            max_length: Time steps used to warm up variable-length models
+        """
+        import tensorflow as tf
+        from scripts.model_cnn_lstm import load_sign_model
+        self.model = load_sign_model(model_path)
+        self.input_shape = tuple(self.model.input_shape[1:])
+
+        # Forward pass traced once for a fixed input signature (any batch size) and warmed up
+        # here, so requests call the compiled graph directly instead of paying for
+        # Keras predict()'s per-call setup (or for tracing on the first request)
+        self._forward = tf.function(
+            lambda X: self.model(X, training=False),
+            input_signature=[tf.TensorSpec((None,) + self.input_shape, tf.float32)])
+        self._forward(np.zeros((1, self.input_shape[0] or max_length) + self.input_shape[1:], dtype=np.float32))
+
+    def __call__(self, X):
+        """
+        Class probabilities of a batch
+
+        Small batches go straight through the traced function; batches larger than
+        DIRECT_CALL_MAX_BATCH go through model.predict, which splits them into batches.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) <= DIRECT_CALL_MAX_BATCH:
+            return self._forward(X).numpy()
+        return self.model.predict(X, verbose=0)
+
+
+def _tflite_interpreter_class():
+    """Interpreter class of the lightest TF Lite runtime installed"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf  # Bundled (deprecated) interpreter - loads the full runtime
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteBackend:
+    """TF Lite model (exported with a fixed (1, time, features) input) on the XNNPACK CPU delegate"""
+
+    name = "tflite"
+
+    def __init__(self, model_path, num_threads=None):
+        """
+        Args:
+            model_path: .tflite file written by export_tflite.py
+            num_threads: Interpreter (XNNPACK) threads (default: the runtime's default)
+        """
+        import warnings
+        Interpreter = _tflite_interpreter_class()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # tf.lite.Interpreter's deprecation notice
+            self.interpreter = Interpreter(model_path=str(model_path), num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._lock = threading.Lock()  # One interpreter: requests from server threads take turns
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(int(n) for n in self._input['shape'][1:])
+
+    def __call__(self, X):
+        """
+        Class probabilities of a batch, one invoke per clip
+
+        Clips shorter than the exported length are zero-padded (length-bucketed models
+        mask the padding, so their predictions don't change). Concurrent calls (e.g. from
+        the web app's request threads) are serialized on the shared interpreter.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        steps = self.input_shape[0]
+        if X.shape[1] < steps:
+            X = np.pad(X, ((0, 0), (0, steps - X.shape[1]), (0, 0)))
+        probabilities = []
+        with self._lock:
+            for clip in X:
+                self.interpreter.set_tensor(self._input['index'], clip[None])
+                self.interpreter.invoke()
+                probabilities.append(self.interpreter.get_tensor(self._output['index'])[0].copy())
+        return np.array(probabilities)
+
+
+class NumpyBackend:
+    """NumPy forward pass of an .npz weight export (BatchNorm folded, LSTM batched)"""
+
+    name = "numpy"
+
+    def __init__(self, model_path):
+        """
+        Args:
+            model_path: .npz file written by numpy_model.py
+        """
+        from scripts.numpy_model import NumpyCNNLSTM
+        self.network = NumpyCNNLSTM(model_path)
+        self.input_shape = self.network.input_shape
+
+    def __call__(self, X):
+        """Class probabilities of a batch, in one pass for the whole batch"""
+        return self.network(X)
+
+
+def load_backend(model_path, max_length=96, num_threads=None):
+    """
+    Backend for a model file: TFLiteBackend for .tflite files, NumpyBackend for .npz
+    files, KerasBackend otherwise
+    """
+    if str(model_path).endswith(TFLITE_SUFFIX):
+        return TFLiteBackend(model_path, num_threads=num_threads)
+    if str(model_path).endswith(NUMPY_SUFFIX):
+        return NumpyBackend(model_path)
+    return KerasBackend(model_path, max_length=max_length)
@@ -0,0 +1,320 @@
+"""
+Compact on-disk format for extracted keypoints (.kpc)
+
+A .npy clip stores every coordinate as float64 and every missing hand as a full
+block of zeros. A .kpc clip stores:
+    - a small JSON header (format version, shape, normalization mode, coordinate dtype)
+    - a per-frame, per-hand presence bitmask
+    - only the present hands' coordinates, as float16 or scaled int16
+
+load_keypoints_file() reads either format, so the data loader and predictor
+don't care which one is on disk. Run this script to migrate an existing tree:
+
+    python scripts/keypoint_format.py Data/Keypoints --dtype int16
+"""
+
+import argparse
+import json
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.file_utils import atomic_write
+
+COMPACT_SUFFIX = ".kpc"
+COMPACT_MAGIC = b"\x93KPC"
+COMPACT_VERSION = 1
+COMPACT_DTYPES = ("int16", "float16")
+_HEADER_ALIGNMENT = 16  # Keeps the mask and coordinate arrays aligned like .npy does
+
+
+def compact_path(path):
+    """Path of the compact sibling of a keypoints file (x.npy -> x.kpc)"""
+    return Path(path).with_suffix(COMPACT_SUFFIX)
+
+
+def encode_compact(keypoints, dtype="int16", normalization="minimal"):
+    """
+    Encode a keypoints array into the compact format
+
+    Args:
+        keypoints: Array with shape (num_frames, num_hands, 21, 3); a hand is absent
+                   when all of its values are exactly zero
+        dtype: 'int16' (scaled to the clip's max abs value) or 'float16'
+        normalization: Normalization mode the keypoints were extracted with
+                       ('minimal', 'full' or 'unknown'), recorded in the header
+
+    Returns:
+        bytes of the .kpc file
+    """
+    if dtype not in COMPACT_DTYPES:
+        raise ValueError(f"Unsupported compact dtype: {dtype} (expected one of {COMPACT_DTYPES})")
+    keypoints = np.asarray(keypoints)
+    if keypoints.ndim != 4:
+        raise ValueError(f"Expected keypoints with shape (frames, hands, points, 3), got {keypoints.shape}")
+
+    presence = np.any(keypoints != 0, axis=(2, 3))
+    hands = keypoints[presence]
+
+    scale = 1.0
+    if dtype == "int16":
+        max_abs = float(np.max(np.abs(hands))) if hands.size else 0.0
+        if max_abs > 0:
+            scale = max_abs / np.iinfo(np.int16).max
+        payload = np.round(hands / scale).astype("<i2")
+    else:
+        payload = hands.astype("<f2")
+
+    header = {
+        'version': COMPACT_VERSION,
+        'shape': list(keypoints.shape),
+        'normalization': normalization,
+        'dtype': dtype,
+        'scale': scale,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix_length = len(COMPACT_MAGIC) + 4 + len(header_bytes)
+    header_bytes += b" " * (-prefix_length % _HEADER_ALIGNMENT)
+
+    mask_bytes = np.packbits(presence.ravel()).tobytes()
+    mask_bytes += b"\x00" * (-len(mask_bytes) % _HEADER_ALIGNMENT)
+
+    return b"".join([COMPACT_MAGIC, struct.pack("<I", len(header_bytes)), header_bytes,
+                     mask_bytes, payload.tobytes()])
+
+
+def _parse_header(data):
+    """Return (header dict, offset of the presence mask) for the bytes of a .kpc file"""
+    if data[:len(COMPACT_MAGIC)] != COMPACT_MAGIC:
+        raise ValueError("Not a compact keypoints file")
+    offset = len(COMPACT_MAGIC)
+    (header_length,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    header = json.loads(bytes(data[offset:offset + header_length]))
+    if header.get('version') != COMPACT_VERSION:
+        raise ValueError(f"Unsupported compact keypoints version: {header.get('version')}")
+    return header, offset + header_length
+
+
+def decode_compact(data):
+    """
+    Decode the bytes of a .kpc file
+
+    Returns:
+        float32 keypoints array with the original shape (absent hands are zeros)
+    """
+    header, offset = _parse_header(data)
+    shape = tuple(header['shape'])
+    num_slots = shape[0] * shape[1]
+
+    mask_length = (num_slots + 7) // 8
+    presence = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=mask_length, offset=offset),
+                             count=num_slots).view(bool).reshape(shape[:2])
+    offset += mask_length + (-mask_length % _HEADER_ALIGNMENT)
+
+    num_present = int(np.count_nonzero(presence))
+    payload_dtype = "<i2" if header['dtype'] == "int16" else "<f2"
+    payload = np.frombuffer(data, dtype=payload_dtype, count=num_present * shape[2] * shape[3], offset=offset)
+
+    keypoints = np.zeros(shape, dtype=np.float32)
+    hands = payload.reshape((num_present,) + shape[2:]).astype(np.float32)
+    if header['dtype'] == "int16":
+        hands *= np.float32(header['scale'])
+    keypoints[presence] = hands
+    return keypoints
+
+
+def compact_header(data):
+    """Header (version, shape, normalization, dtype, scale) from the bytes of a .kpc file"""
+    return _parse_header(data)[0]
+
+
+def read_compact_header(path):
+    """Read just the header (version, shape, normalization, dtype, scale) of a .kpc file"""
+    with open(path, 'rb') as f:
+        prefix = f.read(len(COMPACT_MAGIC) + 4)
+        if len(prefix) < len(COMPACT_MAGIC) + 4 or prefix[:len(COMPACT_MAGIC)] != COMPACT_MAGIC:
+            raise ValueError(f"Not a compact keypoints file: {path}")
+        (header_length,) = struct.unpack_from("<I", prefix, len(COMPACT_MAGIC))
+        header, _ = _parse_header(prefix + f.read(header_length))
+    return header
+
+
+def save_keypoints_compact(output_file, keypoints, dtype="int16", normalization="minimal"):
+    """Write keypoints as a .kpc file atomically (temporary file + rename, like save_keypoints_atomic)"""
+    data = encode_compact(keypoints, dtype=dtype, normalization=normalization)
+    atomic_write(output_file, lambda f: f.write(data))
+
+
+def resolve_keypoints_file(path):
+    """
+    File that load_keypoints_file reads for a path
+
+    Paths keep pointing at x.npy after a migration (dataset CSVs, scripts): if x.kpc
+    exists and is at least as new as x.npy (or x.npy is gone), the compact file is used.
+    """
+    path = Path(path)
+    if path.suffix == COMPACT_SUFFIX:
+        return path
+    compact = compact_path(path)
+    try:
+        compact_mtime = compact.stat().st_mtime_ns
+    except FileNotFoundError:
+        return path
+    try:
+        if path.stat().st_mtime_ns > compact_mtime:
+            return path  # Re-extracted since the conversion
+    except FileNotFoundError:
+        pass
+    return compact
+
+
+def load_keypoints_file(path):
+    """
+    Load a keypoints clip from a .npy or .kpc file (see resolve_keypoints_file)
+
+    Returns:
+        numpy array with shape (num_frames, num_hands, 21, 3)
+        (float32 from .kpc files, the stored dtype from .npy files)
+    """
+    path = resolve_keypoints_file(path)
+    if path.suffix == COMPACT_SUFFIX:
+        return decode_compact(path.read_bytes())
+    return np.load(path)
+
+
+class CompactClipMap:
+    """
+    Memory-mapped, sliceable view of a .kpc clip
+
+    Only the presence mask is read up front; slicing frames [start:stop] decodes just
+    the coordinates of those frames from the mapped payload.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        data = np.memmap(self.path, dtype=np.uint8, mode='r')
+        (header_length,) = struct.unpack_from("<I", data[:len(COMPACT_MAGIC) + 4], len(COMPACT_MAGIC))
+        self.header, offset = _parse_header(data[:len(COMPACT_MAGIC) + 4 + header_length].tobytes())
+        self.shape = tuple(self.header['shape'])
+        num_slots = self.shape[0] * self.shape[1]
+        mask_length = (num_slots + 7) // 8
+        self.presence = np.unpackbits(data[offset:offset + mask_length],
+                                      count=num_slots).view(bool).reshape(self.shape[:2])
+        offset += mask_length + (-mask_length % _HEADER_ALIGNMENT)
+        # Index of each frame's first present hand in the payload
+        self._first_hand = np.concatenate([[0], np.cumsum(self.presence.sum(axis=1))])
+        payload_dtype = "<i2" if self.header['dtype'] == "int16" else "<f2"
+        self._payload = np.memmap(self.path, dtype=payload_dtype, mode='r', offset=offset,
+                                  shape=(int(self._first_hand[-1]),) + self.shape[2:])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1 or None][0]
+        start, stop, step = index.indices(self.shape[0])
+        if step != 1:
+            raise ValueError("CompactClipMap only supports contiguous frame slices")
+        stop = max(stop, start)
+        keypoints = np.zeros((stop - start,) + self.shape[1:], dtype=np.float32)
+        hands = self._payload[self._first_hand[start]:self._first_hand[stop]].astype(np.float32)
+        if self.header['dtype'] == "int16":
+            hands *= np.float32(self.header['scale'])
+        keypoints[self.presence[start:stop]] = hands
+        return keypoints
+
+
+def open_keypoints_file(path):
+    """
+    Memory-mapped keypoints clip (see resolve_keypoints_file): frames are only read when sliced
+
+    Returns:
+        Read-only np.memmap for .npy files (stored dtype), CompactClipMap for .kpc files
+        (float32 slices); both have len() and shape and support clip[start:stop]
+    """
+    path = resolve_keypoints_file(path)
+    if path.suffix == COMPACT_SUFFIX:
+        return CompactClipMap(path)
+    return np.load(path, mmap_mode='r')
+
+
+def keypoints_file_length(path):
+    """Number of frames in a .npy or .kpc clip, read from its header only"""
+    path = resolve_keypoints_file(path)
+    if path.suffix == COMPACT_SUFFIX:
+        return int(read_compact_header(path)['shape'][0])
+    return int(np.load(path, mmap_mode='r').shape[0])
+
+
+def convert_keypoint_tree(keypoints_dir, dtype="int16", normalization="minimal", remove_npy=False):
+    """
+    Write a .kpc next to every .npy under keypoints_dir (recursively)
+
+    Files whose .kpc is already up to date are skipped.
+
+    Args:
+        keypoints_dir: Root of the keypoints tree (e.g. Data/Keypoints)
+        dtype: Compact coordinate dtype ('int16' or 'float16')
+        normalization: Normalization mode the tree was extracted with
+        remove_npy: Delete each .npy once its .kpc is written and verified
+
+    Returns:
+        dict with 'converted', 'skipped', 'npy_bytes', 'compact_bytes' and 'max_error'
+    """
+    summary = {'converted': 0, 'skipped': 0, 'npy_bytes': 0, 'compact_bytes': 0, 'max_error': 0.0}
+    for npy_file in sorted(Path(keypoints_dir).rglob("*.npy")):
+        compact = compact_path(npy_file)
+        if compact.exists() and compact.stat().st_mtime_ns >= npy_file.stat().st_mtime_ns and not remove_npy:
+            summary['skipped'] += 1
+            continue
+
+        keypoints = np.load(npy_file)
+        save_keypoints_compact(compact, keypoints, dtype=dtype, normalization=normalization)
+
+        restored = decode_compact(compact.read_bytes())
+        if restored.shape != keypoints.shape:
+            raise ValueError(f"Round trip changed the shape of {npy_file}")
+        if keypoints.size:
+            error = float(np.max(np.abs(restored - keypoints)))
+            summary['max_error'] = max(summary['max_error'], error)
+
+        summary['converted'] += 1
+        summary['npy_bytes'] += npy_file.stat().st_size
+        summary['compact_bytes'] += compact.stat().st_size
+        if remove_npy:
+            npy_file.unlink()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert .npy keypoint clips to the compact .kpc format")
+    parser.add_argument("keypoints_dir", type=str, nargs="?", default="Data/Keypoints",
+                       help="Keypoints tree to convert (default: Data/Keypoints)")
+    parser.add_argument("--dtype", type=str, choices=COMPACT_DTYPES, default="int16",
+                       help="Coordinate storage: scaled int16 (default) or float16")
+    parser.add_argument("--normalization", type=str, choices=["minimal", "full", "unknown"], default="minimal",
+                       help="Normalization mode the keypoints were extracted with (recorded in the header)")
+    parser.add_argument("--remove-npy", action="store_true",
+                       help="Delete the .npy files after converting (loaders fall back to .kpc)")
+    args = parser.parse_args()
+
+    print(f"Converting {args.keypoints_dir} to {args.dtype} .kpc files...")
+    summary = convert_keypoint_tree(args.keypoints_dir, dtype=args.dtype,
+                                    normalization=args.normalization, remove_npy=args.remove_npy)
+
+    print(f"✅ Converted: {summary['converted']} files, skipped (up to date): {summary['skipped']}")
+    if summary['converted']:
+        ratio = summary['npy_bytes'] / max(summary['compact_bytes'], 1)
+        print(f"   Size: {summary['npy_bytes'] / 2**20:.2f} MB -> {summary['compact_bytes'] / 2**20:.2f} MB "
+              f"({ratio:.1f}x smaller)")
+        print(f"   Max abs round-trip error: {summary['max_error']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
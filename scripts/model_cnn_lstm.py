@@ -3,29 +3,113 @@ CNN + LSTM Model for Sign Language Recognition
 Combines spatial (CNN) and temporal (LSTM) pattern recognition
 """
 
+import tensorflow as tf
 from tensorflow import keras
 from tensorflow.keras import layers
 from typing import Tuple
 
 
+@keras.utils.register_keras_serializable(package="sign_language")
+class PadTimeToMultiple(layers.Layer):
+    """Zero-pad the time axis to a multiple of `multiple`, so pooling windows never straddle the end of a clip"""
+    
+    def __init__(self, multiple=4, **kwargs):
+        super().__init__(**kwargs)
+        self.multiple = multiple
+    
+    def call(self, inputs):
+        extra = -tf.shape(inputs)[1] % self.multiple
+        return tf.pad(inputs, [[0, 0], [0, extra], [0, 0]])
+    
+    def compute_output_shape(self, input_shape):
+        steps = input_shape[1]
+        return (input_shape[0], None if steps is None else -(-steps // self.multiple) * self.multiple, input_shape[2])
+    
+    def get_config(self):
+        return {**super().get_config(), 'multiple': self.multiple}
+
+
+@keras.utils.register_keras_serializable(package="sign_language")
+class PaddingMask(layers.Layer):
+    """
+    Time mask of zero-padded sequences, downsampled like the Conv1D/MaxPooling1D stack
+    
+    A time step is valid if it, or any later step, has a non-zero feature - so only the
+    trailing padding is masked, not frames without hands inside a clip.
+    """
+    
+    def __init__(self, num_pools=0, pool_size=2, **kwargs):
+        super().__init__(**kwargs)
+        self.num_pools = num_pools
+        self.pool_size = pool_size
+    
+    def call(self, inputs):
+        frame_has_data = tf.cast(tf.reduce_any(tf.not_equal(inputs, 0), axis=-1), tf.float32)
+        valid = tf.math.cumsum(frame_has_data, axis=1, reverse=True) > 0
+        mask = tf.cast(valid, tf.float32)[..., None]
+        for _ in range(self.num_pools):
+            # Same windows as MaxPooling1D(pool_size) with 'valid' padding
+            mask = tf.nn.max_pool1d(mask, ksize=self.pool_size, strides=self.pool_size, padding='VALID')
+        return tf.cast(mask[..., 0], tf.bool)
+    
+    def compute_output_shape(self, input_shape):
+        steps = input_shape[1]
+        return (input_shape[0], None if steps is None else steps // self.pool_size ** self.num_pools)
+    
+    def get_config(self):
+        return {**super().get_config(), 'num_pools': self.num_pools, 'pool_size': self.pool_size}
+
+
+@keras.utils.register_keras_serializable(package="sign_language")
+class ZeroMaskedSteps(layers.Layer):
+    """
+    Zero the features of masked (padding) time steps
+    
+    Conv1D and BatchNormalization turn zero padding into non-zero features, which the
+    next 'same' convolution would mix into the last real steps. Zeroing them keeps the
+    output identical however far a sequence is padded.
+    """
+    
+    def call(self, inputs, step_mask):
+        return inputs * tf.cast(step_mask, inputs.dtype)[..., None]
+
+
+def load_sign_model(path, **kwargs) -> keras.Model:
+    """
+    Load a saved .keras model of this module
+
+    Use this instead of keras.models.load_model: importing this module registers the
+    padding-mask layers that length-bucketed (mask_padding=True) models are built with.
+
+    Args:
+        path: Saved .keras model
+        **kwargs: Passed to keras.models.load_model (e.g. compile=False)
+    """
+    return keras.models.load_model(str(path), **kwargs)
+
+
 def build_cnn_lstm_model(
     input_shape: Tuple[int, int],
     num_classes: int,
     cnn_filters: int = 64,
     lstm_units: int = 128,
     dropout_rate: float = 0.3,
-    num_cnn_layers: int = 2
+    num_cnn_layers: int = 2,
+    mask_padding: bool = False
 ) -> keras.Model:
     """
     Build a CNN + LSTM model for sign language recognition
     
     Args:
-        input_shape: (sequence_length, num_features)
+        input_shape: (sequence_length, num_features); sequence_length may be None for
+                     variable-length batches (e.g. length-bucketed batching)
         num_classes: Number of classes to predict
         cnn_filters: Number of filters in CNN layers
         lstm_units: Number of units in LSTM layer
         dropout_rate: Dropout rate
         num_cnn_layers: Number of CNN layers
+        mask_padding: Mask trailing zero padding (PaddingMask / ZeroMaskedSteps, LSTM mask), so
+                      the prediction doesn't depend on how far a sequence was padded
         
     Returns:
         Compiled Keras model
@@ -38,6 +122,8 @@ def build_cnn_lstm_model(
     # Conv1D works on the last dimension (features), preserving time dimension
     # This learns spatial relationships between keypoints in each frame
     x = inputs
+    if mask_padding:
+        x = padded = PadTimeToMultiple(2 ** num_cnn_layers, name='pad_time')(inputs)
     for i in range(num_cnn_layers):
         # 1D Convolution over features dimension
         # Input: (batch, time, features) -> Output: (batch, time, filters)
@@ -51,6 +137,8 @@ def build_cnn_lstm_model(
         
         # Batch normalization for stable training
         x = layers.BatchNormalization(name=f'bn_{i+1}')(x)
+        if mask_padding:
+            x = ZeroMaskedSteps(name=f'zero_padding_{i+1}')(x, PaddingMask(i, name=f'padding_mask_{i+1}')(padded))
         
         # Max pooling reduces time dimension (not features!)
         # This is OK - we still have temporal information, just less granular
@@ -66,6 +154,10 @@ def build_cnn_lstm_model(
     
     # Bidirectional LSTM for temporal pattern recognition
     # Bidirectional = sees both past and future context
+    mask = None
+    if mask_padding:
+        mask = PaddingMask(num_cnn_layers, name='padding_mask')(padded)
+        x = ZeroMaskedSteps(name='zero_padding')(x, mask)
     x = layers.Bidirectional(
         layers.LSTM(
             lstm_units,
@@ -75,7 +167,7 @@ def build_cnn_lstm_model(
             name='lstm_1'
         ),
         name='bidirectional_lstm'
-    )(x)
+    )(x, mask=mask)
     
     # Additional LSTM layer (optional, can be removed if overfitting)
     # x = layers.Bidirectional(
@@ -0,0 +1,123 @@
+"""
+Per-feature normalization statistics (mean / std) computed in a single streaming pass
+
+Statistics are accumulated chunk by chunk with Chan et al.'s parallel variant of
+Welford's algorithm, so memory stays bounded by the chunk size no matter how many
+frames the training split has. They are saved next to label_mapping.json in the
+run directory, so SignLanguagePredictor applies exactly the training normalization.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.file_utils import atomic_write
+
+NORMALIZATION_STATS_NAME = "normalization_stats.json"
+STD_EPSILON = 1e-8  # Added to std (as the data loader always did) so constant features don't divide by zero
+
+
+class FeatureStats:
+    """Running per-feature count / mean / sum of squared deviations (float64)"""
+
+    def __init__(self, num_features=None):
+        self.count = 0
+        self._mean = None if num_features is None else np.zeros(num_features)
+        self._m2 = None if num_features is None else np.zeros(num_features)
+        self._saved_std = None  # Exact std when rebuilt from saved statistics
+
+    def update(self, frames, chunk_rows=65536):
+        """
+        Add frames to the statistics
+
+        Args:
+            frames: Array with shape (num_frames, num_features) - non-padded frames only
+            chunk_rows: Frames reduced at a time (bounds the temporary float64 copies)
+        """
+        frames = np.asarray(frames)
+        for start in range(0, len(frames), chunk_rows):
+            chunk = frames[start:start + chunk_rows].astype(np.float64)
+            chunk_mean = chunk.mean(axis=0)
+            chunk_m2 = np.square(chunk - chunk_mean).sum(axis=0)
+            self._merge(len(chunk), chunk_mean, chunk_m2)
+        return self
+
+    def _merge(self, count, mean, m2):
+        if count == 0:
+            return
+        self._saved_std = None
+        if self.count == 0:
+            self.count, self._mean, self._m2 = count, mean.copy(), m2.copy()
+            return
+        total = self.count + count
+        delta = mean - self._mean
+        self._mean = self._mean + delta * (count / total)
+        self._m2 = self._m2 + m2 + np.square(delta) * (self.count * count / total)
+        self.count = total
+
+    def merge(self, other):
+        """Combine with statistics accumulated elsewhere (e.g. another worker)"""
+        self._merge(other.count, other._mean, other._m2)
+        return self
+
+    @property
+    def mean(self):
+        """Per-feature mean as float32 (num_features,)"""
+        return self._mean.astype(np.float32)
+
+    @property
+    def std(self):
+        """Per-feature population std + STD_EPSILON as float32 (num_features,)"""
+        if self._saved_std is not None:
+            return self._saved_std
+        return (np.sqrt(self._m2 / max(self.count, 1)) + STD_EPSILON).astype(np.float32)
+
+    def apply(self, X, lengths=None):
+        """
+        Normalize frames; padding (time steps at or beyond each sample's length) stays zero
+
+        Args:
+            X: Array with shape (..., num_features), e.g. (num_frames, features) or
+               (batch, max_length, features)
+            lengths: Optional actual lengths of a batch (batch,) - padded steps are left untouched
+
+        Returns:
+            float32 normalized copy of X
+        """
+        X = np.asarray(X, dtype=np.float32)
+        normalized = (X - self.mean) / self.std
+        if lengths is not None:
+            mask = np.arange(X.shape[1]) < np.asarray(lengths)[:, None]
+            normalized[~mask] = 0
+        return normalized
+
+    @classmethod
+    def from_mean_std(cls, mean, std, count):
+        """Rebuild statistics from a saved mean and std (std including STD_EPSILON)"""
+        stats = cls()
+        stats.count = int(count)
+        stats._mean = np.asarray(mean, dtype=np.float64).ravel()
+        stats._m2 = np.square(np.asarray(std, dtype=np.float64).ravel() - STD_EPSILON) * stats.count
+        stats._saved_std = np.asarray(std, dtype=np.float32).ravel()
+        return stats
+
+    def save(self, path):
+        """Write the statistics as JSON (atomically)"""
+        payload = {
+            'count': self.count,
+            'num_features': len(self._mean),
+            'mean': self.mean.tolist(),
+            'std': self.std.tolist(),
+        }
+        atomic_write(path, lambda f: json.dump(payload, f, indent=2), mode='w')
+
+    @classmethod
+    def load(cls, path):
+        """Read statistics written by save()"""
+        with open(path) as f:
+            payload = json.load(f)
+        return cls.from_mean_std(payload['mean'], payload['std'], payload['count'])
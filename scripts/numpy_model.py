@@ -0,0 +1,209 @@
+"""
+TensorFlow-free inference for the CNN + LSTM model (build_cnn_lstm_model)
+
+export_numpy_weights() dumps a trained .keras model to a compact .npz
+(best_model.keras -> best_model.npz), and NumpyCNNLSTM reproduces its forward pass
+with vectorized NumPy:
+    - Conv1D ('same', kernel 3) as one matmul over the three shifted inputs
+    - BatchNormalization folded at export time into a per-channel scale and shift
+      applied right after the convolution's ReLU (the layer order is conv -> ReLU -> BN)
+    - MaxPooling1D as a reshape + max
+    - the bidirectional LSTM batched over the batch dimension and both directions, with
+      input projections of all time steps computed up front; masked (padding) steps keep
+      the state, like Keras
+    - the Dense layers and softmax
+Length-bucketed models (mask_padding=True) get the same time padding and padding masks.
+
+    python scripts/numpy_model.py models/run_.../best_model.keras
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.file_utils import atomic_write
+from scripts.inference_backends import NUMPY_SUFFIX
+
+NUMPY_MODEL_VERSION = 1
+
+
+def numpy_model_path(model_path, output_dir=None):
+    """Path of a model's NumPy export (best_model.keras -> best_model.npz)"""
+    model_path = Path(model_path)
+    return Path(output_dir or model_path.parent) / f"{model_path.stem}{NUMPY_SUFFIX}"
+
+
+def export_numpy_weights(model_path, output_path=None):
+    """
+    Dump the weights of a build_cnn_lstm_model .keras model to an .npz
+
+    Args:
+        model_path: Trained .keras model
+        output_path: .npz to write (default: next to the model, see numpy_model_path)
+
+    Returns:
+        Path of the .npz
+    """
+    from scripts.model_cnn_lstm import load_sign_model
+
+    model = load_sign_model(model_path)
+    layer_names = {layer.name for layer in model.layers}
+    num_cnn_layers = sum(1 for name in layer_names if name.startswith('conv1d_'))
+    arrays = {
+        'version': np.array(NUMPY_MODEL_VERSION),
+        'num_cnn_layers': np.array(num_cnn_layers),
+        'mask_padding': np.array('pad_time' in layer_names),
+        'sequence_length': np.array(model.input_shape[1] or -1),
+        'num_features': np.array(model.input_shape[2]),
+    }
+
+    for i in range(1, num_cnn_layers + 1):
+        kernel, bias = model.get_layer(f'conv1d_{i}').get_weights()
+        bn = model.get_layer(f'bn_{i}')
+        gamma, beta, moving_mean, moving_variance = bn.get_weights()
+        scale = gamma / np.sqrt(moving_variance + bn.epsilon)
+        arrays[f'conv{i}_kernel'] = kernel.reshape(-1, kernel.shape[2])  # (3 * in, out): matmul over shifts
+        arrays[f'conv{i}_bias'] = bias
+        arrays[f'bn{i}_scale'] = scale
+        arrays[f'bn{i}_shift'] = beta - moving_mean * scale
+
+    bidirectional = model.get_layer('bidirectional_lstm')
+    for direction, layer in (('forward', bidirectional.forward_layer), ('backward', bidirectional.backward_layer)):
+        kernel, recurrent_kernel, bias = layer.get_weights()
+        arrays[f'lstm_{direction}_kernel'] = kernel
+        arrays[f'lstm_{direction}_recurrent'] = recurrent_kernel
+        arrays[f'lstm_{direction}_bias'] = bias
+
+    for name in ('dense_1', 'dense_2', 'output'):
+        weights, bias = model.get_layer(name).get_weights()
+        arrays[f'{name}_weights'] = weights
+        arrays[f'{name}_bias'] = bias
+
+    output_path = Path(output_path or numpy_model_path(model_path))
+    atomic_write(output_path, lambda f: np.savez(f, **{name: np.asarray(value) for name, value in arrays.items()}))
+    return output_path
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1)  # Overflow-free logistic
+
+
+def _pool_mask(mask, num_pools):
+    """Downsample a (batch, time) mask like MaxPooling1D(2) with 'valid' padding, num_pools times"""
+    for _ in range(num_pools):
+        steps = mask.shape[1] // 2
+        mask = mask[:, :steps * 2].reshape(len(mask), steps, 2).any(axis=2)
+    return mask
+
+
+class NumpyCNNLSTM:
+    """Forward pass of an exported CNN + LSTM model in NumPy (float32)"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: .npz written by export_numpy_weights
+        """
+        with np.load(path) as data:
+            self.weights = {name: data[name] for name in data.files}
+        if int(self.weights['version']) != NUMPY_MODEL_VERSION:
+            raise ValueError(f"Unsupported NumPy model version: {int(self.weights['version'])}")
+        self.num_cnn_layers = int(self.weights['num_cnn_layers'])
+        self.mask_padding = bool(self.weights['mask_padding'])
+        steps = int(self.weights['sequence_length'])
+        self.input_shape = (None if steps < 0 else steps, int(self.weights['num_features']))
+        self._recurrent = np.stack([self.weights['lstm_forward_recurrent'], self.weights['lstm_backward_recurrent']])
+
+    def _conv_block(self, x, i):
+        """Conv1D('same', kernel 3) + ReLU, then the folded BatchNormalization"""
+        w = self.weights
+        padded = np.pad(x, ((0, 0), (1, 1), (0, 0)))
+        steps = x.shape[1]
+        shifted = np.concatenate([padded[:, k:k + steps] for k in range(3)], axis=2)
+        x = np.maximum(shifted @ w[f'conv{i}_kernel'] + w[f'conv{i}_bias'], 0)
+        return x * w[f'bn{i}_scale'] + w[f'bn{i}_shift']
+
+    def _bidirectional_lstm(self, x, mask):
+        """
+        Final hidden states of the forward and backward LSTMs, concatenated
+
+        Both directions step together: the backward inputs are time-reversed and the
+        (direction, batch, units) states go through one batched recurrent matmul per step.
+        """
+        w = self.weights
+        projected = np.stack([x @ w['lstm_forward_kernel'] + w['lstm_forward_bias'],  # All steps at once
+                              (x @ w['lstm_backward_kernel'] + w['lstm_backward_bias'])[:, ::-1]])
+        if mask is not None:
+            mask = np.stack([mask, mask[:, ::-1]])[..., None]
+        units = self._recurrent.shape[1]
+        h = np.zeros((2, len(x), units), dtype=np.float32)
+        c = np.zeros_like(h)
+        for t in range(x.shape[1]):
+            z = projected[:, :, t] + h @ self._recurrent
+            gates = _sigmoid(z)  # Keras gate order: input, forget, cell, output
+            c_new = gates[..., units:2 * units] * c + gates[..., :units] * np.tanh(z[..., 2 * units:3 * units])
+            h_new = gates[..., 3 * units:] * np.tanh(c_new)
+            if mask is None:
+                h, c = h_new, c_new
+            else:
+                keep = mask[:, :, t]  # Masked steps carry the state over
+                h, c = np.where(keep, h_new, h), np.where(keep, c_new, c)
+        return np.concatenate([h[0], h[1]], axis=1)
+
+    def __call__(self, X):
+        """
+        Class probabilities
+
+        Args:
+            X: Batch with shape (batch, time, features)
+
+        Returns:
+            float32 array with shape (batch, num_classes)
+        """
+        w = self.weights
+        x = np.asarray(X, dtype=np.float32)
+        valid = None
+        if self.mask_padding:
+            # PadTimeToMultiple, then PaddingMask: valid up to each sequence's last non-zero frame
+            x = np.pad(x, ((0, 0), (0, -x.shape[1] % 2 ** self.num_cnn_layers), (0, 0)))
+            has_data = np.any(x != 0, axis=2)
+            valid = np.cumsum(has_data[:, ::-1], axis=1)[:, ::-1] > 0
+
+        for i in range(1, self.num_cnn_layers + 1):
+            x = self._conv_block(x, i)
+            if valid is not None:
+                x = x * _pool_mask(valid, i - 1)[..., None]
+            steps = x.shape[1] // 2
+            x = x[:, :steps * 2].reshape(len(x), steps, 2, x.shape[2]).max(axis=2)
+
+        mask = None
+        if valid is not None:
+            mask = _pool_mask(valid, self.num_cnn_layers)
+            x = x * mask[..., None]
+        x = self._bidirectional_lstm(x, mask)
+
+        x = np.maximum(x @ w['dense_1_weights'] + w['dense_1_bias'], 0)
+        x = np.maximum(x @ w['dense_2_weights'] + w['dense_2_bias'], 0)
+        logits = x @ w['output_weights'] + w['output_bias']
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return (probabilities / probabilities.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a trained .keras model for TensorFlow-free NumPy inference")
+    parser.add_argument("model", type=str, help="Path to the trained model (.keras file)")
+    parser.add_argument("--output", type=str, default=None,
+                       help="Output .npz (default: next to the model, e.g. best_model.npz)")
+    args = parser.parse_args()
+
+    path = export_numpy_weights(args.model, args.output)
+    print(f"✅ {path} ({path.stat().st_size / 2**20:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
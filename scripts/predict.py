@@ -7,33 +7,61 @@ import argparse
 import numpy as np
 from pathlib import Path
 import json
-from tensorflow import keras
-from tensorflow.keras.preprocessing.sequence import pad_sequences
 
 import sys
 from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from scripts.extract_keypoints import extract_hand_keypoints_from_video, normalize_keypoints, smart_frame_sampling
+from scripts.array_utils import pad_sequences
+from scripts.extract_keypoints import (
+    HandKeypointExtractor, extract_hand_keypoints_from_video, normalize_keypoints, smart_frame_sampling
+)
+from scripts.inference_backends import load_backend
+from scripts.keypoint_format import load_keypoints_file
+from scripts.normalization_stats import NORMALIZATION_STATS_NAME, FeatureStats
+from scripts.word_segmentation import detect_word_boundaries
 
 
 class SignLanguagePredictor:
     """Predictor for sign language recognition"""
     
-    def __init__(self, model_path: str, label_mapping_path: str = None):
+    def __init__(self, model_path: str, label_mapping_path: str = None,
+                 extractor: HandKeypointExtractor = None, extractor_options: dict = None,
+                 normalization_stats_path: str = None, num_threads: int = None):
         """
         Initialize predictor
         
         Args:
-            model_path: Path to saved .keras model file
+            model_path: Path to saved .keras model file, or to a .tflite export of it
+                        (see export_tflite.py) to run it with the TF Lite interpreter, or to
+                        an .npz export (see numpy_model.py) to run it without TensorFlow
             label_mapping_path: Path to label_mapping.json (if None, tries to find in same directory)
+            extractor: HandKeypointExtractor to reuse for video predictions
+                       (if None, one is created on the first video prediction)
+            extractor_options: HandKeypointExtractor settings for the extractor created here
+                               (e.g. {'target_fps': 15, 'max_side': 480})
+            normalization_stats_path: Path to normalization_stats.json of a model trained with
+                                      --normalize (if None, tries to find in same directory)
+            num_threads: TF Lite interpreter threads (.tflite models only)
         """
         self.model_path = Path(model_path)
-        
-        # Load model
+        self.extractor = extractor
+        self.extractor_options = extractor_options or {}
+        
+        # Preprocessing settings of the training run (training_params.json, written by train_model.py)
+        training_params_path = self.model_path.parent / "training_params.json"
+        training_params = {}
+        if training_params_path.exists():
+            with open(training_params_path, 'r') as f:
+                training_params = json.load(f)
+        self.use_smart_sampling = training_params.get('use_smart_sampling', True)
+        
+        # Load model (TensorFlow / TF Lite is imported only once a model is actually loaded)
         print(f"Loading model from {self.model_path}...")
-        self.model = keras.models.load_model(str(self.model_path))
-        print("Model loaded successfully!")
+        self.backend = load_backend(self.model_path, max_length=training_params.get('max_clip_length') or 96,
+                                    num_threads=num_threads)
+        self.model = getattr(self.backend, 'model', None)  # Keras model (None for TF Lite / NumPy)
+        print(f"Model loaded successfully! ({self.backend.name} backend)")
         
         # Load label mapping
         if label_mapping_path is None:
@@ -49,9 +77,44 @@ class SignLanguagePredictor:
             print("Warning: label_mapping.json not found. Using numeric labels.")
             self.label_names = None
         
+        # Load training normalization statistics (only saved for models trained with --normalize)
+        if normalization_stats_path is None:
+            normalization_stats_path = self.model_path.parent / NORMALIZATION_STATS_NAME
+        
+        normalization_stats_path = Path(normalization_stats_path)
+        if normalization_stats_path.exists():
+            self.normalization_stats = FeatureStats.load(normalization_stats_path)
+            print(f"Normalization statistics: {normalization_stats_path}")
+        else:
+            self.normalization_stats = None
+        
         # Get expected input shape from model
-        self.input_shape = self.model.input_shape[1:]  # Remove batch dimension
+        self.input_shape = self.backend.input_shape  # Without the batch dimension
         print(f"Expected input shape: {self.input_shape}")
+        
+        # Frames per prediction window: the model's fixed input length, or for variable-length
+        # (length-bucketed) models the longest training clip
+        self.max_length = self.input_shape[0] or training_params.get('max_clip_length') or 96
+    
+    def predict_probabilities(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities of a preprocessed batch (num_clips, max_length, features)"""
+        return self.backend(X)
+    
+    def get_extractor(self, max_hands: int = 2) -> HandKeypointExtractor:
+        """
+        Get the predictor's long-lived keypoint extractor (created on first use)
+        
+        Args:
+            max_hands: Maximum number of hands to detect
+            
+        Returns:
+            HandKeypointExtractor reused across predict_from_video calls
+        """
+        if self.extractor is None or self.extractor.max_hands != max_hands:
+            if self.extractor is not None:
+                self.extractor.close()
+            self.extractor = HandKeypointExtractor(**{**self.extractor_options, 'max_hands': max_hands})
+        return self.extractor
     
     def preprocess_keypoints(self, keypoints: np.ndarray) -> np.ndarray:
         """
@@ -65,8 +128,8 @@ class SignLanguagePredictor:
         """
         # Apply smart frame sampling to focus on relevant part (skip similar start)
         # This matches what we do during training
-        max_length = self.input_shape[0]
-        keypoints = smart_frame_sampling(keypoints, target_frames=max_length, skip_start_ratio=0.2)
+        if self.use_smart_sampling:
+            keypoints = smart_frame_sampling(keypoints, target_frames=self.max_length, skip_start_ratio=0.2)
         
         # CRITICAL FIX: Use EXACTLY the same normalization as during training
         # During training, keypoints were normalized with minimal=True (only translation)
@@ -86,22 +149,97 @@ class SignLanguagePredictor:
         print(f"   Mean: {np.mean(keypoints_flat):.4f}, Std: {np.std(keypoints_flat):.4f}")
         print(f"   Min: {np.min(keypoints_flat):.4f}, Max: {np.max(keypoints_flat):.4f}")
         
-        # Pad to expected length
-        max_length = self.input_shape[0]
-        keypoints_padded = pad_sequences(
-            [keypoints_flat],
-            maxlen=max_length,
-            dtype='float32',
-            padding='post',
-            truncating='post',
-            value=0.0
-        )
+        # Standardize with the training statistics (before padding, so padded steps stay zero)
+        if self.normalization_stats is not None:
+            keypoints_flat = self.normalization_stats.apply(keypoints_flat)
+        
+        # Pad to expected length (variable-length models: truncated like training, not padded)
+        max_length = self.input_shape[0] or min(len(keypoints_flat), self.max_length)
+        keypoints_padded = pad_sequences([keypoints_flat], maxlen=max_length, dtype=np.float32, value=0.0)
         
         print(f"   Padded shape: {keypoints_padded.shape}")
         print(f"   Expected input shape: {self.input_shape}")
         
         return keypoints_padded
     
+    def preprocess_batch(self, clips: list) -> np.ndarray:
+        """
+        Preprocess several clips into one model batch, each exactly like preprocess_keypoints
+        
+        Clips of equal length are frame-sampled as one stack; normalization and the training
+        statistics then run once over the frames of all clips, which are scattered into the
+        padded batch (padding stays zero).
+        
+        Args:
+            clips: List of keypoints arrays with shape (num_frames, 2, 21, 3)
+            
+        Returns:
+            Array with shape (num_clips, max_length, features); variable-length models are padded
+            to the longest (truncated) clip
+        """
+        if self.use_smart_sampling:
+            by_length = {}
+            for i, clip in enumerate(clips):
+                by_length.setdefault(len(clip), []).append(i)
+            sampled = [None] * len(clips)
+            for indices in by_length.values():
+                stack = smart_frame_sampling(np.stack([clips[i] for i in indices]),
+                                             target_frames=self.max_length, skip_start_ratio=0.2)
+                for i, clip in zip(indices, stack):
+                    sampled[i] = clip
+            clips = sampled
+        
+        lengths = np.array([len(clip) for clip in clips], dtype=np.int64)
+        max_length = self.input_shape[0] or int(min(lengths.max(), self.max_length))
+        lengths = np.minimum(lengths, max_length)  # Truncated at the end, like pad_sequences
+        
+        frames = np.concatenate([clip[:length] for clip, length in zip(clips, lengths)])
+        frames = normalize_keypoints(frames, minimal=True).reshape(len(frames), -1)
+        if self.normalization_stats is not None:
+            frames = self.normalization_stats.apply(frames)
+        
+        X = np.zeros((len(clips), max_length, frames.shape[1]), dtype=np.float32)
+        X[np.arange(max_length) < lengths[:, None]] = frames
+        return X
+    
+    def _prediction_result(self, probabilities: np.ndarray) -> dict:
+        """Prediction dictionary (top prediction, top 3, all classes) of one probability vector"""
+        top_idx = np.argmax(probabilities)
+        label_of = (lambda i: self.label_names[i]) if self.label_names else str
+        top_3_indices = np.argsort(probabilities)[-3:][::-1]
+        return {
+            'prediction': label_of(top_idx),
+            'confidence': float(probabilities[top_idx]),
+            'top_3': [{'label': label_of(idx), 'confidence': float(probabilities[idx])} for idx in top_3_indices],
+            'all_predictions': {label_of(i): float(probabilities[i]) for i in range(len(probabilities))}
+        }
+    
+    def predict_batch(self, clips: list) -> list:
+        """
+        Predict several clips with one preprocessing pass (preprocess_batch) and one model call
+        
+        Clips with hardly any detected keypoints get the same uniform prediction as in
+        predict_from_keypoints (None without a label mapping).
+        
+        Args:
+            clips: List of keypoints arrays with shape (num_frames, 2, 21, 3)
+            
+        Returns:
+            List with one prediction dictionary (as from predict_from_keypoints) or None per clip
+        """
+        detected = [i for i, clip in enumerate(clips)
+                    if clip.size > 0 and np.count_nonzero(clip) / clip.size >= 0.1]
+        results = [None] * len(clips)
+        if detected:
+            predictions = self.predict_probabilities(self.preprocess_batch([clips[i] for i in detected]))
+            for i, probabilities in zip(detected, predictions):
+                results[i] = self._prediction_result(probabilities)
+        if self.label_names:
+            uniform = np.ones(len(self.label_names)) / len(self.label_names)
+            for i in set(range(len(clips))).difference(detected):
+                results[i] = self._prediction_result(uniform)  # One dictionary per clip, never shared
+        return results
+    
     def predict_from_keypoints(self, keypoints: np.ndarray) -> dict:
         """
         Predict from keypoints array
@@ -133,7 +271,7 @@ class SignLanguagePredictor:
             X = self.preprocess_keypoints(keypoints)
             
             # Predict
-            predictions = self.model.predict(X, verbose=0)
+            predictions = self.predict_probabilities(X)
         
         # Debug: Print all predictions
         print(f"\n🔍 Debug - All predictions:")
@@ -146,45 +284,18 @@ class SignLanguagePredictor:
                 conf = float(predictions[0][i])
                 print(f"   Class {i}: {conf:.4f} ({conf*100:.2f}%)")
         
-        # Get top prediction
-        top_idx = np.argmax(predictions[0])
-        confidence = float(predictions[0][top_idx])
-        
-        # Get label name
-        if self.label_names:
-            label = self.label_names[top_idx]
-        else:
-            label = str(top_idx)
-        
-        print(f"✅ Top prediction: {label} (confidence: {confidence:.4f} = {confidence*100:.2f}%)")
-        
-        # Get top 3 predictions
-        top_3_indices = np.argsort(predictions[0])[-3:][::-1]
-        top_3 = []
-        for idx in top_3_indices:
-            if self.label_names:
-                label_name = self.label_names[idx]
-            else:
-                label_name = str(idx)
-            top_3.append({
-                'label': label_name,
-                'confidence': float(predictions[0][idx])
-            })
+        # Top prediction, top 3 and all classes
+        result = self._prediction_result(predictions[0])
+        print(f"✅ Top prediction: {result['prediction']} (confidence: {result['confidence']:.4f} = "
+              f"{result['confidence']*100:.2f}%)")
         
-        return {
-            'prediction': label,
-            'confidence': confidence,
-            'top_3': top_3,
-            'all_predictions': {
-                (self.label_names[i] if self.label_names else str(i)): float(predictions[0][i])
-                for i in range(len(predictions[0]))
-            }
-        }
+        return result
     
     def detect_word_boundaries(self, keypoints: np.ndarray, min_frames_per_word: int = 10, 
                                movement_threshold: float = 0.02) -> list:
         """
         Detect boundaries between words by analyzing hand movement
+        (see word_segmentation.py; WordBoundaryDetector does the same on streams)
         
         Args:
             keypoints: Keypoints array with shape (num_frames, 2, 21, 3)
@@ -194,72 +305,7 @@ class SignLanguagePredictor:
         Returns:
             List of (start_frame, end_frame) tuples for each word segment
         """
-        num_frames = keypoints.shape[0]
-        if num_frames < min_frames_per_word:
-            return [(0, num_frames)]
-        
-        # Calculate movement between consecutive frames
-        movements = []
-        for i in range(1, num_frames):
-            # Calculate distance between frames (using wrist position as reference)
-            frame_diff = np.abs(keypoints[i] - keypoints[i-1])
-            movement = np.mean(frame_diff)
-            movements.append(movement)
-        
-        if len(movements) == 0:
-            return [(0, num_frames)]
-        
-        movements = np.array(movements)
-        
-        # Find frames with low movement (potential word boundaries)
-        # Use a sliding window to smooth movement detection
-        window_size = min(5, len(movements) // 4)
-        if window_size < 1:
-            window_size = 1
-        
-        smoothed_movements = []
-        for i in range(len(movements)):
-            start = max(0, i - window_size // 2)
-            end = min(len(movements), i + window_size // 2 + 1)
-            smoothed_movements.append(np.mean(movements[start:end]))
-        
-        smoothed_movements = np.array(smoothed_movements)
-        threshold = np.percentile(smoothed_movements, 30)  # Bottom 30% = stillness
-        
-        # Find boundaries (low movement areas)
-        boundaries = [0]
-        in_stillness = False
-        stillness_start = None
-        
-        for i, movement in enumerate(smoothed_movements):
-            if movement < threshold:
-                if not in_stillness:
-                    in_stillness = True
-                    stillness_start = i + 1  # +1 because movements start from frame 1
-            else:
-                if in_stillness and stillness_start is not None:
-                    # End of stillness - potential boundary
-                    boundary = (stillness_start + i + 1) // 2
-                    if boundary - boundaries[-1] >= min_frames_per_word:
-                        boundaries.append(boundary)
-                    in_stillness = False
-                    stillness_start = None
-        
-        boundaries.append(num_frames)
-        
-        # Create segments
-        segments = []
-        for i in range(len(boundaries) - 1):
-            start = boundaries[i]
-            end = boundaries[i + 1]
-            if end - start >= min_frames_per_word:
-                segments.append((start, end))
-        
-        # If no segments found, return the whole video
-        if len(segments) == 0:
-            segments = [(0, num_frames)]
-        
-        return segments
+        return detect_word_boundaries(keypoints, min_frames_per_word)
     
     def predict_multiple_words(self, keypoints: np.ndarray, min_confidence: float = 0.1,
                                segment_method: str = 'auto') -> list:
@@ -275,7 +321,7 @@ class SignLanguagePredictor:
             List of dictionaries with predictions for each word segment
         """
         num_frames = keypoints.shape[0]
-        max_length = self.input_shape[0]
+        max_length = self.max_length
         
         if segment_method == 'auto':
             # Detect word boundaries
@@ -291,27 +337,27 @@ class SignLanguagePredictor:
                     segments.append((start, end))
         
         predictions = []
+        if len(segments) == 0:
+            return predictions
         
-        for seg_idx, (start, end) in enumerate(segments):
-            segment_keypoints = keypoints[start:end]
-            
-            # Predict for this segment
-            try:
-                result = self.predict_from_keypoints(segment_keypoints)
-                
-                # Only include if confidence is high enough
-                if result['confidence'] >= min_confidence:
-                    predictions.append({
-                        'word': result['prediction'],
-                        'confidence': result['confidence'],
-                        'start_frame': int(start),
-                        'end_frame': int(end),
-                        'segment_index': seg_idx,
-                        'all_predictions': result.get('all_predictions', {})
-                    })
-            except Exception as e:
-                print(f"Warning: Failed to predict segment {seg_idx}: {e}")
+        # All segments in one preprocessing pass and one forward call
+        results = self.predict_batch([keypoints[start:end] for start, end in segments])
+        
+        for seg_idx, ((start, end), result) in enumerate(zip(segments, results)):
+            if result is None:
+                print(f"Warning: Failed to predict segment {seg_idx}: no hands detected and no label mapping available")
                 continue
+            
+            # Only include if confidence is high enough
+            if result['confidence'] >= min_confidence:
+                predictions.append({
+                    'word': result['prediction'],
+                    'confidence': result['confidence'],
+                    'start_frame': int(start),
+                    'end_frame': int(end),
+                    'segment_index': seg_idx,
+                    'all_predictions': result.get('all_predictions', {})
+                })
         
         return predictions
     
@@ -332,7 +378,8 @@ class SignLanguagePredictor:
         
         # Extract keypoints
         # NOTE: extract_hand_keypoints_from_video already normalizes with minimal=True
-        keypoints = extract_hand_keypoints_from_video(video_path, max_hands=max_hands)
+        keypoints = extract_hand_keypoints_from_video(video_path, max_hands=max_hands,
+                                                      extractor=self.get_extractor(max_hands))
         
         if keypoints is None or len(keypoints) == 0:
             raise ValueError(f"Failed to extract keypoints from {video_path}")
@@ -372,7 +419,7 @@ class SignLanguagePredictor:
             # For short videos (like live chunks), treat as single word
             # For longer videos, try to detect multiple words
             num_frames = len(keypoints)
-            max_length = self.input_shape[0]
+            max_length = self.max_length
             
             # If video is short (less than 1.5x max_length), treat as single word
             if num_frames < max_length * 1.5:
@@ -427,16 +474,16 @@ class SignLanguagePredictor:
     
     def predict_from_npy(self, npy_path: str) -> dict:
         """
-        Predict from .npy file
+        Predict from a .npy (or compact .kpc) keypoints file
         
         Args:
-            npy_path: Path to .npy file with keypoints
+            npy_path: Path to .npy or .kpc file with keypoints
             
         Returns:
             Dictionary with prediction results
         """
         print(f"Loading keypoints from {npy_path}...")
-        keypoints = np.load(npy_path)
+        keypoints = load_keypoints_file(npy_path)
         
         return self.predict_from_keypoints(keypoints)
 
@@ -450,7 +497,7 @@ def main():
     parser.add_argument("--video", type=str, default=None,
                        help="Path to video file")
     parser.add_argument("--keypoints", type=str, default=None,
-                       help="Path to .npy keypoints file")
+                       help="Path to .npy or .kpc keypoints file")
     parser.add_argument("--output", type=str, default=None,
                        help="Output file for results (JSON)")
     
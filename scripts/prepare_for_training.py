@@ -37,18 +37,20 @@ def main():
             print(f"❌ Error: {raw_videos_dir} not found!")
             return False
         
-        # Process videos (will skip existing, process new ones)
+        # Process videos (only new, changed or re-configured ones - see extraction_manifest.json)
         print(f"Processing videos from: {raw_videos_dir}")
         print(f"Output directory: {keypoints_dir}")
         print("\nThis may take a while...")
         
-        process_all_videos(
+        summary = process_all_videos(
             raw_videos_dir, 
             keypoints_dir, 
-            skip_existing=False,  # Re-process all with new normalization
-            overwrite=True        # Overwrite existing with minimal normalization
+            incremental=True,     # Normalization/config changes are detected via the manifest
+            workers=os.cpu_count() or 1  # One detector per core
         )
         
+        if summary['failed']:
+            print(f"⚠️ {len(summary['failed'])} video(s) failed to extract (see summary above)")
         print("✅ Keypoints extraction complete!")
         
     except Exception as e:
@@ -0,0 +1,109 @@
+"""
+On-disk cache of preprocessed dataset splits
+
+SignLanguageDataLoader turns every clip of a split into a (N, max_length, 126) float32
+tensor (load, smart sampling, flattening, padding, optional normalization). With a
+cache directory, the result of each split is stored as an .npz keyed by:
+    - the dataset CSV contents
+    - the SHA-256 of every source file of the split
+    - the preprocessing parameters (target_frames, skip_start_ratio, normalize, ...)
+so any change to one of them produces a new key and the split is rebuilt.
+
+File hashes are remembered by (size, mtime) in file_hashes.json, like the extraction
+manifest does for videos, so an unchanged tree isn't re-hashed on every run.
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.extract_keypoints import hash_file
+from scripts.file_utils import atomic_write
+
+CACHE_VERSION = 2  # 2: streaming normalization statistics
+FILE_HASHES_NAME = "file_hashes.json"
+
+
+class PreprocessedCache:
+    """Split tensors cached under one directory"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self._file_hashes = None
+
+    def _load_file_hashes(self):
+        if self._file_hashes is None:
+            try:
+                with open(self.cache_dir / FILE_HASHES_NAME) as f:
+                    self._file_hashes = json.load(f)
+            except (OSError, ValueError):
+                self._file_hashes = {}
+        return self._file_hashes
+
+    def file_hash(self, path):
+        """SHA-256 of a file (None if it doesn't exist), reused while its size and mtime are unchanged"""
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        hashes = self._load_file_hashes()
+        key = str(path.resolve())
+        entry = hashes.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['hash']
+        digest = hash_file(path)
+        hashes[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+        return digest
+
+    def save_file_hashes(self):
+        """Persist the file hash index (atomically)"""
+        if self._file_hashes is None:
+            return
+        atomic_write(self.cache_dir / FILE_HASHES_NAME, lambda f: json.dump(self._file_hashes, f), mode='w')
+
+    def make_key(self, csv_path, source_files, params):
+        """
+        Cache key of one split
+
+        Args:
+            csv_path: Dataset CSV (its contents are hashed)
+            source_files: Files the split's clips are read from
+            params: JSON-serializable preprocessing parameters
+
+        Returns:
+            Hex digest
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps({'version': CACHE_VERSION, 'params': params}, sort_keys=True).encode())
+        digest.update(hash_file(csv_path).encode())
+        for path in source_files:
+            digest.update(f"{path}:{self.file_hash(path)}\n".encode())
+        self.save_file_hashes()
+        return digest.hexdigest()
+
+    def _path(self, split, key):
+        return self.cache_dir / f"{split}_{key[:20]}.npz"
+
+    def load(self, split, key):
+        """Cached arrays of a split as a dict, or None on a miss"""
+        path = self._path(split, key)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return None  # Unreadable entry - rebuild it
+
+    def save(self, split, key, **arrays):
+        """Store a split's arrays (atomically) and drop older entries of the same split"""
+        path = atomic_write(self._path(split, key), lambda f: np.savez(f, **arrays))
+        for stale in self.cache_dir.glob(f"{split}_*.npz"):
+            if stale != path:
+                stale.unlink()
@@ -23,7 +23,8 @@ print("=" * 60)
 print("Re-extracting Keypoints with MINIMAL Normalization")
 print("=" * 60)
 print("\n⚠️  IMPORTANT:")
-print("   This will OVERWRITE all existing keypoint files!")
+print("   Keypoint files not extracted with the current settings will be OVERWRITTEN!")
+print("   (unchanged videos already extracted this way are skipped - see extraction_manifest.json)")
 print("   Normalization changed to MINIMAL (only translate)")
 print("   This preserves size/rotation differences between classes")
 print("\n" + "=" * 60)
@@ -31,7 +32,7 @@ print("\n" + "=" * 60)
 # Step 1: Re-extract keypoints with minimal normalization
 print("\n[Step 1/3] Re-extracting keypoints from videos...")
 print("   (This may take a while - processing all videos)")
-os.system('python scripts/extract_keypoints.py')
+os.system(f'python scripts/extract_keypoints.py --workers {os.cpu_count() or 1}')
 
 # Step 2: Regenerate CSV
 print("\n[Step 2/3] Regenerating dataset.csv...")
@@ -0,0 +1,157 @@
+"""
+Windowed reading and word recognition for long continuous session recordings
+
+Session files (Data/Keypoints/Sessions/*) are memory-mapped (see open_keypoints_file),
+and SessionReader yields overlapping keypoint windows lazily, so only one window of
+frames is in memory at a time however long the recording is. Windows follow
+predict_multiple_words' sliding segmentation: window frames every hop frames, keeping
+a shorter last window when it has at least min_window frames.
+
+recognize_session() predicts every window and emits a word as soon as a run of
+windows agreeing on it ends:
+
+    python scripts/session_reader.py --model models/run_.../best_model.keras Data/Keypoints/Sessions
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.keypoint_format import COMPACT_SUFFIX, open_keypoints_file
+
+
+class SessionReader:
+    """Lazy, overlapping keypoint windows over a memory-mapped session file"""
+
+    def __init__(self, path, window=96, hop=None, min_window=None):
+        """
+        Args:
+            path: Session keypoints file (.npy or .kpc, shape (num_frames, 2, 21, 3))
+            window: Frames per window
+            hop: Frames between window starts (default: window // 2)
+            min_window: Shortest last window kept (default: window // 2)
+        """
+        if window < 1:
+            raise ValueError(f"window must be positive, got {window}")
+        self.path = Path(path)
+        self.window = window
+        self.hop = hop or max(1, window // 2)
+        self.min_window = window // 2 if min_window is None else min_window
+        self.keypoints = open_keypoints_file(self.path)
+
+    def __len__(self):
+        """Number of frames in the session"""
+        return len(self.keypoints)
+
+    def spans(self):
+        """(start_frame, end_frame) of every window"""
+        num_frames = len(self.keypoints)
+        for start in range(0, num_frames, self.hop):
+            end = min(start + self.window, num_frames)
+            if end - start >= self.min_window:
+                yield start, end
+
+    def __iter__(self):
+        """Yield (start_frame, end_frame, keypoints) - keypoints is a float32 copy of the window"""
+        for start, end in self.spans():
+            yield start, end, np.asarray(self.keypoints[start:end], dtype=np.float32)
+
+
+def session_files(paths):
+    """Session keypoint files of files and directories (searched recursively), sorted"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found = {f.with_suffix(".npy") for pattern in ("*.npy", f"*{COMPACT_SUFFIX}") for f in path.rglob(pattern)}
+            files.extend(sorted(found))
+        else:
+            files.append(path)
+    return files
+
+
+def recognize_session(predictor, path, window=None, hop=None, min_confidence=0.1, quiet=True):
+    """
+    Recognize the words of a session recording incrementally
+
+    Consecutive windows predicting the same word are merged into one word; a word is
+    yielded as soon as its run ends, so results arrive while the session is scanned
+    and only the current run is kept in memory.
+
+    Args:
+        predictor: SignLanguagePredictor
+        path: Session keypoints file
+        window: Frames per window (default: predictor.max_length)
+        hop: Frames between window starts (default: window // 2)
+        min_confidence: Windows below this confidence end the current word and are skipped
+        quiet: Silence the predictor's per-prediction debug output
+
+    Yields:
+        dicts with 'word', 'confidence' (highest over the run), 'start_frame', 'end_frame'
+        and 'windows' (number of merged windows)
+    """
+    reader = SessionReader(path, window=window or predictor.max_length, hop=hop)
+    current = None
+    for start, end, keypoints in reader:
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            result = predictor.predict_from_keypoints(keypoints)
+        word, confidence = result['prediction'], result['confidence']
+        if current is not None and (confidence < min_confidence or word != current['word']):
+            yield current
+            current = None
+        if confidence < min_confidence:
+            continue
+        if current is None:
+            current = {'word': word, 'confidence': confidence, 'start_frame': start, 'end_frame': end, 'windows': 0}
+        current['confidence'] = max(current['confidence'], confidence)
+        current['end_frame'] = end
+        current['windows'] += 1
+    if current is not None:
+        yield current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recognize words in long session recordings, window by window")
+    parser.add_argument("sessions", type=str, nargs="+",
+                       help="Session keypoint files (.npy / .kpc) or directories of them")
+    parser.add_argument("--model", type=str, required=True,
+                       help="Path to trained model (.keras file)")
+    parser.add_argument("--label-mapping", type=str, default=None,
+                       help="Path to label_mapping.json (optional, tries to find in model directory)")
+    parser.add_argument("--window", type=int, default=None,
+                       help="Frames per window (default: the model's input length)")
+    parser.add_argument("--hop", type=int, default=None,
+                       help="Frames between window starts (default: half a window)")
+    parser.add_argument("--min-confidence", type=float, default=0.1,
+                       help="Minimum window confidence for a word")
+    parser.add_argument("--output", type=str, default=None,
+                       help="Append every word as a JSON line to this file")
+    args = parser.parse_args()
+
+    from scripts.predict import SignLanguagePredictor
+    predictor = SignLanguagePredictor(args.model, args.label_mapping)
+
+    output = open(args.output, 'a') if args.output else None
+    try:
+        for path in session_files(args.sessions):
+            print(f"\n{path}:", flush=True)
+            for word in recognize_session(predictor, path, window=args.window, hop=args.hop,
+                                          min_confidence=args.min_confidence):
+                print(f"  [{word['start_frame']:>6}-{word['end_frame']:>6}] {word['word']} "
+                      f"({word['confidence']:.2f})", flush=True)
+                if output is not None:
+                    output.write(json.dumps({'session': str(path), **word}) + "\n")
+                    output.flush()
+    finally:
+        if output is not None:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
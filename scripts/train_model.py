@@ -6,8 +6,6 @@ import argparse
 import os
 from pathlib import Path
 import numpy as np
-from tensorflow import keras
-from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
 import json
 from datetime import datetime
 
@@ -16,7 +14,7 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from scripts.data_loader import SignLanguageDataLoader
-from scripts.model_cnn_lstm import build_cnn_lstm_model, compile_model
+from scripts.normalization_stats import NORMALIZATION_STATS_NAME
 
 
 def train_model(
@@ -31,7 +29,17 @@ def train_model(
     dropout_rate: float = 0.3,  # Dropout rate
     learning_rate: float = 0.001,  # Learning rate
     patience: int = 10,
-    validation_split: float = 0.0  # Not used, we have explicit val set
+    validation_split: float = 0.0,  # Not used, we have explicit val set
+    shard_dir: str = None,
+    cache_dir: str = None,
+    streaming: bool = False,
+    shuffle_buffer: int = 1000,
+    tf_cache: str = None,
+    normalize: bool = False,
+    augment: bool = False,
+    use_smart_sampling: bool = True,
+    bucket_by_length: bool = False,
+    min_hand_presence: float = None
 ):
     """
     Train the CNN + LSTM model
@@ -48,7 +56,32 @@ def train_model(
         dropout_rate: Dropout rate
         learning_rate: Learning rate
         patience: Early stopping patience
+        shard_dir: Optional packed dataset shard to read clips from (see dataset_shard.py)
+        cache_dir: Optional cache of preprocessed split tensors (see preprocessed_cache.py)
+        streaming: Train from tf.data pipelines (SignLanguageDataLoader.as_tf_dataset) that read
+                   clips lazily, instead of holding every split in memory
+        shuffle_buffer: Shuffle buffer size for the streaming training set
+        tf_cache: Streaming only - None (re-read clips every epoch), '' (cache in memory after
+                  the first epoch) or a file path prefix (cache on disk)
+        normalize: Standardize features with training-split statistics, saved to the run
+                   directory (normalization_stats.json) so the predictor applies the same ones
+        augment: Augment training batches (time warp, mirroring, scale/rotation jitter, noise)
+                 on a background thread (see augmentation.py); not combinable with normalize
+        use_smart_sampling: Resample every clip to 96 frames (False: keep each clip's own length,
+                            padded up to the longest training clip)
+        bucket_by_length: Stream batches of similar-length clips, each padded only to its own
+                          longest clip, into a variable-length model that masks the padding
+        min_hand_presence: Skip clips in which no hand was detected in at least this fraction of
+                           frames (read from the CSV's catalog columns, see dataset_catalog.py)
     """
+    if augment and normalize:
+        raise ValueError("--augment works on keypoint coordinates and can't be combined with --normalize")
+    
+    # TensorFlow is imported here rather than at module level, so --help and imports stay fast
+    from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
+    from scripts.model_cnn_lstm import build_cnn_lstm_model, compile_model
+    from scripts.augmentation import KeypointAugmenter, augmented_batches
+    
     # Create output directory
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
@@ -74,35 +107,62 @@ def train_model(
     print("="*60 + "\n")
     
     # Load data
-    # NOTE: Keypoints are already normalized in extraction, so we disable normalization here
+    # NOTE: Keypoints are already normalized in extraction, so additional normalization is off by default
     # This prevents double normalization which can blur class differences
     # Smart frame sampling is enabled by default to skip similar start frames and focus on the gesture
     print("Loading data...")
-    print("⚠️  Using data WITHOUT additional normalization (keypoints already normalized in extraction)")
-    print("✅ Using smart frame sampling (skips similar start, focuses on gesture)")
-    loader = SignLanguageDataLoader(csv_path, keypoints_dir, normalize=False, use_smart_sampling=True)
-    splits = loader.get_all_splits()
-    
-    X_train, y_train = splits['train']
-    X_val, y_val = splits['val']
-    X_test, y_test = splits['test']
-    
-    print(f"\nData shapes:")
-    print(f"  Train: X={X_train.shape}, y={y_train.shape}")
-    print(f"  Val:   X={X_val.shape}, y={y_val.shape}")
-    print(f"  Test:  X={X_test.shape}, y={y_test.shape}")
-    
-    # Check data quality
-    print(f"\nData quality checks:")
-    print(f"  Train samples: {len(X_train)} (expected: ~130)")
-    print(f"  Val samples: {len(X_val)} (expected: ~40)")
-    print(f"  Test samples: {len(X_test)} (expected: ~56)")
-    
-    # Check for NaN or Inf
-    if np.isnan(X_train).any() or np.isinf(X_train).any():
-        print(f"  ⚠️  WARNING: NaN or Inf values in training data!")
+    if normalize:
+        print("✅ Standardizing features with training-split statistics")
+    else:
+        print("⚠️  Using data WITHOUT additional normalization (keypoints already normalized in extraction)")
+    if use_smart_sampling:
+        print("✅ Using smart frame sampling (skips similar start, focuses on gesture)")
     else:
-        print(f"  ✅ No NaN or Inf values in training data")
+        print("⚠️  Smart frame sampling disabled: clips keep their own lengths")
+    loader = SignLanguageDataLoader(csv_path, keypoints_dir, normalize=normalize,
+                                    use_smart_sampling=use_smart_sampling,
+                                    shard_dir=shard_dir, cache_dir=cache_dir,
+                                    min_hand_presence=min_hand_presence)
+    # Length-bucketed batches are variable-length, so they always come from tf.data pipelines
+    streaming = streaming or bucket_by_length
+    if streaming:
+        # Clips are read lazily every epoch (or cached after the first) instead of held in memory
+        def dataset_cache(split):
+            return None if tf_cache is None else (f"{tf_cache}_{split}" if tf_cache else '')
+        
+        train_data = loader.as_tf_dataset('train', batch_size, shuffle_buffer, cache=dataset_cache('train'),
+                                          augmenter=KeypointAugmenter() if augment else None,
+                                          bucket_by_length=bucket_by_length)
+        val_data = loader.as_tf_dataset('val', batch_size, 0, cache=dataset_cache('val'),
+                                        bucket_by_length=bucket_by_length)
+        test_data = loader.as_tf_dataset('test', batch_size, 0, bucket_by_length=bucket_by_length)
+        y_train, y_val, y_test = (loader.get_split_labels(split) for split in ('train', 'val', 'test'))
+        
+        print(f"\nData (streaming):")
+        print(f"  Train: {len(y_train)} samples, Val: {len(y_val)} samples, Test: {len(y_test)} samples")
+    else:
+        splits = loader.get_all_splits()
+        
+        X_train, y_train = splits['train']
+        X_val, y_val = splits['val']
+        X_test, y_test = splits['test']
+        
+        print(f"\nData shapes:")
+        print(f"  Train: X={X_train.shape}, y={y_train.shape}")
+        print(f"  Val:   X={X_val.shape}, y={y_val.shape}")
+        print(f"  Test:  X={X_test.shape}, y={y_test.shape}")
+        
+        # Check data quality
+        print(f"\nData quality checks:")
+        print(f"  Train samples: {len(X_train)} (expected: ~130)")
+        print(f"  Val samples: {len(X_val)} (expected: ~40)")
+        print(f"  Test samples: {len(X_test)} (expected: ~56)")
+        
+        # Check for NaN or Inf
+        if np.isnan(X_train).any() or np.isinf(X_train).any():
+            print(f"  ⚠️  WARNING: NaN or Inf values in training data!")
+        else:
+            print(f"  ✅ No NaN or Inf values in training data")
     
     # Check label distribution
     unique_train, counts_train = np.unique(y_train, return_counts=True)
@@ -134,14 +194,20 @@ def train_model(
         print(f"\n  ⚠️  Class imbalance detected (ratio: {imbalance_ratio:.2f}x)")
         print(f"     Using class weights to balance training")
     
-    # Check data statistics
-    print(f"\n  Data statistics:")
-    print(f"    Train X - Mean: {np.mean(X_train):.4f}, Std: {np.std(X_train):.4f}")
-    print(f"    Train X - Min: {np.min(X_train):.4f}, Max: {np.max(X_train):.4f}")
-    print(f"    Val X - Mean: {np.mean(X_val):.4f}, Std: {np.std(X_val):.4f}")
+    if not streaming:
+        # Check data statistics
+        print(f"\n  Data statistics:")
+        print(f"    Train X - Mean: {np.mean(X_train):.4f}, Std: {np.std(X_train):.4f}")
+        print(f"    Train X - Min: {np.min(X_train):.4f}, Max: {np.max(X_train):.4f}")
+        print(f"    Val X - Mean: {np.mean(X_val):.4f}, Std: {np.std(X_val):.4f}")
     
     # Build model
-    input_shape = (X_train.shape[1], X_train.shape[2])
+    if bucket_by_length:
+        input_shape = (None, 2 * 21 * 3)  # Every batch has its own length
+    elif streaming:
+        input_shape = (loader.max_length, 2 * 21 * 3)
+    else:
+        input_shape = (X_train.shape[1], X_train.shape[2])
     num_classes = loader.num_classes
     
     print(f"\nBuilding model...")
@@ -154,7 +220,8 @@ def train_model(
         cnn_filters=cnn_filters,
         lstm_units=lstm_units,
         dropout_rate=dropout_rate,
-        num_cnn_layers=num_cnn_layers
+        num_cnn_layers=num_cnn_layers,
+        mask_padding=bucket_by_length
     )
     
     model = compile_model(model, learning_rate=learning_rate)
@@ -176,6 +243,10 @@ def train_model(
     with open(run_dir / "label_mapping.json", "w") as f:
         json.dump(label_mapping, f, indent=2)
     
+    # Save normalization statistics (loaded by SignLanguagePredictor from the same directory)
+    if loader.normalization_stats is not None:
+        loader.normalization_stats.save(run_dir / NORMALIZATION_STATS_NAME)
+    
     # Callbacks - improved for better training
     callbacks = [
         ModelCheckpoint(
@@ -210,34 +281,43 @@ def train_model(
     print("Starting training...")
     print("="*60 + "\n")
     
-    # Shuffle data for better training
-    # Create indices and shuffle
-    train_indices = np.arange(len(X_train))
-    np.random.seed(42)
-    np.random.shuffle(train_indices)
-    X_train_shuffled = X_train[train_indices]
-    y_train_shuffled = y_train[train_indices]
+    if streaming:
+        # The dataset shuffles (shuffle_buffer) and batches itself
+        fit_args = dict(x=train_data, validation_data=val_data, shuffle=False, class_weight=class_weight_dict)
+    elif augment:
+        # Shuffled, augmented batches from a background thread; class weights become sample weights
+        fit_args = dict(x=augmented_batches(X_train, y_train, batch_size, KeypointAugmenter(),
+                                            class_weight=class_weight_dict, seed=42),
+                        steps_per_epoch=int(np.ceil(len(X_train) / batch_size)),
+                        validation_data=(X_val, y_val), shuffle=False)
+    else:
+        # Shuffle data for better training
+        # Create indices and shuffle
+        train_indices = np.arange(len(X_train))
+        np.random.seed(42)
+        np.random.shuffle(train_indices)
+        X_train_shuffled = X_train[train_indices]
+        y_train_shuffled = y_train[train_indices]
+        fit_args = dict(x=X_train_shuffled, y=y_train_shuffled, batch_size=batch_size,
+                        validation_data=(X_val, y_val), shuffle=True,  # Shuffle batches
+                        class_weight=class_weight_dict)  # Use class weights to handle imbalance
     
     # Train model with progress tracking
     print("\n" + "="*60)
     print("Starting training...")
     print("="*60)
-    print(f"Training samples: {len(X_train_shuffled)}")
-    print(f"Validation samples: {len(X_val)}")
+    print(f"Training samples: {len(y_train)}")
+    print(f"Validation samples: {len(y_val)}")
     print(f"Batch size: {batch_size}")
     print(f"Epochs: {epochs}")
     print("="*60 + "\n")
     
     try:
         history = model.fit(
-            X_train_shuffled, y_train_shuffled,
-            batch_size=batch_size,
+            **fit_args,
             epochs=epochs,
-            validation_data=(X_val, y_val),
             callbacks=callbacks,
-            verbose=1,
-            shuffle=True,  # Shuffle batches
-            class_weight=class_weight_dict  # Use class weights to handle imbalance
+            verbose=1
         )
     except KeyboardInterrupt:
         print("\n⚠️  Training interrupted by user")
@@ -263,7 +343,10 @@ def train_model(
     print("Evaluating on test set...")
     print("="*60)
     
-    test_loss, test_accuracy = model.evaluate(X_test, y_test, verbose=1)
+    if streaming:
+        test_loss, test_accuracy = model.evaluate(test_data, verbose=1)
+    else:
+        test_loss, test_accuracy = model.evaluate(X_test, y_test, verbose=1)
     print(f"\nTest Accuracy: {test_accuracy:.4f}")
     print(f"Test Loss: {test_loss:.4f}")
     
@@ -285,10 +368,16 @@ def train_model(
         'dropout_rate': dropout_rate,
         'learning_rate': learning_rate,
         'patience': patience,
+        'normalize': normalize,
+        'augment': augment,
+        'use_smart_sampling': use_smart_sampling,
+        'bucket_by_length': bucket_by_length,
+        'min_hand_presence': min_hand_presence,
+        'max_clip_length': loader.max_length,
         'input_shape': input_shape,
         'num_classes': num_classes,
-        'max_sequence_length': X_train.shape[1],
-        'num_features': X_train.shape[2]
+        'max_sequence_length': input_shape[0],
+        'num_features': input_shape[1]
     }
     with open(run_dir / "training_params.json", "w") as f:
         json.dump(training_params, f, indent=2)
@@ -326,6 +415,28 @@ if __name__ == "__main__":
                        help="Learning rate")
     parser.add_argument("--patience", type=int, default=10,
                        help="Early stopping patience")
+    parser.add_argument("--shard", type=str, default=None,
+                       help="Packed dataset shard to read clips from (see dataset_shard.py)")
+    parser.add_argument("--cache-dir", type=str, default="Data/Cache/preprocessed",
+                       help="Cache of preprocessed split tensors (see preprocessed_cache.py)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always rebuild the split tensors from the keypoint files")
+    parser.add_argument("--streaming", action="store_true",
+                       help="Stream clips through tf.data instead of loading every split into memory")
+    parser.add_argument("--shuffle-buffer", type=int, default=1000,
+                       help="Shuffle buffer size for --streaming")
+    parser.add_argument("--tf-cache", type=str, default=None,
+                       help="With --streaming: cache clips after the first epoch ('memory' or a file path prefix)")
+    parser.add_argument("--normalize", action="store_true",
+                       help="Standardize features with training-split statistics (saved with the model)")
+    parser.add_argument("--augment", action="store_true",
+                       help="Augment training batches (time warp, mirroring, scale/rotation jitter, noise)")
+    parser.add_argument("--no-smart-sampling", action="store_true",
+                       help="Keep each clip's own length instead of resampling to 96 frames")
+    parser.add_argument("--bucket", action="store_true",
+                       help="Batch clips of similar length, padded per batch (variable-length model with masking)")
+    parser.add_argument("--min-hand-presence", type=float, default=None,
+                       help="Skip clips with a hand detected in less than this fraction of frames (needs the CSV catalog)")
     
     args = parser.parse_args()
     
@@ -340,6 +451,16 @@ if __name__ == "__main__":
         num_cnn_layers=args.num_cnn_layers,
         dropout_rate=args.dropout,
         learning_rate=args.learning_rate,
-        patience=args.patience
+        patience=args.patience,
+        shard_dir=args.shard,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        streaming=args.streaming,
+        shuffle_buffer=args.shuffle_buffer,
+        tf_cache='' if args.tf_cache == 'memory' else args.tf_cache,
+        normalize=args.normalize,
+        augment=args.augment,
+        use_smart_sampling=not args.no_smart_sampling,
+        bucket_by_length=args.bucket,
+        min_hand_presence=args.min_hand_presence
     )
 
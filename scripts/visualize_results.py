@@ -7,9 +7,6 @@ import json
 import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
-from tensorflow import keras
-from sklearn.metrics import confusion_matrix, classification_report
-import seaborn as sns
 import sys
 
 # Add parent directory to path
@@ -50,6 +47,43 @@ def load_label_mapping(run_dir):
     return mapping
 
 
+def load_training_params(run_dir):
+    """Load training parameters from JSON"""
+    params_path = Path(run_dir) / "training_params.json"
+    if not params_path.exists():
+        return None
+    
+    with open(params_path, 'r') as f:
+        params = json.load(f)
+    return params
+
+
+def load_test_data(run_dir, csv_path, keypoints_dir, shard_dir=None, cache_dir=None):
+    """
+    Test split padded like the run's training data
+    
+    The padding length (and smart sampling) come from the run's training_params.json,
+    so the test tensors have the model's input length and the preprocessed cache key
+    matches the entry train_model wrote.
+    
+    Returns:
+        Tuple of (X_test, y_test)
+    """
+    params = load_training_params(run_dir) or {}
+    use_smart_sampling = params.get('use_smart_sampling', True)
+    loader = SignLanguageDataLoader(csv_path, keypoints_dir, normalize=False, use_smart_sampling=use_smart_sampling,
+                                    shard_dir=shard_dir, cache_dir=cache_dir,
+                                    min_hand_presence=params.get('min_hand_presence'))
+    max_length = params.get('max_clip_length')
+    if max_length is None and use_smart_sampling:
+        max_length = loader.target_frames  # Smart sampling resamples every clip to target_frames
+    if max_length is None:
+        raise ValueError(f"No max_clip_length in {Path(run_dir) / 'training_params.json'} "
+                         f"and smart sampling is off: can't tell the padding length")
+    loader.max_length = int(max_length)
+    return loader.get_split_data('test')
+
+
 def plot_training_history(run_dir, output_path=None):
     """Plot training history (accuracy and loss over epochs)"""
     history = load_training_history(run_dir)
@@ -114,7 +148,7 @@ def plot_training_history(run_dir, output_path=None):
     plt.close()
 
 
-def plot_test_predictions(run_dir, csv_path, keypoints_dir, output_path=None):
+def plot_test_predictions(run_dir, csv_path, keypoints_dir, output_path=None, shard_dir=None, cache_dir=None):
     """Plot actual vs predicted for test set (similar to the example image)"""
     # Load model
     model_path = Path(run_dir) / "best_model.keras"
@@ -122,16 +156,18 @@ def plot_test_predictions(run_dir, csv_path, keypoints_dir, output_path=None):
         print(f"Model not found: {model_path}")
         return
     
+    from scripts.model_cnn_lstm import load_sign_model  # Imported only when a model is evaluated
+    
     try:
         # Try loading with custom_objects to handle initializer issues
-        model = keras.models.load_model(str(model_path), compile=False)
+        model = load_sign_model(model_path, compile=False)
     except (ValueError, TypeError) as e:
         print(f"Warning: Could not load model with standard method: {e}")
         print("Trying alternative loading method with custom objects...")
         try:
             from tensorflow.keras.initializers import Orthogonal
             custom_objects = {'Orthogonal': Orthogonal}
-            model = keras.models.load_model(str(model_path), compile=False, custom_objects=custom_objects)
+            model = load_sign_model(model_path, compile=False, custom_objects=custom_objects)
         except Exception as e2:
             print(f"Error loading model: {e2}")
             print("Note: This might be a Keras version compatibility issue.")
@@ -141,8 +177,7 @@ def plot_test_predictions(run_dir, csv_path, keypoints_dir, output_path=None):
             return
     
     # Load data
-    loader = SignLanguageDataLoader(csv_path, keypoints_dir, normalize=False, use_smart_sampling=True)
-    X_test, y_test = loader.get_split_data('test')
+    X_test, y_test = load_test_data(run_dir, csv_path, keypoints_dir, shard_dir=shard_dir, cache_dir=cache_dir)
     
     # Get predictions
     y_pred_proba = model.predict(X_test, verbose=0)
@@ -200,7 +235,7 @@ def plot_test_predictions(run_dir, csv_path, keypoints_dir, output_path=None):
     plt.close()
 
 
-def plot_confusion_matrix(run_dir, csv_path, keypoints_dir, output_path=None):
+def plot_confusion_matrix(run_dir, csv_path, keypoints_dir, output_path=None, shard_dir=None, cache_dir=None):
     """Plot confusion matrix"""
     # Load model
     model_path = Path(run_dir) / "best_model.keras"
@@ -208,16 +243,19 @@ def plot_confusion_matrix(run_dir, csv_path, keypoints_dir, output_path=None):
         print(f"Model not found: {model_path}")
         return
     
+    import seaborn as sns
+    from sklearn.metrics import confusion_matrix
+    from scripts.model_cnn_lstm import load_sign_model
+    
     try:
-        model = keras.models.load_model(str(model_path), compile=False)
+        model = load_sign_model(model_path, compile=False)
     except (ValueError, TypeError) as e:
         print(f"Warning: Could not load model: {e}")
         print("Skipping confusion matrix plot...")
         return
     
     # Load data
-    loader = SignLanguageDataLoader(csv_path, keypoints_dir, normalize=False, use_smart_sampling=True)
-    X_test, y_test = loader.get_split_data('test')
+    X_test, y_test = load_test_data(run_dir, csv_path, keypoints_dir, shard_dir=shard_dir, cache_dir=cache_dir)
     
     # Get predictions
     y_pred_proba = model.predict(X_test, verbose=0)
@@ -266,7 +304,7 @@ def plot_confusion_matrix(run_dir, csv_path, keypoints_dir, output_path=None):
     plt.close()
 
 
-def plot_per_class_accuracy(run_dir, csv_path, keypoints_dir, output_path=None):
+def plot_per_class_accuracy(run_dir, csv_path, keypoints_dir, output_path=None, shard_dir=None, cache_dir=None):
     """Plot accuracy per class"""
     # Load model
     model_path = Path(run_dir) / "best_model.keras"
@@ -274,16 +312,17 @@ def plot_per_class_accuracy(run_dir, csv_path, keypoints_dir, output_path=None):
         print(f"Model not found: {model_path}")
         return
     
+    from scripts.model_cnn_lstm import load_sign_model
+    
     try:
-        model = keras.models.load_model(str(model_path), compile=False)
+        model = load_sign_model(model_path, compile=False)
     except (ValueError, TypeError) as e:
         print(f"Warning: Could not load model: {e}")
         print("Skipping per-class accuracy plot...")
         return
     
     # Load data
-    loader = SignLanguageDataLoader(csv_path, keypoints_dir, normalize=False, use_smart_sampling=True)
-    X_test, y_test = loader.get_split_data('test')
+    X_test, y_test = load_test_data(run_dir, csv_path, keypoints_dir, shard_dir=shard_dir, cache_dir=cache_dir)
     
     # Get predictions
     y_pred_proba = model.predict(X_test, verbose=0)
@@ -345,7 +384,7 @@ def plot_per_class_accuracy(run_dir, csv_path, keypoints_dir, output_path=None):
     plt.close()
 
 
-def print_classification_report(run_dir, csv_path, keypoints_dir):
+def print_classification_report(run_dir, csv_path, keypoints_dir, shard_dir=None, cache_dir=None):
     """Print detailed classification report"""
     # Load model
     model_path = Path(run_dir) / "best_model.keras"
@@ -353,16 +392,18 @@ def print_classification_report(run_dir, csv_path, keypoints_dir):
         print(f"Model not found: {model_path}")
         return
     
+    from sklearn.metrics import classification_report
+    from scripts.model_cnn_lstm import load_sign_model
+    
     try:
-        model = keras.models.load_model(str(model_path), compile=False)
+        model = load_sign_model(model_path, compile=False)
     except (ValueError, TypeError) as e:
         print(f"Warning: Could not load model: {e}")
         print("Skipping classification report...")
         return
     
     # Load data
-    loader = SignLanguageDataLoader(csv_path, keypoints_dir, normalize=False, use_smart_sampling=True)
-    X_test, y_test = loader.get_split_data('test')
+    X_test, y_test = load_test_data(run_dir, csv_path, keypoints_dir, shard_dir=shard_dir, cache_dir=cache_dir)
     
     # Get predictions
     y_pred_proba = model.predict(X_test, verbose=0)
@@ -395,10 +436,17 @@ def main():
                        help="Path to keypoints directory")
     parser.add_argument("--output-dir", type=str, default="output/plots",
                        help="Directory to save plots")
+    parser.add_argument("--shard", type=str, default=None,
+                       help="Packed dataset shard to read clips from (see dataset_shard.py)")
+    parser.add_argument("--cache-dir", type=str, default="Data/Cache/preprocessed",
+                       help="Cache of preprocessed test tensors (see preprocessed_cache.py)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always rebuild the test tensors from the keypoint files")
     
     args = parser.parse_args()
     
     run_dir = Path(args.run_dir)
+    cache_dir = None if args.no_cache else args.cache_dir
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     
@@ -416,21 +464,21 @@ def main():
     # Plot 2: Test Predictions (Actual vs Predicted)
     print("\n2. Plotting test predictions (Actual vs Predicted)...")
     plot_test_predictions(run_dir, args.csv, args.keypoints_dir, 
-                         output_dir / "test_predictions.png")
+                         output_dir / "test_predictions.png", shard_dir=args.shard, cache_dir=cache_dir)
     
     # Plot 3: Confusion Matrix
     print("\n3. Plotting confusion matrix...")
     plot_confusion_matrix(run_dir, args.csv, args.keypoints_dir,
-                         output_dir / "confusion_matrix.png")
+                         output_dir / "confusion_matrix.png", shard_dir=args.shard, cache_dir=cache_dir)
     
     # Plot 4: Per-Class Accuracy
     print("\n4. Plotting per-class accuracy...")
     plot_per_class_accuracy(run_dir, args.csv, args.keypoints_dir,
-                            output_dir / "per_class_accuracy.png")
+                            output_dir / "per_class_accuracy.png", shard_dir=args.shard, cache_dir=cache_dir)
     
     # Print classification report
     print("\n5. Classification Report:")
-    print_classification_report(run_dir, args.csv, args.keypoints_dir)
+    print_classification_report(run_dir, args.csv, args.keypoints_dir, shard_dir=args.shard, cache_dir=cache_dir)
     
     print("\n" + "="*60)
     print("All plots saved to:", output_dir)
@@ -0,0 +1,297 @@
+"""
+Word boundary detection from hand movement
+
+Movement is the mean absolute keypoint change between consecutive frames, smoothed
+by a centered moving average; runs of frames whose smoothed movement is below the
+30th percentile are stillness, and the middle of each stillness run is a boundary
+between words.
+
+    - detect_word_boundaries(): whole clip at once (np.diff + cumulative-sum moving
+      average), as used by SignLanguagePredictor.predict_multiple_words
+    - WordBoundaryDetector: the same detection on frames as they arrive (live streams,
+      hour-long session files), with bounded state; the percentile is a running P²
+      estimate over the movement seen so far instead of one over the whole recording
+"""
+
+import sys
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.keypoint_format import open_keypoints_file
+
+STILLNESS_PERCENTILE = 30  # Smoothed movement in the bottom 30% = stillness
+MAX_SMOOTHING_WINDOW = 5
+
+
+def frame_movements(keypoints):
+    """Mean absolute keypoint change between consecutive frames: shape (num_frames - 1,)"""
+    keypoints = np.asarray(keypoints)
+    diffs = np.abs(np.diff(keypoints, axis=0))
+    return diffs.reshape(len(diffs), int(np.prod(keypoints.shape[1:]))).mean(axis=1)
+
+
+def moving_average(values, window_size):
+    """
+    Centered moving average from cumulative sums
+
+    Each value averages the window_size // 2 values on either side of it; windows are
+    truncated at both ends of the array.
+    """
+    half = window_size // 2
+    cumulative = np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+    index = np.arange(len(values))
+    start = np.maximum(index - half, 0)
+    end = np.minimum(index + half + 1, len(values))
+    return (cumulative[end] - cumulative[start]) / (end - start)
+
+
+def _segments(boundaries, num_frames, min_frames_per_word):
+    """Segments between consecutive boundaries (and the end), or the whole clip if none is long enough"""
+    boundaries = list(boundaries) + [num_frames]
+    segments = [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:])
+                if end - start >= min_frames_per_word]
+    return segments or [(0, num_frames)]
+
+
+def detect_word_boundaries(keypoints, min_frames_per_word=10):
+    """
+    Detect boundaries between words by analyzing hand movement
+
+    Args:
+        keypoints: Keypoints array with shape (num_frames, 2, 21, 3)
+        min_frames_per_word: Minimum frames for a valid word segment
+
+    Returns:
+        List of (start_frame, end_frame) tuples for each word segment
+    """
+    num_frames = keypoints.shape[0]
+    if num_frames < min_frames_per_word or num_frames < 2:
+        return [(0, num_frames)]
+
+    movements = frame_movements(keypoints)
+    smoothed = moving_average(movements, max(1, min(MAX_SMOOTHING_WINDOW, len(movements) // 4)))
+    still = smoothed < np.percentile(smoothed, STILLNESS_PERCENTILE)
+
+    # Stillness runs [start, end); a run still going at the last frame yields no boundary
+    edges = np.diff(still.astype(np.int8), prepend=0, append=0)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    closed = ends < len(smoothed)
+    # Movements start from frame 1: the run covers frames start + 1 .. end, the boundary is its middle
+    candidates = (starts[closed] + ends[closed] + 2) // 2
+
+    boundaries = [0]
+    for boundary in candidates.tolist():
+        if boundary - boundaries[-1] >= min_frames_per_word:
+            boundaries.append(boundary)
+    return _segments(boundaries, num_frames, min_frames_per_word)
+
+
+class RunningQuantile:
+    """
+    Streaming quantile estimate with constant memory (Jain & Chlamtac's P² algorithm)
+
+    Exact (np.percentile's linear interpolation) for the first five values, then tracks
+    the quantile with five markers whose heights are adjusted by parabolic interpolation.
+    """
+
+    def __init__(self, quantile):
+        """
+        Args:
+            quantile: Quantile to track, in (0, 1)
+        """
+        self.quantile = quantile
+        self.count = 0
+        self._heights = []
+        p = quantile
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        """Add one value"""
+        x = float(x)
+        self.count += 1
+        q, n = self._heights, self._positions
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < height < q[i + 1]:  # Parabola out of order: linear step instead
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    @property
+    def value(self):
+        """Current estimate (NaN before the first value)"""
+        if self.count == 0:
+            return float('nan')
+        if self.count <= 5:
+            return float(np.percentile(self._heights, self.quantile * 100))
+        return self._heights[2]
+
+
+class WordBoundaryDetector:
+    """
+    Online detect_word_boundaries: feed frames with update(), get word segments as they end
+
+    State is bounded whatever the stream length: the last frame, the running sums of the
+    smoothing window, the running percentile's five markers and the stillness state
+    machine. A segment is emitted as soon as the stillness run ending it is over, i.e.
+    about window_size // 2 frames after the signer starts moving again.
+    """
+
+    def __init__(self, min_frames_per_word=10, window_size=MAX_SMOOTHING_WINDOW, threshold=None):
+        """
+        Args:
+            min_frames_per_word: Minimum frames for a valid word segment
+            window_size: Moving average window (detect_word_boundaries' window for
+                         clips of 21+ frames)
+            threshold: Fixed stillness threshold (default: running 30th percentile of
+                       the smoothed movement so far)
+        """
+        self.min_frames_per_word = min_frames_per_word
+        self.half_window = max(1, window_size) // 2
+        self.threshold = threshold
+        self.num_frames = 0
+        self._quantile = RunningQuantile(STILLNESS_PERCENTILE / 100)
+        self._last_frame = None
+        self._num_movements = 0
+        self._total = 0.0
+        # Cumulative movement sums cumulative[k - 2 * half - 1 .. k] for the last k movements seen
+        self._cumulative = deque([0.0], maxlen=2 * self.half_window + 2)
+        self._num_smoothed = 0
+        self._stillness_start = None
+        self._last_boundary = 0
+        self._emitted = 0
+        self._finished = False
+
+    def update(self, frames):
+        """
+        Add frames
+
+        Args:
+            frames: Keypoints with shape (num_frames, 2, 21, 3) following the frames so far
+
+        Returns:
+            (start_frame, end_frame) of the word segments that ended within these frames
+        """
+        if self._finished:
+            raise RuntimeError("update() after finish()")
+        frames = np.asarray(frames)
+        if len(frames) == 0:
+            return []
+        if self._last_frame is not None:
+            frames_with_previous = np.concatenate([self._last_frame[None].astype(frames.dtype), frames])
+        else:
+            frames_with_previous = frames
+        self._last_frame = frames[-1].copy()
+        self.num_frames += len(frames)
+
+        segments = []
+        for movement in frame_movements(frames_with_previous).tolist():
+            self._total += movement
+            self._cumulative.append(self._total)
+            self._num_movements += 1
+            if self._num_movements > self.half_window:
+                # Window of the value half a window back is complete
+                segments.extend(self._smoothed_step(self._num_movements))
+        return segments
+
+    def finish(self):
+        """
+        End the stream
+
+        Returns:
+            The remaining word segments: the last one, or the whole stream if no segment
+            was long enough
+        """
+        if self._finished:
+            return []
+        self._finished = True
+        segments = []
+        while self._num_smoothed < self._num_movements:  # Windows truncated at the end
+            segments.extend(self._smoothed_step(self._num_movements))
+        if self.num_frames - self._last_boundary >= self.min_frames_per_word:
+            segments.append((self._last_boundary, self.num_frames))
+        if self._emitted + len(segments) == 0:
+            segments.append((0, self.num_frames))
+        return segments
+
+    def _smoothed_step(self, end):
+        """Smooth the next movement (its window ends at movement `end`) and run the stillness state machine"""
+        i = self._num_smoothed
+        self._num_smoothed += 1
+        start = max(0, i - self.half_window)
+        # self._cumulative[-1] is cumulative[self._num_movements]
+        offset = len(self._cumulative) - 1 - self._num_movements
+        smoothed = (self._cumulative[end + offset] - self._cumulative[start + offset]) / (end - start)
+
+        if self.threshold is None:
+            self._quantile.add(smoothed)
+            threshold = self._quantile.value
+        else:
+            threshold = self.threshold
+
+        if smoothed < threshold:
+            if self._stillness_start is None:
+                self._stillness_start = i + 1  # +1 because movements start from frame 1
+            return []
+        if self._stillness_start is None:
+            return []
+        # End of stillness - potential boundary
+        boundary = (self._stillness_start + i + 1) // 2
+        self._stillness_start = None
+        if boundary - self._last_boundary < self.min_frames_per_word:
+            return []
+        segment = (self._last_boundary, boundary)
+        self._last_boundary = boundary
+        self._emitted += 1
+        return [segment]
+
+
+def session_word_boundaries(path, min_frames_per_word=10, chunk_frames=4096, threshold=None):
+    """
+    Word segments of a session keypoints file, read chunk by chunk (memory-mapped)
+
+    Args:
+        path: Session keypoints file (.npy or .kpc)
+        min_frames_per_word: Minimum frames for a valid word segment
+        chunk_frames: Frames read at a time
+        threshold: Fixed stillness threshold (default: running percentile)
+
+    Yields:
+        (start_frame, end_frame) of each word segment, as soon as it ends
+    """
+    keypoints = open_keypoints_file(path)
+    detector = WordBoundaryDetector(min_frames_per_word, threshold=threshold)
+    for start in range(0, len(keypoints), chunk_frames):
+        yield from detector.update(np.asarray(keypoints[start:start + chunk_frames], dtype=np.float32))
+    yield from detector.finish()
@@ -0,0 +1,220 @@
+"""
+Reference implementations the vectorized code paths replaced, and synthetic inputs
+
+The parity tests compare the fast paths against these, and scripts/benchmark.py
+times them against each other.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+
+def normalize_keypoints_loop(keypoints_array, minimal=False):
+    """Original per-frame, per-hand normalize_keypoints"""
+    normalized = keypoints_array.copy()
+    num_frames, num_hands, _, _ = normalized.shape
+    for frame_idx in range(num_frames):
+        for hand_idx in range(num_hands):
+            hand_keypoints = normalized[frame_idx, hand_idx, :, :].copy()
+            wrist = hand_keypoints[0, :]
+            if np.allclose(wrist, 0.0):
+                continue
+            hand_keypoints = hand_keypoints - wrist
+            if minimal:
+                normalized[frame_idx, hand_idx, :, :] = hand_keypoints
+                continue
+            hand_direction = hand_keypoints[5, :] - hand_keypoints[17, :]
+            if hand_direction[0] < 0:
+                hand_keypoints[:, 0] = -hand_keypoints[:, 0]
+            middle_mcp_xy = hand_keypoints[9, :2]
+            middle_mcp_xy_norm = np.linalg.norm(middle_mcp_xy)
+            if middle_mcp_xy_norm > 1e-6:
+                current_direction = middle_mcp_xy / middle_mcp_xy_norm
+                cos_angle = current_direction[1]
+                sin_angle = current_direction[0]  # 2D cross product with (0, 1)
+                angle = np.arctan2(sin_angle, cos_angle)
+                cos_a = np.cos(-angle)
+                sin_a = np.sin(-angle)
+                rotation_matrix = np.array([[cos_a, -sin_a, 0],
+                                            [sin_a, cos_a, 0],
+                                            [0, 0, 1]])
+                hand_keypoints = hand_keypoints @ rotation_matrix.T
+            hand_size = np.linalg.norm(hand_keypoints[9, :])
+            if hand_size > 1e-6:
+                hand_keypoints = hand_keypoints / hand_size
+            normalized[frame_idx, hand_idx, :, :] = hand_keypoints
+    return normalized
+
+
+def smart_frame_sampling_loop(keypoints_array, target_frames=96, skip_start_ratio=0.2):
+    """Original list-based smart_frame_sampling"""
+    num_frames = len(keypoints_array)
+    if num_frames == 0:
+        return keypoints_array
+    if num_frames <= target_frames:
+        skip_frames = max(1, int(num_frames * skip_start_ratio))
+        relevant = keypoints_array[skip_frames:]
+        if len(relevant) < 2:
+            if len(relevant) == 0:
+                relevant = keypoints_array
+            repeat_factor = (target_frames // len(relevant)) + 1
+            repeated = np.tile(relevant, (repeat_factor, 1, 1, 1))
+            return repeated[:target_frames]
+        indices = np.linspace(0, len(relevant) - 1, target_frames)
+        sampled = []
+        for idx in indices:
+            idx_int = int(idx)
+            if idx_int < len(relevant) - 1:
+                alpha = idx - idx_int
+                frame = (1 - alpha) * relevant[idx_int] + alpha * relevant[idx_int + 1]
+            else:
+                frame = relevant[-1]
+            sampled.append(frame)
+        return np.array(sampled)
+    else:
+        skip_frames = max(1, int(num_frames * skip_start_ratio))
+        start_idx = skip_frames
+        end_idx = num_frames
+        mid_point = start_idx + int((end_idx - start_idx) * 0.3)
+        first_part_frames = int(target_frames * 0.3)
+        second_part_frames = target_frames - first_part_frames
+        indices = []
+        if first_part_frames > 0:
+            indices.extend(np.linspace(start_idx, mid_point, first_part_frames, dtype=int))
+        if second_part_frames > 0:
+            indices.extend(np.linspace(mid_point, end_idx - 1, second_part_frames, dtype=int))
+        indices = sorted(set(indices))
+        while len(indices) < target_frames and end_idx - 1 not in indices:
+            indices.append(end_idx - 1)
+            end_idx -= 1
+            if end_idx <= start_idx:
+                break
+        indices = sorted(indices)[:target_frames]
+        return keypoints_array[indices]
+
+
+def detect_word_boundaries_loop(keypoints, min_frames_per_word=10):
+    """Original per-frame detect_word_boundaries"""
+    num_frames = keypoints.shape[0]
+    if num_frames < min_frames_per_word:
+        return [(0, num_frames)]
+    movements = []
+    for i in range(1, num_frames):
+        movements.append(np.mean(np.abs(keypoints[i] - keypoints[i - 1])))
+    if len(movements) == 0:
+        return [(0, num_frames)]
+    movements = np.array(movements)
+    window_size = max(1, min(5, len(movements) // 4))
+    smoothed_movements = []
+    for i in range(len(movements)):
+        start = max(0, i - window_size // 2)
+        end = min(len(movements), i + window_size // 2 + 1)
+        smoothed_movements.append(np.mean(movements[start:end]))
+    smoothed_movements = np.array(smoothed_movements)
+    threshold = np.percentile(smoothed_movements, 30)
+    boundaries = [0]
+    stillness_start = None
+    for i, movement in enumerate(smoothed_movements):
+        if movement < threshold:
+            if stillness_start is None:
+                stillness_start = i + 1
+        elif stillness_start is not None:
+            boundary = (stillness_start + i + 1) // 2
+            if boundary - boundaries[-1] >= min_frames_per_word:
+                boundaries.append(boundary)
+            stillness_start = None
+    boundaries.append(num_frames)
+    segments = [(boundaries[i], boundaries[i + 1]) for i in range(len(boundaries) - 1)
+                if boundaries[i + 1] - boundaries[i] >= min_frames_per_word]
+    return segments or [(0, num_frames)]
+
+
+def to_raw_coordinates(clip, rng):
+    """
+    Stored clips are already wrist-centred, which would make normalization a no-op.
+    Shift every detected hand by a random image-space wrist position so
+    normalization exercises the full translate/flip/rotate/scale path.
+    """
+    raw = clip.copy()
+    detected = np.any(raw != 0, axis=(-2, -1))
+    offsets = rng.uniform(0.1, 0.9, size=raw.shape[:2] + (1, 3))
+    offsets[..., 2] = 0.0
+    offsets[..., 0, 0] += 1e-3  # keep the wrist off the origin
+    raw += np.where(detected[..., np.newaxis, np.newaxis], offsets, 0.0)
+    return raw
+
+
+def random_clip(rng, num_frames):
+    """Wrist-centred-like float32 clip with hands missing now and then"""
+    clip = rng.uniform(-0.3, 0.3, size=(num_frames, 2, 21, 3)).astype(np.float32)
+    clip[rng.random((num_frames, 2)) < 0.25] = 0
+    return clip
+
+
+def write_synthetic_dataset(root, num_clips, min_frames, max_frames, seed=0):
+    """Write num_clips random float32 clips (some frames without a second hand) and a dataset CSV"""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    labels = [f"SIGN{i:02d}" for i in range(20)]
+    rows = []
+    for i in range(num_clips):
+        label = labels[i % len(labels)]
+        num_frames = int(rng.integers(min_frames, max_frames + 1))
+        clip = rng.normal(0, 0.1, size=(num_frames, 2, 21, 3)).astype(np.float32)
+        clip[rng.random(num_frames) < 0.3, 1] = 0
+        path = Path(root) / label / f"clip{i:05d}.npy"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, clip)
+        rows.append({'path': f"keypoints/{label}/{path.name}", 'label': label,
+                     'split': ('train', 'train', 'train', 'val', 'test')[i % 5]})
+    csv_path = Path(root) / "dataset.csv"
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    return csv_path
+
+
+def save_cnn_lstm_model(path, num_classes=5, steps=32, mask_padding=False, seed=0):
+    """
+    Small untrained build_cnn_lstm_model saved to path (a variable-length one with mask_padding),
+    with non-trivial BatchNormalization statistics
+    """
+    from scripts.model_cnn_lstm import build_cnn_lstm_model
+
+    model = build_cnn_lstm_model((None if mask_padding else steps, 2 * 21 * 3), num_classes,
+                                 cnn_filters=16, lstm_units=16, mask_padding=mask_padding)
+    rng = np.random.default_rng(seed)
+    for layer in model.layers:
+        if layer.name.startswith('bn_'):
+            gamma, beta, mean, variance = layer.get_weights()
+            layer.set_weights([rng.uniform(0.5, 1.5, gamma.shape), rng.normal(0, 0.1, beta.shape),
+                               rng.normal(0, 0.1, mean.shape), rng.uniform(0.5, 1.5, variance.shape)])
+    model.save(path)
+    return Path(path)
+
+
+def synthetic_signing(num_frames, seed=0, min_word=20, max_word=60, min_pause=5, max_pause=25):
+    """Keypoints alternating signed words (hands moving) and pauses (hands nearly still), float32"""
+    rng = np.random.default_rng(seed)
+    speed = np.empty(num_frames)
+    position = 0
+    while position < num_frames:
+        word, pause = rng.integers(min_word, max_word), rng.integers(min_pause, max_pause)
+        speed[position:position + word] = rng.uniform(0.01, 0.03)
+        speed[position + word:position + word + pause] = 0.001
+        position += word + pause
+    steps = rng.normal(size=(num_frames, 2, 21, 3)) * speed[:, None, None, None]
+    keypoints = 0.5 + np.cumsum(steps, axis=0)
+    keypoints[:, 1][rng.random(num_frames) < 0.2] = 0  # Second hand missed now and then
+    return keypoints.astype(np.float32)
+
+
+def stream_segments(keypoints, chunk_frames, **detector_options):
+    """Word segments of WordBoundaryDetector fed chunk_frames frames at a time"""
+    from scripts.word_segmentation import WordBoundaryDetector
+
+    detector = WordBoundaryDetector(**detector_options)
+    segments = []
+    for start in range(0, len(keypoints), chunk_frames):
+        segments.extend(detector.update(keypoints[start:start + chunk_frames]))
+    return segments + detector.finish()
@@ -0,0 +1,32 @@
+"""
+pad_sequences: post-padding and post-truncation like keras' pad_sequences
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.array_utils import pad_sequences
+
+
+def test_pads_and_truncates_at_the_end():
+    sequences = [np.ones((2, 3)), np.full((5, 3), 2.0), np.zeros((0, 3))]
+    padded = pad_sequences(sequences, maxlen=4, value=-1.0)
+    assert padded.shape == (3, 4, 3) and padded.dtype == np.float32
+    np.testing.assert_array_equal(padded[0], [[1] * 3] * 2 + [[-1] * 3] * 2)
+    np.testing.assert_array_equal(padded[1], np.full((4, 3), 2.0))
+    np.testing.assert_array_equal(padded[2], np.full((4, 3), -1.0))
+
+
+def test_matches_keras():
+    keras = pytest.importorskip("keras")
+    rng = np.random.default_rng(0)
+    sequences = [rng.normal(size=(length, 126)) for length in (3, 96, 120, 40)]
+    np.testing.assert_array_equal(
+        pad_sequences(sequences, maxlen=96),
+        keras.preprocessing.sequence.pad_sequences(sequences, maxlen=96, dtype='float32',
+                                                   padding='post', truncating='post', value=0.0))
@@ -0,0 +1,66 @@
+"""
+Dataset catalog: per-clip metadata and staleness checks (timings: benchmark.py catalog)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.create_dataset_csv import create_csv_dataset
+from scripts.dataset_catalog import describe_clip, file_stats_path, has_catalog, is_stale, record_file_stats
+from scripts.keypoint_format import save_keypoints_compact
+from tests.reference import random_clip
+
+
+def test_describe_npy_and_compact(tmp_path):
+    clip = random_clip(np.random.default_rng(0), 40)
+    np.save(tmp_path / "a.npy", clip)
+    save_keypoints_compact(tmp_path / "b.kpc", clip, dtype="float16")
+
+    presence = np.any(clip != 0, axis=(2, 3)).mean(axis=0)
+    for path, dtype in ((tmp_path / "a.npy", "float32"), (tmp_path / "b.npy", "float16")):
+        metadata = describe_clip(path)
+        assert metadata['frames'] == 40 and metadata['shape'] == "40x2x21x3"
+        assert metadata['dtype'] == dtype
+        assert [metadata['hand0_presence'], metadata['hand1_presence']] == list(np.round(presence, 4))
+        assert metadata['file_size'] == metadata['file'].stat().st_size
+
+
+def test_is_stale(tmp_path):
+    path = tmp_path / "a.npy"
+    np.save(path, random_clip(np.random.default_rng(0), 20))
+    metadata = describe_clip(path)
+    file_stats = {}
+    assert not is_stale(path, metadata['file_size'], metadata['sha256'], file_stats)
+    assert file_stats  # Hashed once, then remembered by size and mtime
+    assert is_stale(path, float('nan'), float('nan'))
+    assert is_stale(tmp_path / "missing.npy", metadata['file_size'], metadata['sha256'])
+
+    record_file_stats(file_stats, metadata)
+    clip = np.load(path)
+    clip[0, 0, 0, 0] += 1  # Same size, different contents
+    np.save(path, clip)
+    assert is_stale(path, metadata['file_size'], metadata['sha256'], file_stats)
+
+
+def test_created_csv_carries_the_catalog(tmp_path):
+    rng = np.random.default_rng(0)
+    for label in ("Hello", "Thanks"):
+        (tmp_path / label).mkdir()
+        for i in range(5):
+            np.save(tmp_path / label / f"{label}{i:02d}.npy", random_clip(rng, 10 + i))
+    csv_path = tmp_path / "dataset.csv"
+    create_csv_dataset(tmp_path, csv_path)
+
+    df = pd.read_csv(csv_path)
+    assert len(df) == 10 and has_catalog(df) and 'mtime_ns' not in df.columns
+    assert file_stats_path(csv_path).exists()
+    assert b"\r" not in csv_path.read_bytes()
+    assert not [p for p in tmp_path.iterdir() if p.suffix == ".tmp"]
+    for path, frames, size, sha256 in zip(df['path'], df['frames'], df['file_size'], df['sha256']):
+        file = tmp_path / path.split("/", 1)[1]
+        assert frames == len(np.load(file)) and not is_stale(file, size, sha256)
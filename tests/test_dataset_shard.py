@@ -0,0 +1,50 @@
+"""
+Packed dataset shard: clips and lengths read back from the memory-mapped shard
+match the source files (timings: benchmark.py shard)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.data_loader import SignLanguageDataLoader
+from scripts.dataset_shard import DatasetShard, pack_dataset_shard, resolve_keypoints_path
+from tests.reference import write_synthetic_dataset
+
+
+def test_clips_match_files(tmp_path):
+    csv_path = write_synthetic_dataset(tmp_path, 25, 5, 60)
+    summary = pack_dataset_shard(csv_path, tmp_path, tmp_path / "shard")
+    assert summary['clips'] == 25 and not summary['missing']
+
+    shard = DatasetShard(tmp_path / "shard")
+    assert len(shard) == 25 and shard.matches_csv(csv_path)
+    df = pd.read_csv(csv_path)
+    for path, split in zip(df['path'], df['split']):
+        clip = np.load(resolve_keypoints_path(tmp_path, path))
+        assert path in shard
+        assert shard.length_of(path) == len(clip)
+        np.testing.assert_array_equal(shard.get(path), clip)
+    np.testing.assert_array_equal(shard.split_indices('test'), np.flatnonzero(df['split'] == 'test'))
+    assert "keypoints/missing.npy" not in shard
+
+
+def test_loader_reads_from_shard_only(tmp_path):
+    csv_path = write_synthetic_dataset(tmp_path, 10, 5, 60)
+    pack_dataset_shard(csv_path, tmp_path, tmp_path / "shard")
+    df = pd.read_csv(csv_path)
+    train = df[df['split'] == 'train']
+    clips = [np.load(resolve_keypoints_path(tmp_path, path)) for path in train['path']]
+    for path in df['path']:
+        resolve_keypoints_path(tmp_path, path).unlink()  # Only the shard is left
+
+    loader = SignLanguageDataLoader(csv_path, tmp_path, use_smart_sampling=False, shard_dir=tmp_path / "shard")
+    assert len(loader.get_split_labels('train')) == len(train)  # Lengths from the shard index
+    X, y = loader.get_split_data('train')
+    assert X.shape[:2] == (len(train), max(len(clip) for clip in clips))
+    for padded, clip in zip(X, clips):
+        np.testing.assert_array_equal(padded[:len(clip)], clip.reshape(len(clip), -1))
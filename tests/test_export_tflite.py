@@ -0,0 +1,65 @@
+"""
+TF Lite exports against the Keras model they came from, and the interpreter backend
+under concurrent calls (latency and memory: benchmark.py tflite)
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("tensorflow")
+
+from scripts.export_tflite import TFLITE_VARIANTS, export_tflite
+from scripts.inference_backends import KerasBackend, TFLiteBackend
+from tests.reference import save_cnn_lstm_model
+
+STEPS = 32
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    model_path = save_cnn_lstm_model(tmp_path_factory.mktemp("run") / "best_model.keras", steps=STEPS)
+    return model_path, export_tflite(model_path, TFLITE_VARIANTS)
+
+
+def _clips(num_clips, steps, seed=0):
+    return np.random.default_rng(seed).normal(size=(num_clips, steps, 126)).astype(np.float32)
+
+
+def test_float32_matches_keras(exported):
+    model_path, tflite_paths = exported
+    X = _clips(4, STEPS)
+    np.testing.assert_allclose(TFLiteBackend(tflite_paths['float32'])(X), KerasBackend(model_path)(X), atol=1e-5)
+
+
+def test_quantized_variants_agree_with_keras(exported):
+    model_path, tflite_paths = exported
+    X = _clips(8, STEPS)
+    reference = KerasBackend(model_path)(X)
+    for variant in ("float16", "int8"):
+        np.testing.assert_allclose(TFLiteBackend(tflite_paths[variant])(X), reference, atol=0.05)
+
+
+def test_short_clips_are_padded(exported):
+    _, tflite_paths = exported
+    backend = TFLiteBackend(tflite_paths['float32'])
+    X = _clips(2, 20)
+    padded = np.pad(X, ((0, 0), (0, STEPS - 20), (0, 0)))
+    np.testing.assert_array_equal(backend(X), backend(padded))
+
+
+def test_concurrent_calls_get_their_own_outputs(exported):
+    _, tflite_paths = exported
+    backend = TFLiteBackend(tflite_paths['float32'])
+    batches = [_clips(3, STEPS, seed=i) for i in range(16)]
+    expected = [backend(X) for X in batches]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for _ in range(3):
+            for result, reference in zip(executor.map(backend, batches), expected):
+                np.testing.assert_array_equal(result, reference)
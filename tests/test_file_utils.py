@@ -0,0 +1,55 @@
+"""
+atomic_write: contents, permissions and cleanup
+"""
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.file_utils import NEW_FILE_MODE, atomic_write
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_writes_contents(tmp_path):
+    path = atomic_write(tmp_path / "sub" / "data.bin", lambda f: f.write(b"abc"))
+    assert path.read_bytes() == b"abc"
+    atomic_write(path, lambda f: f.write("é\n"), mode='w', encoding='utf-8')
+    assert path.read_text(encoding='utf-8') == "é\n"
+
+
+def test_new_file_respects_umask(tmp_path):
+    path = atomic_write(tmp_path / "data.bin", lambda f: f.write(b"abc"))
+    with open(tmp_path / "plain.bin", 'wb') as f:
+        f.write(b"abc")
+    assert _mode(path) == NEW_FILE_MODE == _mode(tmp_path / "plain.bin")
+
+
+def test_keeps_mode_of_replaced_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"old")
+    os.chmod(path, 0o640)
+    atomic_write(path, lambda f: f.write(b"new"))
+    assert _mode(path) == 0o640
+    assert path.read_bytes() == b"new"
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"old")
+
+    def writer(f):
+        f.write(b"partial")
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(path, writer)
+    assert path.read_bytes() == b"old"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.bin"]
@@ -0,0 +1,67 @@
+"""
+Compact .kpc keypoint format: round trips through encoding, files and tree conversion
+(sizes and load times: benchmark.py compact-format)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.keypoint_format import (
+    CompactClipMap, compact_path, convert_keypoint_tree, decode_compact, encode_compact, keypoints_file_length,
+    load_keypoints_file, read_compact_header, save_keypoints_compact
+)
+from tests.reference import random_clip
+
+TOLERANCES = {"int16": 1e-4, "float16": 1e-3}
+
+
+@pytest.mark.parametrize("dtype", sorted(TOLERANCES))
+def test_round_trip(dtype):
+    rng = np.random.default_rng(42)
+    for num_frames in (0, 1, 33, 200):
+        clip = random_clip(rng, num_frames)
+        restored = decode_compact(encode_compact(clip, dtype=dtype))
+        assert restored.shape == clip.shape
+        assert restored.dtype == np.float32
+        np.testing.assert_array_equal(np.any(restored != 0, axis=(2, 3)), np.any(clip != 0, axis=(2, 3)))
+        np.testing.assert_allclose(restored, clip, atol=TOLERANCES[dtype])
+
+
+@pytest.mark.parametrize("dtype", sorted(TOLERANCES))
+def test_memory_mapped_slices(tmp_path, dtype):
+    clip = random_clip(np.random.default_rng(0), 50)
+    path = tmp_path / "clip.kpc"
+    save_keypoints_compact(path, clip, dtype=dtype, normalization="full")
+    header = read_compact_header(path)
+    assert header['shape'] == list(clip.shape) and header['normalization'] == "full"
+
+    full = decode_compact(path.read_bytes())
+    mapped = CompactClipMap(path)
+    assert len(mapped) == keypoints_file_length(path) == 50
+    for start, stop in ((0, 50), (3, 17), (49, 50), (20, 20)):
+        np.testing.assert_array_equal(mapped[start:stop], full[start:stop])
+    np.testing.assert_array_equal(mapped[7], full[7])
+
+
+def test_tree_conversion(tmp_path):
+    rng = np.random.default_rng(0)
+    clips = {tmp_path / "Hello" / f"Hello{i:02d}.npy": random_clip(rng, 20 + i) for i in range(3)}
+    for path, clip in clips.items():
+        path.parent.mkdir(exist_ok=True)
+        np.save(path, clip)
+
+    summary = convert_keypoint_tree(tmp_path, remove_npy=True)
+    assert summary['converted'] == 3 and summary['max_error'] <= TOLERANCES["int16"]
+    for path, clip in clips.items():
+        assert not path.exists() and compact_path(path).exists()
+        np.testing.assert_allclose(load_keypoints_file(path), clip, atol=TOLERANCES["int16"])
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        decode_compact(b"\x93NUMPY" + bytes(32))
@@ -0,0 +1,40 @@
+"""
+normalize_keypoints against the original per-frame loop (timings: benchmark.py normalize)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.extract_keypoints import normalize_keypoints
+from tests.reference import normalize_keypoints_loop, random_clip, to_raw_coordinates
+
+
+@pytest.mark.parametrize("minimal", [True, False])
+def test_matches_loop(minimal):
+    rng = np.random.default_rng(42)
+    for num_frames in (1, 7, 96, 250):
+        clip = to_raw_coordinates(random_clip(rng, num_frames), rng)
+        np.testing.assert_allclose(normalize_keypoints(clip, minimal=minimal),
+                                   normalize_keypoints_loop(clip, minimal=minimal), atol=1e-4)
+
+
+@pytest.mark.parametrize("minimal", [True, False])
+def test_clip_stack_matches_loop(minimal):
+    rng = np.random.default_rng(0)
+    stack = np.stack([to_raw_coordinates(random_clip(rng, 40), rng) for _ in range(8)])
+    reference = np.stack([normalize_keypoints_loop(clip, minimal=minimal) for clip in stack])
+    np.testing.assert_allclose(normalize_keypoints(stack, minimal=minimal), reference, atol=1e-4)
+
+
+def test_missing_hands_stay_zero():
+    rng = np.random.default_rng(1)
+    clip = to_raw_coordinates(random_clip(rng, 50), rng)
+    missing = ~np.any(clip != 0, axis=(2, 3))
+    assert missing.any()
+    for minimal in (True, False):
+        assert not np.any(normalize_keypoints(clip, minimal=minimal)[missing])
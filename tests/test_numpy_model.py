@@ -0,0 +1,62 @@
+"""
+Pure-NumPy forward pass against the Keras model it was exported from
+(latency, memory and imports: benchmark.py numpy-model)
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("tensorflow")
+
+from scripts.inference_backends import KerasBackend, NumpyBackend
+from scripts.numpy_model import export_numpy_weights
+from tests.reference import save_cnn_lstm_model
+
+STEPS = 32
+
+
+def _clips(num_clips, steps, seed=0):
+    X = np.random.default_rng(seed).normal(size=(num_clips, steps, 126)).astype(np.float32)
+    X[:, :, 63:][np.random.default_rng(seed + 1).random((num_clips, steps)) < 0.3] = 0  # Missing second hand
+    return X
+
+
+@pytest.mark.parametrize("mask_padding", [False, True])
+def test_matches_keras(tmp_path, mask_padding):
+    model_path = save_cnn_lstm_model(tmp_path / "best_model.keras", steps=STEPS, mask_padding=mask_padding)
+    keras_backend = KerasBackend(model_path, max_length=STEPS)
+    numpy_backend = NumpyBackend(export_numpy_weights(model_path))
+
+    X = _clips(8, STEPS)
+    if mask_padding:
+        for i, length in enumerate((5, 9, 16, 21, 27, 30, 31, 32)):
+            X[i, length:] = 0  # Zero-padded tails, as in length-bucketed batches
+    reference = keras_backend(X)
+    probabilities = numpy_backend(X)
+    np.testing.assert_allclose(probabilities, reference, atol=1e-5)
+    np.testing.assert_array_equal(probabilities.argmax(axis=1), reference.argmax(axis=1))
+
+
+def test_variable_length_matches_keras(tmp_path):
+    model_path = save_cnn_lstm_model(tmp_path / "best_model.keras", mask_padding=True)
+    keras_backend = KerasBackend(model_path, max_length=STEPS)
+    numpy_backend = NumpyBackend(export_numpy_weights(model_path))
+    for steps in (7, 19, 45):
+        X = _clips(3, steps, seed=steps)
+        np.testing.assert_allclose(numpy_backend(X), keras_backend(X), atol=1e-5)
+
+
+def test_serving_does_not_import_tensorflow(tmp_path):
+    model_path = save_cnn_lstm_model(tmp_path / "best_model.keras", steps=STEPS)
+    npz_path = export_numpy_weights(model_path)
+    code = ("import sys; import numpy as np; from scripts.inference_backends import load_backend; "
+            f"load_backend({str(npz_path)!r})(np.zeros((1, {STEPS}, 126), np.float32)); "
+            "assert 'tensorflow' not in sys.modules and 'keras' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent, check=True)
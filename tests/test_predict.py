@@ -0,0 +1,50 @@
+"""
+SignLanguagePredictor batched segment inference (timings: benchmark.py batched-segments)
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("tensorflow")
+
+from scripts.numpy_model import export_numpy_weights
+from scripts.predict import SignLanguagePredictor
+from tests.reference import random_clip, save_cnn_lstm_model
+
+LABELS = ["A", "B", "C", "D", "E"]
+
+
+@pytest.fixture(scope="module")
+def predictor(tmp_path_factory):
+    run_dir = tmp_path_factory.mktemp("run")
+    model_path = save_cnn_lstm_model(run_dir / "best_model.keras", num_classes=len(LABELS), steps=96)
+    with open(run_dir / "label_mapping.json", "w") as f:
+        json.dump({'classes': LABELS}, f)
+    return SignLanguagePredictor(export_numpy_weights(model_path))
+
+
+def test_batch_matches_single_predictions(predictor):
+    rng = np.random.default_rng(0)
+    clips = [random_clip(rng, length) for length in (12, 60, 96, 150)]
+    for clip, result in zip(clips, predictor.predict_batch(clips)):
+        single = predictor.predict_from_keypoints(clip)
+        assert result['prediction'] == single['prediction']
+        assert result['all_predictions'] == pytest.approx(single['all_predictions'], abs=1e-6)
+
+
+def test_undetected_clips_get_separate_uniform_results(predictor):
+    clips = [np.zeros((30, 2, 21, 3), dtype=np.float32), random_clip(np.random.default_rng(1), 40),
+             np.zeros((20, 2, 21, 3), dtype=np.float32)]
+    results = predictor.predict_batch(clips)
+    assert results[0] == results[2]
+    assert results[0]['confidence'] == pytest.approx(1 / len(LABELS))
+    assert results[0] is not results[2] and results[0]['all_predictions'] is not results[2]['all_predictions']
+    results[0]['prediction'] = "changed"
+    assert results[2]['prediction'] != "changed"
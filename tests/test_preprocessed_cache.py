@@ -0,0 +1,76 @@
+"""
+Preprocessed split cache: entries written by training are read back by later loads
+and by the evaluation scripts (timings: benchmark.py preprocessed-cache)
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.data_loader import SignLanguageDataLoader
+from scripts.visualize_results import load_test_data
+from tests.reference import write_synthetic_dataset
+
+
+def _train_run(tmp_path, csv_path, cache_dir, use_smart_sampling=True):
+    """Load every split like train_model does and write the run's training_params.json"""
+    loader = SignLanguageDataLoader(csv_path, tmp_path, use_smart_sampling=use_smart_sampling, cache_dir=cache_dir)
+    splits = loader.get_all_splits()
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+    with open(run_dir / "training_params.json", "w") as f:
+        json.dump({'use_smart_sampling': use_smart_sampling, 'min_hand_presence': None,
+                   'max_clip_length': loader.max_length}, f)
+    return run_dir, splits
+
+
+def test_second_load_reads_cache(tmp_path, capsys):
+    csv_path = write_synthetic_dataset(tmp_path, 20, 30, 150)
+    cache_dir = tmp_path / "cache"
+    first = SignLanguageDataLoader(csv_path, tmp_path, cache_dir=cache_dir).get_all_splits()
+    capsys.readouterr()
+    second = SignLanguageDataLoader(csv_path, tmp_path, cache_dir=cache_dir).get_all_splits()
+    assert capsys.readouterr().out.count("from cache") == 3
+    for split in first:
+        np.testing.assert_array_equal(second[split][0], first[split][0])
+        np.testing.assert_array_equal(second[split][1], first[split][1])
+
+
+def test_changed_file_misses_cache(tmp_path, capsys):
+    csv_path = write_synthetic_dataset(tmp_path, 20, 30, 150)
+    cache_dir = tmp_path / "cache"
+    SignLanguageDataLoader(csv_path, tmp_path, cache_dir=cache_dir).get_split_data('train')
+    path = next(tmp_path.rglob("clip00000.npy"))
+    np.save(path, np.load(path) + 1)
+    capsys.readouterr()
+    SignLanguageDataLoader(csv_path, tmp_path, cache_dir=cache_dir).get_split_data('train')
+    assert "from cache" not in capsys.readouterr().out
+
+
+def test_evaluation_reads_tensors_cached_by_training(tmp_path, capsys):
+    csv_path = write_synthetic_dataset(tmp_path, 20, 30, 150)
+    run_dir, splits = _train_run(tmp_path, csv_path, tmp_path / "cache")
+    capsys.readouterr()
+
+    X_test, y_test = load_test_data(run_dir, csv_path, tmp_path, cache_dir=tmp_path / "cache")
+    assert "Loaded test data from cache" in capsys.readouterr().out
+    np.testing.assert_array_equal(X_test, splits['test'][0])
+    np.testing.assert_array_equal(y_test, splits['test'][1])
+
+
+def test_second_evaluation_reads_cache(tmp_path, capsys):
+    csv_path = write_synthetic_dataset(tmp_path, 20, 30, 150)
+    run_dir, splits = _train_run(tmp_path, csv_path, None, use_smart_sampling=False)
+
+    X_test, _ = load_test_data(run_dir, csv_path, tmp_path, cache_dir=tmp_path / "cache")
+    assert X_test.shape[1] == splits['train'][0].shape[1]  # Padded to the training length
+    np.testing.assert_array_equal(X_test, splits['test'][0])
+    capsys.readouterr()
+
+    second, _ = load_test_data(run_dir, csv_path, tmp_path, cache_dir=tmp_path / "cache")
+    assert "Loaded test data from cache" in capsys.readouterr().out
+    np.testing.assert_array_equal(second, X_test)
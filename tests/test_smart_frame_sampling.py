@@ -0,0 +1,52 @@
+"""
+smart_frame_sampling's cached plans against the original list-based sampling
+(timings: benchmark.py sampling)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.extract_keypoints import get_sampling_plan, smart_frame_sampling
+from tests.reference import smart_frame_sampling_loop
+
+TARGET_FRAMES = 96
+
+
+@pytest.mark.parametrize("skip_start_ratio", [0.0, 0.2, 0.5])
+def test_bit_for_bit_for_every_length(skip_start_ratio):
+    rng = np.random.default_rng(42)
+    for num_frames in range(1, TARGET_FRAMES * 4):
+        clip = rng.standard_normal((num_frames, 2, 21, 3))
+        reference = smart_frame_sampling_loop(clip, TARGET_FRAMES, skip_start_ratio)
+        candidate = smart_frame_sampling(clip, TARGET_FRAMES, skip_start_ratio)
+        assert candidate.dtype == reference.dtype, num_frames
+        np.testing.assert_array_equal(candidate, reference, err_msg=f"num_frames={num_frames}")
+
+
+def test_long_clip():
+    clip = np.random.default_rng(0).standard_normal((20000, 2, 21, 3)).astype(np.float32)
+    np.testing.assert_array_equal(smart_frame_sampling(clip), smart_frame_sampling_loop(clip))
+
+
+def test_clip_stack_bit_for_bit():
+    batch = np.random.default_rng(1).standard_normal((16, 40, 2, 21, 3))
+    reference = np.stack([smart_frame_sampling_loop(clip, TARGET_FRAMES) for clip in batch])
+    np.testing.assert_array_equal(smart_frame_sampling(batch, TARGET_FRAMES), reference)
+
+
+def test_plan_is_cached():
+    get_sampling_plan.cache_clear()
+    clip = np.zeros((150, 2, 21, 3), dtype=np.float32)
+    smart_frame_sampling(clip)
+    smart_frame_sampling(clip)
+    assert get_sampling_plan.cache_info().hits == 1
+
+
+def test_empty_clip():
+    clip = np.zeros((0, 2, 21, 3), dtype=np.float32)
+    assert smart_frame_sampling(clip).shape == clip.shape
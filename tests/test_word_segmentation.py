@@ -0,0 +1,61 @@
+"""
+Word boundary detection: vectorized and streaming detection against the original
+per-frame loop (timings: benchmark.py word-boundaries)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.word_segmentation import (
+    STILLNESS_PERCENTILE, RunningQuantile, detect_word_boundaries, frame_movements, moving_average,
+    session_word_boundaries
+)
+from tests.reference import detect_word_boundaries_loop, stream_segments, synthetic_signing
+
+
+@pytest.mark.parametrize("num_frames", [0, 1, 2, 5, 9, 10, 11, 25, 300, 5000])
+def test_matches_loop(num_frames):
+    keypoints = synthetic_signing(num_frames, seed=num_frames)
+    assert detect_word_boundaries(keypoints) == detect_word_boundaries_loop(keypoints)
+
+
+@pytest.mark.parametrize("min_frames_per_word", [1, 10, 40])
+def test_min_frames_per_word_matches_loop(min_frames_per_word):
+    keypoints = synthetic_signing(2000, seed=3)
+    assert (detect_word_boundaries(keypoints, min_frames_per_word)
+            == detect_word_boundaries_loop(keypoints, min_frames_per_word))
+
+
+@pytest.mark.parametrize("chunk_frames", [1, 37, 4096])
+def test_streaming_with_offline_threshold_matches(chunk_frames):
+    keypoints = synthetic_signing(3000, seed=1)
+    threshold = float(np.percentile(moving_average(frame_movements(keypoints), 5), STILLNESS_PERCENTILE))
+    assert stream_segments(keypoints, chunk_frames, threshold=threshold) == detect_word_boundaries(keypoints)
+
+
+def test_session_file_matches_streaming(tmp_path):
+    keypoints = synthetic_signing(3000, seed=2)
+    path = tmp_path / "session.npy"
+    np.save(path, keypoints)
+    assert list(session_word_boundaries(path, chunk_frames=256)) == stream_segments(keypoints, 256)
+
+
+def test_running_quantile_exact_for_first_values():
+    values = np.random.default_rng(0).standard_normal(5)
+    quantile = RunningQuantile(STILLNESS_PERCENTILE / 100)
+    for count, value in enumerate(values, 1):
+        quantile.add(value)
+        assert quantile.value == pytest.approx(np.percentile(values[:count], STILLNESS_PERCENTILE))
+
+
+def test_running_quantile_converges():
+    values = np.random.default_rng(1).standard_normal(20000)
+    quantile = RunningQuantile(STILLNESS_PERCENTILE / 100)
+    for value in values:
+        quantile.add(value)
+    assert quantile.value == pytest.approx(np.percentile(values, STILLNESS_PERCENTILE), abs=0.05)